@@ -0,0 +1,305 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Read-only file systems over zip and tar archives, so a tributary snapshot or a
+release artifact can be validated without extracting it first.
+"""
+
+import errno
+import io
+import tarfile
+import zipfile
+from fnmatch import fnmatchcase
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Generator, Iterable, Iterator, List, Optional, Set
+
+from .fs import Fs, PathFs, Stat
+
+
+class ArchiveFs(Fs):
+    """
+    The files of an archive, served as if it had been extracted at mount, which is
+    the archive's own path by default. The archive's directory is indexed once, when
+    it is opened. Paths outside mount, like the bundled config, are served by fallback.
+    """
+
+    def __init__(
+        self, archive: Path, mount: Optional[Path] = None, fallback: Fs = PathFs()
+    ):
+        self.archive = archive
+        self.mount = archive if mount is None else mount
+        self.fallback = fallback
+        # Each directory's key, relative to mount, to the names in it. The mount is "".
+        self._dirs: Dict[str, Set[str]] = {"": set()}
+        # Each file's key to whatever the subclass needs to read it.
+        self._files: Dict[str, Any] = {}
+
+    def _read_member(self, member: Any) -> bytes:
+        raise NotImplementedError()
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> "ArchiveFs":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def root(self) -> Path:
+        """
+        Where the tree starts. Archives made by git archive or GitHub often hold one
+        top-level directory, which is the root unless it's .doc_gen itself; otherwise
+        it's the mount.
+        """
+        names = self._dirs[""]
+        if len(names) == 1 and ".doc_gen" not in names:
+            (name,) = names
+            if name in self._dirs:
+                return self.mount / name
+        return self.mount
+
+    def _add_dir(self, name: str):
+        key = member_key(name)
+        if key is None:
+            return
+        parent = ""
+        for part in key.split("/"):
+            self._dirs[parent].add(part)
+            parent = f"{parent}/{part}" if parent else part
+            self._dirs.setdefault(parent, set())
+
+    def _add_file(self, name: str, member: Any):
+        key = member_key(name)
+        if key is None:
+            return
+        parent, _, base = key.rpartition("/")
+        if parent:
+            self._add_dir(parent)
+        self._dirs[parent].add(base)
+        self._files[key] = member
+
+    def _key(self, path: Path) -> Optional[str]:
+        """path relative to mount, or None if it's outside the archive."""
+        try:
+            relative = path.relative_to(self.mount).as_posix()
+        except ValueError:
+            return None
+        return "" if relative == "." else relative
+
+    def _read_key(self, key: str) -> bytes:
+        member = self._files.get(key)
+        if member is None:
+            raise FileNotFoundError(
+                errno.ENOENT, "No such file in archive", str(self.mount / key)
+            )
+        return self._read_member(member)
+
+    def _open(self, key: str, encoding: str) -> io.TextIOWrapper:
+        return open_text(self._read_key(key), encoding)
+
+    def glob(self, path: Path, glob: str) -> Generator[Path, None, None]:
+        key = self._key(path)
+        if key is None:
+            return self.fallback.glob(path, glob)
+        return self._glob_paths(path, key, glob)
+
+    def _glob_paths(
+        self, path: Path, key: str, glob: str
+    ) -> Generator[Path, None, None]:
+        parts = [part for part in glob.split("/") if part not in ("", ".")]
+        seen: Set[str] = set()
+        for match in self._glob(key, parts):
+            if match not in seen:
+                seen.add(match)
+                yield path / match[len(key) :].lstrip("/")
+
+    def _glob(self, key: str, parts: List[str]) -> Iterator[str]:
+        """Keys below key matching parts, following Path.glob."""
+        if not parts:
+            yield key
+            return
+        part, rest = parts[0], parts[1:]
+        if part == "**":
+            # ** matches this directory and every directory below it.
+            stack = [key] if key in self._dirs else []
+            while stack:
+                directory = stack.pop()
+                yield from self._glob(directory, rest)
+                stack.extend(
+                    child
+                    for child in (
+                        join(directory, name) for name in self._dirs[directory]
+                    )
+                    if child in self._dirs
+                )
+            return
+        for name in sorted(self._dirs.get(key, ())):
+            if fnmatchcase(name, part):
+                child = join(key, name)
+                if not rest or child in self._dirs:
+                    yield from self._glob(child, rest)
+
+    def read(self, path: Path) -> str:
+        key = self._key(path)
+        if key is None:
+            return self.fallback.read(path)
+        with self._open(key, "utf-8") as file:
+            return file.read()
+
+    def readlines(self, path: Path, encoding: str = "utf-8") -> List[str]:
+        key = self._key(path)
+        if key is None:
+            return self.fallback.readlines(path, encoding)
+        with self._open(key, encoding) as file:
+            return file.readlines()
+
+    def read_bytes(self, path: Path) -> bytes:
+        key = self._key(path)
+        if key is None:
+            return self.fallback.read_bytes(path)
+        return self._read_key(key)
+
+    def write(self, path: Path, content: str):
+        if self._key(path) is None:
+            return self.fallback.write(path, content)
+        raise OSError(errno.EROFS, "Archives are read only", str(path))
+
+    def stat(self, path: Path) -> Stat:
+        key = self._key(path)
+        if key is None:
+            return self.fallback.stat(path)
+        if key in self._files:
+            return Stat(path, True, True)
+        if key in self._dirs:
+            return Stat(path, True, False)
+        return Stat(path, False, False)
+
+    def mkdir(self, path: Path):
+        if self._key(path) is None:
+            return self.fallback.mkdir(path)
+        raise OSError(errno.EROFS, "Archives are read only", str(path))
+
+    def list(self, path: Path) -> List[Path]:
+        key = self._key(path)
+        if key is None:
+            return self.fallback.list(path)
+        if key in self._files:
+            return []
+        if key not in self._dirs:
+            raise FileNotFoundError(
+                errno.ENOENT, "No such directory in archive", str(path)
+            )
+        return [path / name for name in sorted(self._dirs[key])]
+
+    # The index is in memory, so stats and listings don't need threads.
+
+    def stat_many(self, paths: Iterable[Path]) -> List[Stat]:
+        return [self.stat(path) for path in paths]
+
+    def list_many(self, paths: Iterable[Path]) -> List[List[Path]]:
+        return [self.list(path) for path in paths]
+
+
+class ZipFs(ArchiveFs):
+    def __init__(
+        self, archive: Path, mount: Optional[Path] = None, fallback: Fs = PathFs()
+    ):
+        super().__init__(archive, mount, fallback)
+        self._zip = zipfile.ZipFile(archive)
+        for info in self._zip.infolist():
+            if info.is_dir():
+                self._add_dir(info.filename)
+            else:
+                self._add_file(info.filename, info)
+
+    def _read_member(self, member: zipfile.ZipInfo) -> bytes:
+        # ZipFile locks its file while reading, so members can be read from threads.
+        return self._zip.read(member)
+
+    def close(self):
+        self._zip.close()
+
+
+class TarFs(ArchiveFs):
+    """
+    Files in a plain tar are read from their offsets when they're needed. A
+    compressed tar can't be read out of order without decompressing it from the
+    start every time, so its files are read into memory in one pass instead.
+    """
+
+    def __init__(
+        self, archive: Path, mount: Optional[Path] = None, fallback: Fs = PathFs()
+    ):
+        super().__init__(archive, mount, fallback)
+        self._lock = Lock()
+        self._file = open(archive, "rb")
+        try:
+            with tarfile.open(fileobj=self._file, mode="r:") as tar:
+                for info in tar:
+                    self._add_member(info, (info.offset_data, info.size))
+        except tarfile.ReadError:
+            self._file.close()
+            with tarfile.open(archive, mode="r|*") as tar:
+                for info in tar:
+                    file = tar.extractfile(info) if info.isfile() else None
+                    self._add_member(info, file.read() if file else b"")
+
+    def _add_member(self, info: tarfile.TarInfo, member: Any):
+        # Links and devices aren't part of example trees.
+        if info.isdir():
+            self._add_dir(info.name)
+        elif info.isfile():
+            self._add_file(info.name, member)
+
+    def _read_member(self, member: Any) -> bytes:
+        if isinstance(member, bytes):
+            return member
+        offset, size = member
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(size)
+
+    def close(self):
+        self._file.close()
+
+    # Reads share one file handle, so threads would only wait for each other.
+
+    def read_many(self, paths: Iterable[Path]) -> List[str]:
+        return [self.read(path) for path in paths]
+
+    def readlines_many(
+        self, paths: Iterable[Path], encoding: str = "utf-8"
+    ) -> List[List[str]]:
+        return [self.readlines(path, encoding) for path in paths]
+
+
+def open_text(data: bytes, encoding: str) -> io.TextIOWrapper:
+    """data as a text file, decoded like PathFs opens files, translating line endings."""
+    return io.TextIOWrapper(io.BytesIO(data), encoding=encoding)
+
+
+def member_key(name: str) -> Optional[str]:
+    """An archive member's name as a key, or None if it points outside the archive."""
+    parts = [part for part in name.split("/") if part not in ("", ".")]
+    if not parts or ".." in parts:
+        return None
+    return "/".join(parts)
+
+
+def join(key: str, name: str) -> str:
+    return f"{key}/{name}" if key else name
+
+
+def open_archive(path: Path, fallback: Fs = PathFs()) -> Optional[ArchiveFs]:
+    """A ZipFs or TarFs of the file at path, or None if it isn't an archive."""
+    if not path.is_file():
+        return None
+    if zipfile.is_zipfile(path):
+        return ZipFs(path, fallback=fallback)
+    if tarfile.is_tarfile(path):
+        return TarFs(path, fallback=fallback)
+    return None
@@ -0,0 +1,175 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import shutil
+import tarfile
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict
+
+import pytest
+
+from .archive_fs import ArchiveFs, TarFs, ZipFs, open_archive
+from .doc_gen import DocGen
+from .fs import PathFs
+from .validate import validate_root
+
+TREE = {
+    "repo/.gitignore": "*.log\n",
+    "repo/README.md": "# Readme\r\nWindows line endings\r\n",
+    "repo/python/example.py": "# snippet-start:[python.example]\nprint()\n# snippet-end:[python.example]\n",
+    "repo/python/debug.log": "ignored\n",
+    "repo/python/nested/deeper/data.json": "{}\n",
+    "repo/.doc_gen/metadata/example_metadata.yaml": "{}\n",
+}
+
+
+def write_tree(root: Path, tree: Dict[str, str]):
+    for name, content in tree.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content.encode("utf-8"))
+
+
+def make_zip(source: Path, archive: Path):
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as out:
+        for path in sorted(source.rglob("*")):
+            out.write(path, path.relative_to(source).as_posix())
+
+
+def make_tar(mode: str) -> Callable[[Path, Path], None]:
+    def make(source: Path, archive: Path):
+        with tarfile.open(archive, mode) as out:
+            for path in sorted(source.iterdir()):
+                out.add(path, path.name)
+
+    return make
+
+
+ARCHIVES = {
+    "zip": make_zip,
+    "tar": make_tar("w"),
+    "tar.gz": make_tar("w:gz"),
+}
+
+
+@pytest.fixture(params=ARCHIVES)
+def archive(request, tmp_path: Path):
+    source = tmp_path / "source"
+    write_tree(source, TREE)
+    path = tmp_path / f"repo.{request.param}"
+    ARCHIVES[request.param](source, path)
+    fs = open_archive(path)
+    assert fs is not None
+    yield fs, source / "repo"
+    fs.close()
+
+
+def test_open_archive_types(archive):
+    fs, _ = archive
+    expected = ZipFs if fs.archive.suffix == ".zip" else TarFs
+    assert isinstance(fs, expected)
+
+
+def test_open_archive_not_archive(tmp_path: Path):
+    (tmp_path / "file.txt").write_text("text")
+    assert open_archive(tmp_path / "file.txt") is None
+    assert open_archive(tmp_path) is None
+
+
+def test_archive_matches_path_fs(archive):
+    fs, extracted = archive
+    root = fs.root
+    assert root == fs.archive / "repo"
+
+    path_fs = PathFs()
+    for name in ["", "python", "python/nested", "python/example.py", "missing"]:
+        stat = fs.stat(root / name)
+        expected = path_fs.stat(extracted / name)
+        assert (stat.exists, stat.is_file) == (expected.exists, expected.is_file)
+
+    for name in ["", "python", "python/nested", "python/example.py"]:
+        assert [p.relative_to(root) for p in fs.list(root / name)] == sorted(
+            p.relative_to(extracted) for p in path_fs.list(extracted / name)
+        )
+    with pytest.raises(FileNotFoundError):
+        fs.list(root / "missing")
+
+    for name in ["README.md", "python/example.py"]:
+        assert fs.read(root / name) == path_fs.read(extracted / name)
+        assert fs.readlines(root / name) == path_fs.readlines(extracted / name)
+        assert fs.read_bytes(root / name) == path_fs.read_bytes(extracted / name)
+    with pytest.raises(FileNotFoundError):
+        fs.read(root / "python")
+
+
+@pytest.mark.parametrize(
+    "directory,pattern",
+    [
+        ("", "*.md"),
+        ("", "**/*.py"),
+        ("", "**/*"),
+        ("", "**"),
+        ("python", "*"),
+        ("python", "nested/*/data.json"),
+        (".doc_gen/metadata", "*_metadata.yaml"),
+        ("missing", "*"),
+    ],
+)
+def test_archive_glob_matches_path_fs(archive, directory: str, pattern: str):
+    fs, extracted = archive
+    root = fs.root
+    assert sorted(
+        p.relative_to(root) for p in fs.glob(root / directory, pattern)
+    ) == sorted(p.relative_to(extracted) for p in (extracted / directory).glob(pattern))
+
+
+def test_archive_fallback(archive, tmp_path: Path):
+    fs, _ = archive
+    outside = tmp_path / "outside.txt"
+    fs.write(outside, "outside\n")
+    assert fs.read(outside) == "outside\n"
+    assert fs.stat(outside).is_file
+    with pytest.raises(OSError):
+        fs.write(fs.root / "new.txt", "inside\n")
+
+
+def test_archive_skips_unsafe_names(tmp_path: Path):
+    path = tmp_path / "unsafe.zip"
+    with zipfile.ZipFile(path, "w") as out:
+        out.writestr("../escape.txt", "escape")
+        out.writestr("./safe/file.txt", "safe")
+    fs = ZipFs(path)
+
+    assert fs.root == path / "safe"
+    assert fs.list(path) == [path / "safe"]
+    assert fs.read(path / "safe/file.txt") == "safe"
+
+
+def test_doc_gen_from_archive(tmp_path: Path):
+    resources = Path(__file__).parent / "test_resources"
+    source = resources / "doc_gen_test"
+    archive = Path(shutil.make_archive(str(tmp_path / "doc_gen"), "gztar", source))
+    fs = open_archive(archive)
+    assert isinstance(fs, ArchiveFs)
+
+    from_archive = DocGen.from_root(fs.root, fs=fs)
+    from_archive.collect_snippets(fs.root)
+    from_dir = DocGen.from_root(source)
+    from_dir.collect_snippets(source)
+
+    assert from_archive.examples.keys() == from_dir.examples.keys()
+    assert from_archive.snippets.keys() == from_dir.snippets.keys()
+
+
+def test_validate_archive(tmp_path: Path):
+    source = Path(__file__).parent / "test_resources" / "doc_gen_tributary_test"
+    archive = Path(shutil.make_archive(str(tmp_path / "tributary"), "zip", source))
+    fs = open_archive(archive)
+    assert fs is not None
+
+    result = validate_root(fs.root, fs.root / ".doc_gen/config", False, True, fs=fs)
+    expected = validate_root(source, source / ".doc_gen/config", False, True)
+
+    assert len(result.errors) == len(expected.errors)
+    assert result.doc_gen.examples.keys() == expected.doc_gen.examples.keys()
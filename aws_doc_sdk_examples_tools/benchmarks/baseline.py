@@ -0,0 +1,151 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Report benchmark results, and compare them with a baseline from an earlier run.
+Shared by the benchmark command lines, which differ only in what they measure.
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+# Each measurement's labels, like its scale and stage, and its value.
+Rows = Dict[Tuple[str, ...], float]
+
+
+@dataclass(frozen=True)
+class Measure:
+    """What a benchmark's results measure, and how to show them."""
+
+    # Headers of the labels of each measurement, such as scale and stage.
+    labels: Tuple[str, ...]
+    # The unit of the values, such as seconds.
+    unit: str
+    # A format for one value, such as "{:.4f}".
+    value_format: str
+    higher_is_better: bool
+    # The change from the baseline that counts as a regression, such as 0.25 for 25%.
+    threshold: float
+
+    def format(self, value: float) -> str:
+        return self.value_format.format(value)
+
+
+@dataclass
+class Regression:
+    labels: Tuple[str, ...]
+    baseline: float
+    current: float
+    measure: Measure = field(compare=False, repr=False)
+
+    def __str__(self) -> str:
+        show = self.measure.format
+        return (
+            f"{' '.join(self.labels)}: {show(self.baseline)} -> {show(self.current)}"
+            f" {self.measure.unit} ({self.current / self.baseline - 1:+.0%})"
+        )
+
+
+def rows(results: Mapping[str, Any], labels: Tuple[str, ...] = ()) -> Rows:
+    """The values of results, which may be nested by label, by their labels."""
+    found: Rows = {}
+    for key, value in results.items():
+        if isinstance(value, Mapping):
+            found.update(rows(value, (*labels, key)))
+        else:
+            found[(*labels, key)] = value
+    return found
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    measure: Measure,
+    threshold: Optional[float] = None,
+) -> List[Regression]:
+    """
+    The measurements that got worse than in baseline by more than threshold, or the
+    measure's threshold. Measurements missing from baseline can't regress.
+    """
+    if threshold is None:
+        threshold = measure.threshold
+    before = rows(baseline["results"])
+    regressions = []
+    for labels, value in rows(current["results"]).items():
+        old = before.get(labels)
+        if not old:
+            continue
+        if measure.higher_is_better:
+            worse = value < old * (1 - threshold)
+        else:
+            worse = value > old * (1 + threshold)
+        if worse:
+            regressions.append(Regression(labels, old, value, measure))
+    return regressions
+
+
+def format_results(
+    current: Dict[str, Any],
+    measure: Measure,
+    baseline: Optional[Dict[str, Any]] = None,
+) -> str:
+    """A table of each measurement, and its change from baseline."""
+    before = rows(baseline["results"]) if baseline else {}
+    table = [
+        [*measure.labels, measure.unit] + (["baseline", "change"] if baseline else [])
+    ]
+    for labels, value in rows(current["results"]).items():
+        row = [*labels, measure.format(value)]
+        if baseline:
+            old = before.get(labels)
+            if old:
+                row += [measure.format(old), f"{value / old - 1:+.0%}"]
+            else:
+                row += ["-", "-"]
+        table.append(row)
+    widths = [max(len(row[i]) for row in table) for i in range(len(table[0]))]
+    return "\n".join(
+        "  ".join(
+            cell.ljust(width) if i < len(measure.labels) else cell.rjust(width)
+            for i, (cell, width) in enumerate(zip(row, widths))
+        ).rstrip()
+        for row in table
+    )
+
+
+def add_arguments(parser: argparse.ArgumentParser, measure: Measure):
+    """Add the --out, --baseline and --threshold options that report reads."""
+    # argparse formats help with %.
+    percent = f"{measure.threshold:.0%}".replace("%", "%%")
+    parser.add_argument("--out", help="Write the results as JSON to this path.")
+    parser.add_argument(
+        "--baseline",
+        help="Compare with the results in this JSON file, exiting 1 if any regressed.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=measure.threshold,
+        help=f"With --baseline, the change that counts as a regression, such as {measure.threshold} for {percent}.",
+    )
+
+
+def report(current: Dict[str, Any], args: argparse.Namespace, measure: Measure):
+    """
+    Print the results, compared with --baseline if given, and write them to --out.
+    Exits 1 if any regressed.
+    """
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else None
+    print(format_results(current, measure, baseline))
+    if args.out:
+        Path(args.out).write_text(json.dumps(current, indent=2) + "\n")
+    if baseline is not None:
+        regressions = compare(current, baseline, measure, args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,96 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import argparse
+import json
+from pathlib import Path
+
+import pytest
+
+from . import micro, runner
+from .baseline import Regression, add_arguments, compare, format_results, report, rows
+
+
+def test_rows():
+    results = {"small": {"validate": 1.0}, "medium": {"validate": 2.0}}
+    assert rows(results) == {("small", "validate"): 1.0, ("medium", "validate"): 2.0}
+    assert rows({"fake_gotmpl": 3.0}) == {("fake_gotmpl",): 3.0}
+
+
+def test_compare_seconds():
+    baseline = {"results": {"small": {"validate": 1.0, "serialize": 1.0}}}
+    current = {
+        "results": {
+            "small": {"validate": 1.2, "serialize": 1.5, "check_files": 9.0},
+            "medium": {"validate": 5.0},
+        }
+    }
+    # Stages and scales missing from the baseline can't regress.
+    assert compare(current, baseline, runner.MEASURE) == [
+        Regression(("small", "serialize"), 1.0, 1.5, runner.MEASURE)
+    ]
+    assert len(compare(current, baseline, runner.MEASURE, 0.1)) == 2
+    assert (
+        str(compare(current, baseline, runner.MEASURE)[0])
+        == "small serialize: 1.0000 -> 1.5000 seconds (+50%)"
+    )
+
+
+def test_compare_ops():
+    baseline = {"results": {"parse_snippets": 1000.0, "fake_gotmpl": 1000.0}}
+    current = {
+        "results": {"parse_snippets": 900.0, "fake_gotmpl": 800.0, "new_case": 1.0}
+    }
+    assert compare(current, baseline, micro.MEASURE) == [
+        Regression(("fake_gotmpl",), 1000.0, 800.0, micro.MEASURE)
+    ]
+    assert len(compare(current, baseline, micro.MEASURE, 0.05)) == 2
+    assert (
+        str(compare(current, baseline, micro.MEASURE)[0])
+        == "fake_gotmpl: 1,000 -> 800 ops/s (-20%)"
+    )
+
+
+def test_format_results():
+    baseline = {"results": {"small": {"validate": 1.0}}}
+    current = {"results": {"small": {"validate": 0.5, "serialize": 2.0}}}
+    assert format_results(current, runner.MEASURE).splitlines() == [
+        "scale  stage      seconds",
+        "small  validate    0.5000",
+        "small  serialize   2.0000",
+    ]
+    assert format_results(current, runner.MEASURE, baseline).splitlines() == [
+        "scale  stage      seconds  baseline  change",
+        "small  validate    0.5000    1.0000    -50%",
+        "small  serialize   2.0000         -       -",
+    ]
+
+    baseline = {"results": {"parse_snippets": 1000.0}}
+    current = {"results": {"parse_snippets": 1500.0, "fake_gotmpl": 20.0}}
+    assert format_results(current, micro.MEASURE, baseline).splitlines() == [
+        "case            ops/s  baseline  change",
+        "parse_snippets  1,500     1,000    +50%",
+        "fake_gotmpl        20         -       -",
+    ]
+
+
+def test_report(tmp_path: Path, capsys):
+    parser = argparse.ArgumentParser()
+    add_arguments(parser, runner.MEASURE)
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"results": {"small": {"validate": 1.0}}}))
+    out = tmp_path / "out.json"
+    current = {"results": {"small": {"validate": 2.0}}}
+
+    args = parser.parse_args(["--baseline", str(baseline), "--out", str(out)])
+    with pytest.raises(SystemExit) as exit:
+        report(current, args, runner.MEASURE)
+
+    assert exit.value.code == 1
+    assert json.loads(out.read_text()) == current
+    captured = capsys.readouterr()
+    assert "small  validate" in captured.out
+    assert "Regression: small validate" in captured.err
+
+    args = parser.parse_args(["--baseline", str(baseline), "--threshold", "1.5"])
+    report(current, args, runner.MEASURE)
@@ -0,0 +1,281 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Microbenchmarks of the helpers that dominate profiles, run over inputs from the
+bundled config and test resources. Reports operations per second, and compares
+them with a baseline from an earlier run.
+
+    python -m aws_doc_sdk_examples_tools.benchmarks.micro --out micro.json
+    python -m aws_doc_sdk_examples_tools.benchmarks.micro --baseline micro.json
+"""
+
+import argparse
+import gc
+import io
+import json
+import platform
+import random
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import yaml
+
+from ..categories import fake_gotmpl
+from ..doc_gen import DocGen, DocGenEncoder
+from ..entities import expand_all_entities
+from ..file_utils import IgnoreMatcher
+from ..metadata_errors import MetadataError, MetadataErrors
+from ..metadata_validator import StringExtension
+from ..project_validator import (
+    ValidationConfig,
+    verify_no_deny_list_words,
+    verify_no_secret_keys,
+)
+from ..snippets import parse_snippets
+from .baseline import Measure, add_arguments, report
+from .reservoir import GITIGNORE, LANGUAGES, ReservoirSpec, source_lines
+
+PACKAGE = Path(__file__).parent.parent
+CONFIG = PACKAGE / "config"
+TEST_RESOURCES = PACKAGE / "test_resources"
+
+# Fail a comparison when a case runs 15% slower than its baseline.
+MEASURE = Measure(
+    labels=("case",),
+    unit="ops/s",
+    value_format="{:,.0f}",
+    higher_is_better=True,
+    threshold=0.15,
+)
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[[], Any]
+    # Calls of the helper in each run.
+    ops: int
+
+
+def yaml_files() -> List[Path]:
+    return sorted([*CONFIG.glob("*.yaml"), *TEST_RESOURCES.rglob("*.yaml")])
+
+
+def strings(document: Any) -> Iterator[str]:
+    """Every string value in a parsed YAML document."""
+    if isinstance(document, str):
+        yield document
+    elif isinstance(document, dict):
+        for value in document.values():
+            yield from strings(value)
+    elif isinstance(document, list):
+        for value in document:
+            yield from strings(value)
+
+
+def metadata_strings() -> List[str]:
+    """The strings of the test metadata, such as titles and descriptions."""
+    found: List[str] = []
+    for path in sorted(TEST_RESOURCES.rglob("*metadata.yaml")):
+        try:
+            found.extend(strings(yaml.safe_load(path.read_text())))
+        except yaml.YAMLError:
+            # Some resources are malformed on purpose.
+            continue
+    return found
+
+
+def cases() -> List[Case]:
+    """Each case, with its inputs loaded and ready to run."""
+    # Loading config reports on stdout.
+    with redirect_stdout(io.StringIO()):
+        doc_gen = DocGen.default()
+        resources = DocGen.from_root(TEST_RESOURCES / "doc_gen_test")
+        resources.collect_snippets()
+
+    rng = random.Random(0)
+    spec = ReservoirSpec(snippet_depth=3, snippet_lines=40)
+    sources = [
+        source_lines(spec, rng, idx, language, f"{language.directory}.File{idx}")
+        for idx, language in enumerate(LANGUAGES)
+    ]
+
+    def parse_all_snippets():
+        for lines in sources:
+            parse_snippets(lines, Path("source"), "")
+
+    files = [(path, path.read_text()) for path in yaml_files()]
+    validation = ValidationConfig()
+
+    def deny_list():
+        errors = MetadataErrors()
+        for path, contents in files:
+            verify_no_deny_list_words(contents, path, errors)
+
+    def secret_keys():
+        errors = MetadataErrors()
+        for path, contents in files:
+            verify_no_secret_keys(contents, path, validation, errors)
+
+    values = metadata_strings()
+    valid_xml = []
+    for value in values:
+        try:
+            StringExtension._validate_aws_entity_usage(value)
+            valid_xml.append(value)
+        except Exception:
+            continue
+
+    def entity_usage():
+        for value in valid_xml:
+            StringExtension._validate_aws_entity_usage(value)
+
+    def expand_entities():
+        for value in values:
+            expand_all_entities(value, doc_gen.entities)
+
+    templates = [
+        template
+        for category in doc_gen.categories.values()
+        for info in (category.defaults, category.overrides)
+        if info is not None
+        for template in (info.title, info.title_abbrev, info.synopsis)
+        if template
+    ]
+    services = sorted(doc_gen.services)[:20]
+
+    def gotmpl():
+        for template in templates:
+            for service in services:
+                fake_gotmpl(template, service, "ListBuckets")
+
+    errors_to_add = [
+        MetadataError(file=path, id=f"error{idx}")
+        for idx, (path, _) in enumerate(files * 20)
+    ]
+
+    def errors_append():
+        errors = MetadataErrors()
+        for error in errors_to_add:
+            errors.append(error)
+
+    # Entries of the directories a walk visits, matched as a service directory's
+    # .gitignore and its language directory's would match them.
+    entries = [*CONFIG.rglob("*"), *TEST_RESOURCES.rglob("*")]
+    names = sorted({path.name for path in entries if path.is_file()})
+    dir_names = sorted({path.name for path in entries if path.is_dir()})
+    matcher = (
+        IgnoreMatcher()
+        .add(GITIGNORE.splitlines(keepends=True))
+        .child("example_code")
+        .child("s3")
+        .add(["*.tmp\n", "scratch.py\n", "test_path/\n"])
+    )
+
+    def ignores():
+        for name in names:
+            matcher.ignores(name)
+
+    def ignores_dir():
+        for name in dir_names:
+            matcher.ignores_dir(name)
+
+    def encode():
+        json.dumps(resources, cls=DocGenEncoder)
+
+    return [
+        Case("parse_snippets", parse_all_snippets, len(sources)),
+        Case("verify_no_deny_list_words", deny_list, len(files)),
+        Case("verify_no_secret_keys", secret_keys, len(files)),
+        Case("_validate_aws_entity_usage", entity_usage, len(valid_xml)),
+        Case("expand_all_entities", expand_entities, len(values)),
+        Case("fake_gotmpl", gotmpl, len(templates) * len(services)),
+        Case("ErrorsList.append", errors_append, len(errors_to_add)),
+        Case("IgnoreMatcher.ignores", ignores, len(names)),
+        Case("IgnoreMatcher.ignores_dir", ignores_dir, len(dir_names)),
+        Case("DocGenEncoder", encode, 1),
+    ]
+
+
+def time_loops(run: Callable[[], Any], loops: int) -> float:
+    # Collections would land on whichever case happened to trigger them.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = perf_counter()
+        for _ in range(loops):
+            run()
+        return perf_counter() - start
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def measure(case: Case, min_time: float = 0.2, repeat: int = 5) -> float:
+    """
+    The case's operations per second. Runs are looped until a loop takes at least
+    min_time, then the fastest of repeat loops is kept.
+    """
+    loops = 1
+    seconds = time_loops(case.run, loops)
+    while seconds < min_time:
+        loops = max(loops * 2, int(loops * min_time / max(seconds, 1e-9)))
+        seconds = time_loops(case.run, loops)
+    for _ in range(repeat - 1):
+        seconds = min(seconds, time_loops(case.run, loops))
+    return case.ops * loops / seconds
+
+
+def run(
+    names: Optional[List[str]] = None, min_time: float = 0.2, repeat: int = 5
+) -> Dict[str, Any]:
+    """Measure the cases named names, or all of them."""
+    selected = cases()
+    if names is not None:
+        unknown = set(names) - {case.name for case in selected}
+        if unknown:
+            raise ValueError(f"Unknown cases: {', '.join(sorted(unknown))}")
+        selected = [case for case in selected if case.name in names]
+    results = {case.name: measure(case, min_time, repeat) for case in selected}
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--case",
+        action="append",
+        help="Run only this case. Repeat for several. Defaults to all of them.",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="Loop each case until a loop takes at least this many seconds.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Time each case's loop this many times, keeping the fastest.",
+    )
+    add_arguments(parser, MEASURE)
+    args = parser.parse_args()
+
+    try:
+        current = run(args.case, args.min_time, args.repeat)
+    except ValueError as err:
+        parser.error(str(err))
+    report(current, args, MEASURE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+
+from .micro import Case, cases, measure, run
+
+
+def test_cases_run():
+    found = cases()
+    assert len({case.name for case in found}) == len(found) == 10
+    for case in found:
+        assert case.ops > 0, case.name
+        case.run()
+
+
+def test_measure():
+    calls = []
+    ops = measure(Case("append", lambda: calls.append(1), 2), min_time=0.01, repeat=2)
+    assert ops > 0
+    # Calibrating takes at least one loop, and each repeat another.
+    assert len(calls) >= 2
+
+
+def test_run_unknown_case():
+    with pytest.raises(ValueError, match="Unknown cases: nope"):
+        run(["nope"])
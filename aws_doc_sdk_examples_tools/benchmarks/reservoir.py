@@ -0,0 +1,183 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Generate synthetic reservoirs, shaped like aws-doc-sdk-examples, to benchmark
+against. The same spec always generates the same files.
+"""
+
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+# Real services and SDKs, so the bundled config validates the generated metadata.
+SERVICES = ["s3", "sqs", "sns", "dynamodb", "lambda", "ec2", "iam", "kms"]
+
+
+@dataclass(frozen=True)
+class Language:
+    name: str
+    sdk_version: int
+    directory: str
+    extension: str
+    comment: str
+
+
+LANGUAGES = [
+    Language("Python", 3, "python", ".py", "#"),
+    Language("Java", 2, "javav2", ".java", "//"),
+    Language("JavaScript", 3, "javascriptv3", ".js", "//"),
+    Language("Go", 2, "gov2", ".go", "//"),
+    Language("Rust", 1, "rustv1", ".rs", "//"),
+]
+
+GITIGNORE = "*.log\nbuild/\n__pycache__/\n"
+
+
+@dataclass(frozen=True)
+class ReservoirSpec:
+    metadata_files: int = 8
+    examples: int = 80
+    source_files: int = 160
+    # How deeply snippet tags nest inside each source file.
+    snippet_depth: int = 2
+    # Code lines in each innermost snippet, give or take half.
+    snippet_lines: int = 12
+    # Add a .gitignore to each language and service directory, and files for them
+    # to ignore.
+    gitignores: bool = True
+    seed: int = 0
+
+
+SCALES: Dict[str, ReservoirSpec] = {
+    "small": ReservoirSpec(),
+    "medium": ReservoirSpec(metadata_files=24, examples=800, source_files=1600),
+    "large": ReservoirSpec(metadata_files=64, examples=4000, source_files=8000),
+}
+
+
+@dataclass
+class Source:
+    language: Language
+    github: str
+    # The outermost snippet tag in the file.
+    tag: str
+
+
+def make_reservoir(root: Path, spec: ReservoirSpec) -> Path:
+    """
+    Write a reservoir for spec under root and return root. Source files are spread
+    across languages and services, and examples across metadata files. Each example
+    has an excerpt for the outermost snippet of one source file.
+    """
+    rng = random.Random(spec.seed)
+    root.mkdir(parents=True, exist_ok=True)
+    sources = [write_source(root, spec, rng, idx) for idx in range(spec.source_files)]
+    if spec.gitignores:
+        write_gitignores(root)
+
+    metadata_dir = root / ".doc_gen" / "metadata"
+    metadata_dir.mkdir(parents=True, exist_ok=True)
+    documents: List[Dict[str, Any]] = [{} for _ in range(spec.metadata_files)]
+    for idx in range(spec.examples):
+        service = SERVICES[idx % len(SERVICES)]
+        source = sources[idx % len(sources)] if sources else None
+        documents[idx % spec.metadata_files][f"{service}_Operation{idx}"] = example(
+            service, idx, source
+        )
+    for idx, document in enumerate(documents):
+        name = f"{SERVICES[idx % len(SERVICES)]}_{idx}_metadata.yaml"
+        (metadata_dir / name).write_text(
+            yaml.safe_dump(document, sort_keys=False), encoding="utf-8"
+        )
+    return root
+
+
+def write_source(root: Path, spec: ReservoirSpec, rng: random.Random, idx: int):
+    language = LANGUAGES[idx % len(LANGUAGES)]
+    service = SERVICES[(idx // len(LANGUAGES)) % len(SERVICES)]
+    github = f"{language.directory}/example_code/{service}"
+    tag = f"{language.directory}.example_code.{service}.File{idx}"
+    directory = root / github
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"file{idx}{language.extension}").write_text(
+        "".join(source_lines(spec, rng, idx, language, tag)), encoding="utf-8"
+    )
+    return Source(language, github, tag)
+
+
+def source_lines(
+    spec: ReservoirSpec, rng: random.Random, idx: int, language: Language, tag: str
+) -> List[str]:
+    """A source file with a license header and snippets nested spec.snippet_depth deep."""
+    comment = language.comment
+    lines = [
+        f"{comment} Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.\n",
+        f"{comment} SPDX-License-Identifier: Apache-2.0\n",
+        "\n",
+    ]
+    for depth in range(spec.snippet_depth):
+        part = tag if depth == 0 else f"{tag}.Part{depth}"
+        lines.append(f"{comment} snippet-start:[{part}]\n")
+        lines.append(f"{comment} Step {depth} of file {idx}.\n")
+    count = max(1, spec.snippet_lines // 2 + rng.randrange(spec.snippet_lines + 1))
+    for line in range(count):
+        lines.append(
+            f"    result_{line} = client.operation_{idx}(value={rng.random():.6f})\n"
+        )
+    for depth in reversed(range(spec.snippet_depth)):
+        part = tag if depth == 0 else f"{tag}.Part{depth}"
+        lines.append(f"{comment} snippet-end:[{part}]\n")
+    return lines
+
+
+def write_gitignores(root: Path):
+    """A .gitignore in each language and service directory, with files it ignores."""
+    for language in LANGUAGES:
+        language_dir = root / language.directory
+        if not language_dir.exists():
+            continue
+        (language_dir / ".gitignore").write_text(GITIGNORE, encoding="utf-8")
+        for service_dir in sorted((language_dir / "example_code").iterdir()):
+            (service_dir / ".gitignore").write_text(
+                f"*.tmp\nscratch{language.extension}\n", encoding="utf-8"
+            )
+            (service_dir / "run.log").write_text("ignored\n", encoding="utf-8")
+            (service_dir / f"scratch{language.extension}").write_text(
+                "ignored\n", encoding="utf-8"
+            )
+            build = service_dir / "build"
+            build.mkdir(exist_ok=True)
+            (build / f"out{language.extension}").write_text(
+                "ignored\n", encoding="utf-8"
+            )
+
+
+def example(service: str, idx: int, source: Optional[Source]) -> Dict[str, Any]:
+    languages = {}
+    if source is not None:
+        languages[source.language.name] = {
+            "versions": [
+                {
+                    "sdk_version": source.language.sdk_version,
+                    "github": source.github,
+                    "excerpts": [
+                        {
+                            "description": f"Run operation {idx}.",
+                            "snippet_tags": [source.tag],
+                        }
+                    ],
+                }
+            ]
+        }
+    return {
+        "title": f"Run operation {idx} using an &AWS; SDK",
+        "title_abbrev": f"Run operation {idx}",
+        "synopsis": f"run operation {idx} with the client.",
+        "category": "Usage",
+        "languages": languages,
+        "services": {service: None},
+    }
@@ -0,0 +1,56 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+from pathlib import Path
+
+from ..doc_gen import DocGen
+from ..file_utils import get_files
+from .reservoir import ReservoirSpec, make_reservoir
+
+SPEC = ReservoirSpec(metadata_files=3, examples=12, source_files=10, snippet_depth=3)
+
+
+def contents(root: Path):
+    return {
+        str(path.relative_to(root)): path.read_text()
+        for path in sorted(root.rglob("*"))
+        if path.is_file()
+    }
+
+
+def test_make_reservoir_is_deterministic(tmp_path: Path):
+    first = make_reservoir(tmp_path / "first", SPEC)
+    second = make_reservoir(tmp_path / "second", SPEC)
+    assert contents(first) == contents(second)
+
+    reseeded = make_reservoir(tmp_path / "reseeded", ReservoirSpec(seed=1))
+    assert contents(reseeded) != contents(
+        make_reservoir(tmp_path / "default", ReservoirSpec())
+    )
+
+
+def test_make_reservoir_validates(tmp_path: Path):
+    root = make_reservoir(tmp_path, SPEC)
+    doc_gen = DocGen.from_root(root)
+    doc_gen.collect_snippets()
+    doc_gen.validate()
+
+    assert len(doc_gen.examples) == 12
+    assert len([*(root / ".doc_gen" / "metadata").iterdir()]) == 3
+    # Each source file nests three snippets.
+    assert len(doc_gen.snippets) == 30
+    assert not doc_gen.errors
+
+
+def test_make_reservoir_gitignores(tmp_path: Path):
+    root = make_reservoir(tmp_path, SPEC)
+    files = [path.relative_to(root) for path in get_files(root)]
+    assert any(path.name == ".gitignore" for path in root.rglob("*"))
+    assert not any(path.suffix == ".log" for path in files)
+    assert not any("build" in path.parts for path in files)
+    assert not any(path.stem == "scratch" for path in files)
+
+    plain = make_reservoir(
+        tmp_path / "plain", ReservoirSpec(source_files=5, gitignores=False)
+    )
+    assert not any(path.name == ".gitignore" for path in plain.rglob("*"))
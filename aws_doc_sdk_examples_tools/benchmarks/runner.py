@@ -0,0 +1,107 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Time each stage of the pipeline over synthetic reservoirs of several sizes, and
+compare the results with a baseline from an earlier run.
+
+    python -m aws_doc_sdk_examples_tools.benchmarks.runner --out results.json
+    python -m aws_doc_sdk_examples_tools.benchmarks.runner --baseline results.json
+"""
+
+import argparse
+import io
+import platform
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List
+
+from ..doc_gen import DocGen, DocGenEncoder
+from ..json_writer import dump
+from ..metadata_errors import MetadataErrors
+from ..project_validator import check_files
+from .baseline import Measure, add_arguments, report
+from .reservoir import SCALES, make_reservoir
+
+# The stages of a run, in the order they run.
+STAGES = ["from_root", "collect_snippets", "validate", "check_files", "serialize"]
+
+# Fail a comparison when a stage takes 25% longer than its baseline.
+MEASURE = Measure(
+    labels=("scale", "stage"),
+    unit="seconds",
+    value_format="{:.4f}",
+    higher_is_better=False,
+    threshold=0.25,
+)
+
+
+def run_stages(root: Path) -> Dict[str, float]:
+    """Run each stage once over the reservoir at root, returning the seconds each took."""
+    seconds: Dict[str, float] = {}
+
+    def timed(stage: str, run: Callable[[], Any]) -> Any:
+        start = perf_counter()
+        # Stages report progress on stdout, which isn't what's being measured.
+        with redirect_stdout(io.StringIO()):
+            result = run()
+        seconds[stage] = perf_counter() - start
+        return result
+
+    doc_gen: DocGen = timed("from_root", lambda: DocGen.from_root(root))
+    timed("collect_snippets", doc_gen.collect_snippets)
+    timed("validate", doc_gen.validate)
+    timed(
+        "check_files", lambda: check_files(root, doc_gen.validation, MetadataErrors())
+    )
+    # Written as doc_gen_cli writes it, to memory so disk speed isn't measured.
+    timed("serialize", lambda: dump(doc_gen, io.StringIO(), DocGenEncoder()))
+    return seconds
+
+
+def run(scales: List[str], repeat: int = 3) -> Dict[str, Any]:
+    """
+    Generate a reservoir for each scale and run the stages over it repeat times,
+    keeping each stage's fastest time, which is the least disturbed by noise.
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = make_reservoir(Path(tmp), SCALES[scale])
+            best: Dict[str, float] = {}
+            for _ in range(repeat):
+                for stage, seconds in run_stages(root).items():
+                    best[stage] = min(seconds, best.get(stage, seconds))
+            results[scale] = best
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--scale",
+        action="append",
+        choices=[*SCALES],
+        help="Run at this scale. Repeat for several. Defaults to small and medium.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Run each scale this many times, keeping each stage's fastest time.",
+    )
+    add_arguments(parser, MEASURE)
+    args = parser.parse_args()
+
+    report(run(args.scale or ["small", "medium"], args.repeat), args, MEASURE)
+
+
+if __name__ == "__main__":
+    main()
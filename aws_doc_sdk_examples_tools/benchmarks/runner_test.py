@@ -0,0 +1,14 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+from pathlib import Path
+
+from .reservoir import ReservoirSpec, make_reservoir
+from .runner import STAGES, run_stages
+
+
+def test_run_stages(tmp_path: Path):
+    root = make_reservoir(tmp_path, ReservoirSpec(examples=5, source_files=5))
+    seconds = run_stages(root)
+    assert [*seconds] == STAGES
+    assert all(value > 0 for value in seconds.values())
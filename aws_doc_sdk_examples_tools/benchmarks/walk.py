@@ -0,0 +1,97 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Compare walking a tree with nested .gitignore files using compiled IgnoreMatchers
+against testing every path with match_path_to_specs.
+
+    python -m aws_doc_sdk_examples_tools.benchmarks.walk --depth 6 --width 3
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Generator, Iterable, List
+
+from pathspec import GitIgnoreSpec
+
+from ..file_utils import match_path_to_specs, walk_with_gitignore
+
+GITIGNORE = [
+    "*.log\n",
+    "*.tmp\n",
+    "build/\n",
+    "__pycache__/\n",
+    "*.class\n",
+    ".venv\n",
+    "dist/\n",
+    "*.o\n",
+]
+EXTENSIONS = [".py", ".java", ".log", ".js", ".tmp", ".go", ".class", ".rs"]
+
+
+def make_tree(root: Path, depth: int, width: int, files: int):
+    """A tree width directories wide and depth deep, with a .gitignore in each."""
+    (root / ".gitignore").write_text("".join(GITIGNORE))
+    for idx in range(files):
+        (root / f"file{idx}{EXTENSIONS[idx % len(EXTENSIONS)]}").write_text("")
+    if depth > 0:
+        for idx in range(width):
+            child = root / f"dir{idx}"
+            child.mkdir()
+            make_tree(child, depth - 1, width, files)
+        (root / "build").mkdir()
+        (root / "build" / "out.py").write_text("")
+
+
+def spec_walk(
+    root: Path, specs: List[GitIgnoreSpec] = []
+) -> Generator[Path, None, None]:
+    """Walk matching every path against every spec, as walk_with_gitignore used to."""
+    gitignore = root / ".gitignore"
+    if gitignore.exists():
+        specs = [*specs, GitIgnoreSpec.from_lines(gitignore.read_text().splitlines())]
+    for name in os.listdir(root):
+        path = root / name
+        if match_path_to_specs(path, specs):
+            continue
+        if path.is_dir():
+            yield from spec_walk(path, specs)
+        elif name != ".gitignore":
+            yield path
+
+
+def best_of(runs: int, walk: Callable[[], Iterable[Path]]) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in walk():
+            pass
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--width", type=int, default=3)
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_tree(root, args.depth, args.width, args.files)
+        files = sorted(walk_with_gitignore(root))
+        assert files == sorted(spec_walk(root))
+        specs = best_of(args.runs, lambda: spec_walk(root))
+        compiled = best_of(args.runs, lambda: walk_with_gitignore(root))
+    print(f"{len(files)} files, depth {args.depth}")
+    print(f"match_path_to_specs: {specs * 1000:.1f} ms")
+    print(f"IgnoreMatcher:       {compiled * 1000:.1f} ms ({specs / compiled:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
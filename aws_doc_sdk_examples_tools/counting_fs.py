@@ -0,0 +1,197 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Count the calls, paths, bytes and time each phase of a run spends in its Fs, so
+I/O regressions show up in reports.
+"""
+
+import json
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+)
+
+from .fs import Buffer, Fs, Stat
+from .phases import current_phase
+
+# Upper bounds in seconds of the latency histogram buckets. The last bucket has none.
+LATENCY_BUCKETS = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+LATENCY_LABELS = ("<10us", "<100us", "<1ms", "<10ms", "<100ms", "<1s", ">=1s")
+
+
+@dataclass
+class MethodStats:
+    calls: int = 0
+    # Paths asked for, which is more than calls for batch methods and glob.
+    paths: int = 0
+    # Length of what was read: bytes for read_bytes and mmap, characters for text.
+    bytes: int = 0
+    seconds: float = 0.0
+    # Calls by latency, in LATENCY_BUCKETS.
+    latency: List[int] = field(default_factory=lambda: [0] * len(LATENCY_LABELS))
+
+    def record(self, paths: int, size: int, seconds: float):
+        self.calls += 1
+        self.paths += paths
+        self.bytes += size
+        self.seconds += seconds
+        bucket = 0
+        while bucket < len(LATENCY_BUCKETS) and seconds >= LATENCY_BUCKETS[bucket]:
+            bucket += 1
+        self.latency[bucket] += 1
+
+
+class CountingFs(Fs):
+    """
+    Wraps another Fs, recording each method's calls against the current phase.
+    Wrap the Fs that does the I/O, inside any CachingFs, to count what reaches it.
+    """
+
+    def __init__(self, fs: Fs):
+        self.fs = fs
+        self.stats: Dict[Tuple[str, str], MethodStats] = {}
+        self._lock = Lock()
+
+    def _record(self, method: str, paths: int, size: int, start: float):
+        seconds = perf_counter() - start
+        key = (current_phase.get(), method)
+        with self._lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = MethodStats()
+            stats.record(paths, size, seconds)
+
+    def glob(self, path: Path, glob: str) -> Generator[Path, None, None]:
+        start = perf_counter()
+        paths = [*self.fs.glob(path, glob)]
+        self._record("glob", len(paths), 0, start)
+        yield from paths
+
+    def read(self, path: Path) -> str:
+        start = perf_counter()
+        content = self.fs.read(path)
+        self._record("read", 1, len(content), start)
+        return content
+
+    def readlines(self, path: Path, encoding: str = "utf-8") -> List[str]:
+        start = perf_counter()
+        lines = self.fs.readlines(path, encoding)
+        self._record("readlines", 1, sum(len(line) for line in lines), start)
+        return lines
+
+    def read_bytes(self, path: Path) -> bytes:
+        start = perf_counter()
+        content = self.fs.read_bytes(path)
+        self._record("read_bytes", 1, len(content), start)
+        return content
+
+    @contextmanager
+    def mmap(self, path: Path) -> Iterator[Buffer]:
+        start = perf_counter()
+        with self.fs.mmap(path) as buffer:
+            # Mapping is lazy, so this counts opening the file, not reading it.
+            self._record("mmap", 1, len(buffer), start)
+            yield buffer
+
+    def write(self, path: Path, content: str):
+        start = perf_counter()
+        self.fs.write(path, content)
+        self._record("write", 1, len(content), start)
+
+    def stat(self, path: Path) -> Stat:
+        start = perf_counter()
+        stat = self.fs.stat(path)
+        self._record("stat", 1, 0, start)
+        return stat
+
+    def mkdir(self, path: Path):
+        start = perf_counter()
+        self.fs.mkdir(path)
+        self._record("mkdir", 1, 0, start)
+
+    def list(self, path: Path) -> List[Path]:
+        start = perf_counter()
+        listing = self.fs.list(path)
+        self._record("list", 1, 0, start)
+        return listing
+
+    def read_many(self, paths: Iterable[Path]) -> List[str]:
+        paths = [*paths]
+        start = perf_counter()
+        contents = self.fs.read_many(paths)
+        size = sum(len(content) for content in contents)
+        self._record("read_many", len(paths), size, start)
+        return contents
+
+    def readlines_many(
+        self, paths: Iterable[Path], encoding: str = "utf-8"
+    ) -> List[List[str]]:
+        paths = [*paths]
+        start = perf_counter()
+        contents = self.fs.readlines_many(paths, encoding)
+        size = sum(len(line) for lines in contents for line in lines)
+        self._record("readlines_many", len(paths), size, start)
+        return contents
+
+    def stat_many(self, paths: Iterable[Path]) -> List[Stat]:
+        paths = [*paths]
+        start = perf_counter()
+        stats = self.fs.stat_many(paths)
+        self._record("stat_many", len(paths), 0, start)
+        return stats
+
+    def list_many(self, paths: Iterable[Path]) -> List[List[Path]]:
+        paths = [*paths]
+        start = perf_counter()
+        listings = self.fs.list_many(paths)
+        self._record("list_many", len(paths), 0, start)
+        return listings
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """The stats of each phase, by method, in the order phases were first seen."""
+        report: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for (phase_name, method), stats in self.stats.items():
+                report.setdefault(phase_name, {})[method] = asdict(stats)
+        return report
+
+    def format_report(self, format: str = "table") -> str:
+        """The report as JSON, or as a table with a row for each phase and method."""
+        report = self.report()
+        if format == "json":
+            return json.dumps(report, indent=2)
+        header = ["phase", "method", "calls", "paths", "bytes", "seconds"]
+        rows = [header + [*LATENCY_LABELS]]
+        for phase_name, methods in report.items():
+            for method, stats in methods.items():
+                rows.append(
+                    [
+                        phase_name,
+                        method,
+                        str(stats["calls"]),
+                        str(stats["paths"]),
+                        str(stats["bytes"]),
+                        f"{stats['seconds']:.3f}",
+                        *(str(count) for count in stats["latency"]),
+                    ]
+                )
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        lines = []
+        for row in rows:
+            cells = [
+                cell.ljust(width) if i < 2 else cell.rjust(width)
+                for i, (cell, width) in enumerate(zip(row, widths))
+            ]
+            lines.append("  ".join(cells).rstrip())
+        return "\n".join(lines)
@@ -0,0 +1,66 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+from pathlib import Path
+
+from .counting_fs import CountingFs, MethodStats
+from .doc_gen import DocGen
+from .fs import CachingFs, PathFs, RecordFs
+from .phases import phase
+
+
+def test_counting_fs_phases():
+    fs = CountingFs(
+        RecordFs({Path("root/a.txt"): "hello\n", Path("root/b.txt"): "world\n"})
+    )
+
+    fs.read(Path("root/a.txt"))
+    with phase("load"):
+        fs.read_many([Path("root/a.txt"), Path("root/b.txt")])
+        fs.stat(Path("root"))
+        with phase("nested"):
+            fs.list(Path("root"))
+        fs.readlines(Path("root/b.txt"))
+
+    report = fs.report()
+    assert [*report] == ["other", "load", "nested"]
+    assert report["other"]["read"]["bytes"] == 6
+    assert report["load"]["read_many"]["calls"] == 1
+    assert report["load"]["read_many"]["paths"] == 2
+    assert report["load"]["read_many"]["bytes"] == 12
+    assert report["load"]["readlines"]["bytes"] == 6
+    assert [*report["nested"]] == ["list"]
+    assert sum(report["load"]["stat"]["latency"]) == 1
+
+    assert json.loads(fs.format_report("json")) == report
+    table = fs.format_report().splitlines()
+    assert table[0].split()[:6] == [
+        "phase",
+        "method",
+        "calls",
+        "paths",
+        "bytes",
+        "seconds",
+    ]
+    assert len(table) == 6
+
+
+def test_method_stats_latency_buckets():
+    stats = MethodStats()
+    for seconds in [0.000001, 0.00005, 0.5, 2.0]:
+        stats.record(1, 0, seconds)
+    assert stats.latency == [1, 1, 0, 0, 0, 1, 1]
+    assert stats.calls == 4
+
+
+def test_doc_gen_phases():
+    root = Path(__file__).parent / "test_resources" / "doc_gen_test"
+    counting = CountingFs(PathFs())
+    doc_gen = DocGen.from_root(root, fs=CachingFs(counting))
+    doc_gen.collect_snippets(root)
+    doc_gen.validate()
+
+    report = counting.report()
+    assert [*report] == ["config", "metadata", "snippets", "metadata validation"]
+    assert report["metadata"]["read_many"]["paths"] > 0
@@ -5,10 +5,10 @@ import yaml
 import json
 
 from collections import defaultdict
-from dataclasses import dataclass, field, fields, is_dataclass, asdict
-from functools import reduce
+from dataclasses import dataclass, field, fields, is_dataclass
+from functools import lru_cache, reduce
 from pathlib import Path
-from typing import Dict, Iterable, Optional, Set, Tuple, List, Any
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple, List, Any
 from yaml.parser import ParserError
 
 from yaml import YAMLError
@@ -38,6 +38,7 @@ from .metadata_validator import validate_metadata
 from .project_validator import ValidationConfig
 from .sdks import Sdk, parse as parse_sdks
 from .services import Service, parse as parse_services
+from .timings import Timings
 from .snippets import (
     Snippet,
     collect_snippets,
@@ -69,21 +70,37 @@ class DocGen:
     examples: Dict[str, Example] = field(default_factory=dict)
     cross_blocks: Set[str] = field(default_factory=set)
     _loaded: Set[Path] = field(default_factory=set, init=False)
+    # Parsed YAML of loaded metadata and config files, reused for schema validation
+    # when _keep_documents is set, and dropped once validate() has run. Neither is
+    # serialized by DocGenEncoder.
+    _documents: Dict[Path, Any] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _keep_documents: bool = field(default=False, init=False, repr=False, compare=False)
+    # Time spent in each phase. This is not serialized by DocGenEncoder either.
+    timings: Timings = field(
+        default_factory=Timings, init=False, repr=False, compare=False
+    )
 
     def collect_snippets(
-        self, snippets_root: Optional[Path] = None, prefix: Optional[str] = None
+        self,
+        snippets_root: Optional[Path] = None,
+        prefix: Optional[str] = None,
+        files: Optional[Iterable[Path]] = None,
     ):
         prefix = prefix or ""
         snippets_root = snippets_root or self.root
-        snippets, errs = collect_snippets(snippets_root, fs=self.fs)
-        collect_snippet_files(
-            self.examples.values(),
-            prefix=prefix,
-            snippets=snippets,
-            errors=errs,
-            root=self.root,
-            fs=self.fs,
-        )
+        with self.timings.span("snippets") as span:
+            snippets, errs = collect_snippets(snippets_root, fs=self.fs, files=files)
+            collect_snippet_files(
+                self.examples.values(),
+                prefix=prefix,
+                snippets=snippets,
+                errors=errs,
+                root=self.root,
+                fs=self.fs,
+            )
+            span.items += len(snippets)
         self.snippets = snippets
         self.errors.extend(errs)
 
@@ -98,12 +115,16 @@ class DocGen:
         return expand_all_entities(text, self.entities)
 
     def expand_entity_fields(self, obj: object):
+        with self.timings.span("expand entities"):
+            self._expand_entity_fields(obj)
+
+    def _expand_entity_fields(self, obj: object):
         if isinstance(obj, list):
             for o in obj:
-                self.expand_entity_fields(o)
+                self._expand_entity_fields(o)
         if isinstance(obj, dict):
             for val in obj.values():
-                self.expand_entity_fields(val)
+                self._expand_entity_fields(val)
         if is_dataclass(obj) and not isinstance(obj, type):
             for f in fields(obj):
                 val = getattr(obj, f.name)
@@ -113,7 +134,7 @@ class DocGen:
                         self.errors.extend(errs)
                     else:
                         setattr(obj, f.name, expanded)
-                self.expand_entity_fields(val)
+                self._expand_entity_fields(val)
 
     def merge(self, other: "DocGen") -> MetadataErrors:
         """Merge fields from other into self, prioritizing self fields."""
@@ -162,6 +183,11 @@ class DocGen:
         for name, category in other.categories.items():
             if name not in self.categories:
                 self.categories[name] = category
+        if self._keep_documents:
+            for path, document in other._documents.items():
+                self._documents.setdefault(path, document)
+
+        self.timings.merge(other.timings)
 
         return warnings
 
@@ -175,15 +201,26 @@ class DocGen:
 
     @classmethod
     def empty(
-        cls, validation: ValidationConfig = ValidationConfig(), fs: Fs = PathFs()
+        cls,
+        validation: ValidationConfig = ValidationConfig(),
+        fs: Fs = PathFs(),
+        keep_documents: bool = False,
     ) -> "DocGen":
-        return DocGen(
+        """
+        With keep_documents, the YAML of loaded files is kept until validate() runs,
+        so validation doesn't parse it again. Set it only when validate() will run.
+        """
+        doc_gen = DocGen(
             root=Path("/"), errors=MetadataErrors(), validation=validation, fs=fs
         )
+        doc_gen._keep_documents = keep_documents
+        return doc_gen
 
     @classmethod
-    def default(cls) -> "DocGen":
-        return DocGen.empty().for_root(Path(__file__).parent, incremental=True)
+    def default(cls, fs: Fs = PathFs(), keep_documents: bool = False) -> "DocGen":
+        return DocGen.empty(fs=fs, keep_documents=keep_documents).for_root(
+            Path(__file__).parent, incremental=True
+        )
 
     def clone(self) -> "DocGen":
         return DocGen(
@@ -208,8 +245,9 @@ class DocGen:
         config = config or Path(__file__).parent / "config"
 
         doc_gen = DocGen.empty(fs=self.fs)
-        parse_config(doc_gen, root, config, self.validation.strict_titles)
-        self.merge(doc_gen)
+        with self.timings.span("config"):
+            parse_config(doc_gen, root, config, self.validation.strict_titles)
+            self.merge(doc_gen)
 
         if not incremental:
             self.find_and_process_metadata(root / ".doc_gen/metadata")
@@ -217,17 +255,28 @@ class DocGen:
         return self
 
     def find_and_process_metadata(self, metadata_path: Path):
-        for path in self.fs.glob(metadata_path, "*_metadata.yaml"):
-            self.process_metadata(path)
-
-    def process_metadata(self, path: Path) -> "DocGen":
+        with self.timings.span("metadata") as span:
+            paths = [
+                path
+                for path in self.fs.glob(metadata_path, "*_metadata.yaml")
+                if path not in self._loaded
+            ]
+            for path, content in zip(paths, self.fs.read_many(paths)):
+                self.process_metadata(path, content)
+            span.items += len(paths)
+
+    def process_metadata(self, path: Path, content: Optional[str] = None) -> "DocGen":
         if path in self._loaded:
             return self
         try:
-            content = self.fs.read(path)
+            if content is None:
+                content = self.fs.read(path)
+            document = yaml.safe_load(content)
+            if self._keep_documents:
+                self._documents[path] = document
             examples, errs = parse_examples(
                 path,
-                yaml.safe_load(content),
+                document,
                 self.sdks,
                 self.services,
                 self.standard_categories,
@@ -255,12 +304,20 @@ class DocGen:
         validation: ValidationConfig = ValidationConfig(),
         incremental: bool = False,
         fs: Fs = PathFs(),
+        keep_documents: bool = False,
     ) -> "DocGen":
-        return DocGen.empty(validation=validation, fs=fs).for_root(
-            root, config, incremental=incremental
-        )
-
-    def validate(self):
+        return DocGen.empty(
+            validation=validation, fs=fs, keep_documents=keep_documents
+        ).for_root(root, config, incremental=incremental)
+
+    def validate(self, metadata_files: Optional[Iterable[Path]] = None):
+        with self.timings.span("metadata validation") as span:
+            self._validate(metadata_files)
+            span.items += len(self.examples)
+        # Later validations read files again, instead of keeping all of them.
+        self._documents.clear()
+
+    def _validate(self, metadata_files: Optional[Iterable[Path]]):
         for sdk in self.sdks.values():
             sdk.validate(self.errors)
         for service in self.services.values():
@@ -268,8 +325,15 @@ class DocGen:
         for category in self.categories.values():
             category.validate(self.errors)
         for example in self.examples.values():
-            example.validate(self.errors, self.services, self.root)
-        validate_metadata(self.root, self.validation.strict_titles, self.errors)
+            example.validate(self.errors, self.services, self.root, self.fs)
+        validate_metadata(
+            self.root,
+            self.validation.strict_titles,
+            self.errors,
+            metadata_files,
+            self._documents,
+            self.fs,
+        )
         validate_no_duplicate_api_examples(self.examples.values(), self.errors)
         validate_snippets(
             [*self.examples.values()],
@@ -280,6 +344,11 @@ class DocGen:
         )
 
     def fill_missing_fields(self):
+        with self.timings.span("fill missing fields") as span:
+            self._fill_missing_fields()
+            span.items += len(self.examples)
+
+    def _fill_missing_fields(self):
         def safe_split_id(ex_id: str) -> Tuple[str, str]:
             if "_" in example.id:
                 svc, act = ex_id.split("_", 1)
@@ -342,29 +411,65 @@ class DocGen:
 # and arguably not useful either.
 class DocGenEncoder(json.JSONEncoder):
     def default(self, o):
-        if is_dataclass(o) and not isinstance(o, type):
-            return asdict(o)
+        serialize = serializer(type(o))
+        if serialize is None:
+            return super().default(o)
+        return serialize(o)
+
+
+@lru_cache(maxsize=None)
+def serializer(cls: type) -> Optional[Callable[[Any], Any]]:
+    """
+    The function DocGenEncoder turns instances of cls into JSON with, made once per
+    class, or None if they can't be. Dataclasses become dicts of their fields, left
+    as they are for the encoder to turn into JSON in turn, so nothing is copied.
+    """
+    if issubclass(cls, DocGen):
+        # Raw YAML documents are only kept for validation, and timings vary.
+        return field_serializer(
+            cls,
+            [
+                f.name
+                for f in fields(cls)
+                if f.name not in ("_documents", "_keep_documents", "timings")
+            ],
+        )
+
+    if is_dataclass(cls):
+        return field_serializer(cls, [f.name for f in fields(cls)])
+
+    if issubclass(cls, Path):
+        # Strip out paths to prevent leaking environment data.
+        return lambda o: o.name
+
+    if issubclass(cls, MetadataErrors):
+        return lambda o: {"__metadata_errors__": [*o]}
+
+    if issubclass(cls, EntityErrors):
+        return lambda o: {
+            "__entity_errors__": [{error.entity: error.message()} for error in o]
+        }
+
+    if issubclass(cls, Fs):
+        # Don't serialize filesystem objects for security
+        return lambda o: {}
 
-        if isinstance(o, Path):
-            # Strip out paths to prevent leaking environment data.
-            return o.name
+    if issubclass(cls, set):
+        return lambda o: {"__set__": list(o)}
 
-        if isinstance(o, MetadataErrors):
-            return {"__metadata_errors__": [asdict(error) for error in o]}
+    return None
 
-        if isinstance(o, EntityErrors):
-            return {
-                "__entity_errors__": [{error.entity: error.message()} for error in o]
-            }
 
-        if isinstance(o, Fs):
-            # Don't serialize filesystem objects for security
-            return {}
+def field_serializer(cls: type, names: List[str]) -> Callable[[Any], Dict[str, Any]]:
+    """A function returning the named fields of an instance of cls, as a dict."""
+    # Looked up once, rather than asking fields() for them on every instance.
+    field_names = tuple(names)
 
-        if isinstance(o, set):
-            return {"__set__": list(o)}
+    def serialize(o: Any) -> Dict[str, Any]:
+        return {name: getattr(o, name) for name in field_names}
 
-        return super().default(o)
+    serialize.__qualname__ = f"serialize_{cls.__name__}"
+    return serialize
 
 
 def parse_config(doc_gen: DocGen, root: Path, config: Path, strict: bool):
@@ -381,6 +486,7 @@ def parse_config(doc_gen: DocGen, root: Path, config: Path, strict: bool):
         sdk_path = config / "sdks.yaml"
         content = doc_gen.fs.read(sdk_path)
         meta = yaml.safe_load(content)
+        doc_gen._documents[sdk_path] = meta
         sdks, errs = parse_sdks(sdk_path, meta, strict)
         doc_gen.sdks = sdks
         doc_gen.errors.extend(errs)
@@ -391,6 +497,7 @@ def parse_config(doc_gen: DocGen, root: Path, config: Path, strict: bool):
         services_path = config / "services.yaml"
         content = doc_gen.fs.read(services_path)
         meta = yaml.safe_load(content)
+        doc_gen._documents[services_path] = meta
         services, service_errors = parse_services(services_path, meta)
         doc_gen.services = services
         for service in doc_gen.services.values():
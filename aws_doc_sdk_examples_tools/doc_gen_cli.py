@@ -1,62 +1,131 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
-import json
 from argparse import ArgumentParser
 from pathlib import Path
-from typing import List
+from typing import Iterator, List, TextIO, Tuple
 import logging
+import os
+from contextlib import ExitStack, contextmanager
 
+from .archive_fs import open_archive
+from .counting_fs import CountingFs
+from .memory import MemoryReport
 from .doc_gen import DocGen, DocGenEncoder
+from .fs import Fs, PathFs, caching_fs
+from .json_writer import dump
+from .profiling import profiled
 
 logging.basicConfig(level=logging.INFO)
 
 
+def open_roots(roots: List[str], fs: Fs, archives: ExitStack) -> Tuple[List[str], Fs]:
+    """
+    Open the roots that are zip or tar archives, to be closed with archives. Returns
+    the roots with each archive replaced by the tree inside it, and an Fs that serves
+    all of them.
+    """
+    opened = []
+    for root in roots:
+        archive = open_archive(Path(root), fallback=fs)
+        if archive is None:
+            opened.append(root)
+        else:
+            fs = archives.enter_context(archive)
+            opened.append(str(archive.root))
+    return opened, fs
+
+
 def merge_roots(doc_gen: DocGen, roots: List[str]):
     for root in roots:
-        unmerged_doc_gen = DocGen.from_root(Path(root))
+        unmerged_doc_gen = DocGen.from_root(
+            Path(root), fs=doc_gen.fs, keep_documents=doc_gen._keep_documents
+        )
         doc_gen.merge(unmerged_doc_gen)
 
 
-def write_doc_gen(doc_gen: DocGen, json_out: str):
-    serialized = json.dumps(doc_gen, cls=DocGenEncoder)
+@contextmanager
+def open_replacing(path: str) -> Iterator[TextIO]:
+    """
+    Open a file to write in place of path, which replaces path once the with block
+    succeeds. If it fails, path is left as it was rather than half written.
+    """
+    target = Path(path)
+    tmp = target.with_name(f".{target.name}.tmp")
+    try:
+        with open(tmp, "w") as out:
+            yield out
+        os.replace(tmp, target)
+    finally:
+        tmp.unlink(missing_ok=True)
 
-    with open(json_out, "w") as out:
-        out.write(serialized)
+
+def write_doc_gen(doc_gen: DocGen, json_out: str):
+    # Each example is written as it's encoded, so this times writing too.
+    with doc_gen.timings.span("serialize") as span, open_replacing(json_out) as out:
+        span.items += dump(doc_gen, out, DocGenEncoder())
 
 
 def write_snippets(doc_gen: DocGen, roots: List[str], snippets_out: str):
     for root in roots:
         doc_gen.collect_snippets(Path(root))
 
-    serialized_snippets = json.dumps(
-        {
-            "snippets": doc_gen.snippets,
-            "snippet_files": doc_gen.snippet_files,
-        },
-        cls=DocGenEncoder,
-    )
-    with open(snippets_out, "w") as out:
-        out.write(serialized_snippets)
+    with doc_gen.timings.span("serialize snippets") as span, open_replacing(
+        snippets_out
+    ) as out:
+        span.items += dump(
+            {
+                "snippets": doc_gen.snippets,
+                "snippet_files": doc_gen.snippet_files,
+            },
+            out,
+            DocGenEncoder(),
+        )
 
 
 def build_doc_gen(args):
-    doc_gen = DocGen.empty()
-    merge_roots(doc_gen, args.from_root)
-    doc_gen.validate()
-    doc_gen.fill_missing_fields()
-
-    if not args.skip_entity_expansion:
-        doc_gen.expand_entity_fields(doc_gen)
-
-    if args.strict and doc_gen.errors:
-        logging.error("Errors found in metadata: %s", doc_gen.errors)
-        exit(1)
-
-    if args.write_snippets:
-        write_snippets(doc_gen, args.from_root, args.write_snippets)
-
-    write_doc_gen(doc_gen, args.write_json)
+    # Stats, listings and file contents are cached, unless turned off.
+    no_fs_cache = getattr(args, "no_fs_cache", False)
+    cache_contents = getattr(args, "cache_contents", False)
+    io_report = getattr(args, "io_report", None)
+    memory = MemoryReport() if getattr(args, "memory_report", False) else None
+    # Archives are closed once the DocGen has been written.
+    with ExitStack() as stack:
+        roots, fs = open_roots(args.from_root, PathFs(), stack)
+        counting = CountingFs(fs) if io_report else None
+        if counting is not None:
+            fs = counting
+        if memory is not None:
+            stack.enter_context(memory.tracing())
+        # Validation reuses the parsed metadata, then drops it.
+        doc_gen = DocGen.empty(
+            fs=fs if no_fs_cache else caching_fs(fs, cache_contents),
+            keep_documents=True,
+        )
+        merge_roots(doc_gen, roots)
+        doc_gen.validate()
+        doc_gen.fill_missing_fields()
+
+        if not args.skip_entity_expansion:
+            doc_gen.expand_entity_fields(doc_gen)
+
+        if args.strict and doc_gen.errors:
+            logging.error("Errors found in metadata: %s", doc_gen.errors)
+            exit(1)
+
+        if args.write_snippets:
+            write_snippets(doc_gen, roots, args.write_snippets)
+
+        write_doc_gen(doc_gen, args.write_json)
+
+    if memory is not None:
+        memory.retain_doc_gen(doc_gen)
+        print(memory.format())
+    if counting is not None:
+        print(counting.format_report(io_report))
+    timings = getattr(args, "timings", None)
+    if timings:
+        print(doc_gen.timings.format(timings))
 
     return doc_gen
 
@@ -69,7 +138,7 @@ def main():
         nargs="+",
         required=True,
         type=str,
-        help="Generate from a path. Expects a path to a directory with a .doc_gen sub-directory.",
+        help="Generate from a path. Expects a path to a directory with a .doc_gen sub-directory, or a zip or tar archive of one.",
     )
     parser.add_argument(
         "--write-json",
@@ -96,8 +165,56 @@ def main():
         help="Do not expand entities. Entities are expanded by default.",
     )
 
+    parser.add_argument(
+        "--no-fs-cache",
+        action="store_true",
+        help="Stat, list and read files every time they are needed, instead of caching them for the run.",
+    )
+    parser.add_argument(
+        "--cache-contents",
+        action="store_true",
+        help="Keep up to 256 MiB of file contents for the run, instead of 32 MiB.",
+    )
+
+    parser.add_argument(
+        "--io-report",
+        nargs="?",
+        const="table",
+        choices=["table", "json"],
+        help="At the end, print the file system calls, paths, bytes and latencies of each phase, as a table or as JSON.",
+    )
+
+    parser.add_argument(
+        "--timings",
+        nargs="?",
+        const="table",
+        choices=["table", "jsonl"],
+        help="At the end, print the wall time, CPU time and items of each phase, as a table or as JSON lines.",
+    )
+
+    parser.add_argument(
+        "--memory-report",
+        action="store_true",
+        help="At the end, print the memory each phase allocated and kept, its top allocation sites, and the size of what the DocGen holds.",
+    )
+
+    parser.add_argument(
+        "--profile-out",
+        metavar="PATH",
+        help="Profile the run with cProfile, writing pstats to PATH and collapsed stacks for flame graphs to PATH.collapsed.",
+    )
+
+    parser.add_argument(
+        "--profile-phase",
+        metavar="PHASE",
+        help="With --profile-out, only profile this phase, such as snippets.",
+    )
+
     args = parser.parse_args()
-    build_doc_gen(args)
+    with profiled(
+        getattr(args, "profile_out", None), getattr(args, "profile_phase", None)
+    ):
+        build_doc_gen(args)
 
 
 if __name__ == "__main__":
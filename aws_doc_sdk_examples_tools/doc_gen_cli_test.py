@@ -1,11 +1,14 @@
 import pytest
+import zipfile
+from contextlib import ExitStack
 from unittest.mock import patch, mock_open, MagicMock
 from argparse import Namespace
 from pathlib import Path
 
 from .categories import Category
 from .doc_gen import DocGen, MetadataError, Example
-from .doc_gen_cli import main
+from .doc_gen_cli import main, open_replacing, open_roots
+from .fs import PathFs
 from .metadata import DocFilenames, Language, SDKPageVersion, Version
 from .sdks import Sdk, SdkVersion
 from .services import Service
@@ -78,9 +81,11 @@ def patched_environment(mock_doc_gen):
     with patch("argparse.ArgumentParser.parse_args") as mock_parse_args, patch(
         "aws_doc_sdk_examples_tools.doc_gen.DocGen.empty", return_value=mock_doc_gen
     ), patch("aws_doc_sdk_examples_tools.doc_gen.DocGen.from_root"), patch(
-        "json.dumps"
+        "aws_doc_sdk_examples_tools.doc_gen_cli.dump", return_value=0
     ) as mock_json_dump, patch(
         "builtins.open", mock_open()
+    ), patch(
+        "aws_doc_sdk_examples_tools.doc_gen_cli.os.replace"
     ):
         yield mock_parse_args, mock_json_dump
 
@@ -140,3 +145,33 @@ def test_default_entity_expansion(patched_environment):
         mock_expand_entities.return_value = None, []
         main()
         assert mock_expand_entities.called
+
+
+def test_open_roots_closes_archives(tmp_path: Path):
+    archive = tmp_path / "root.zip"
+    with zipfile.ZipFile(archive, "w") as out:
+        out.writestr("root/.doc_gen/metadata/a_metadata.yaml", "")
+
+    with ExitStack() as stack:
+        roots, fs = open_roots([str(tmp_path / "plain"), str(archive)], PathFs(), stack)
+        assert roots == [str(tmp_path / "plain"), str(archive / "root")]
+        assert fs.read(archive / "root/.doc_gen/metadata/a_metadata.yaml") == ""
+
+    with pytest.raises(ValueError):
+        fs.read(archive / "root/.doc_gen/metadata/a_metadata.yaml")
+
+
+def test_open_replacing_keeps_the_old_file_on_failure(tmp_path: Path):
+    out = tmp_path / "doc_gen.json"
+    out.write_text("old")
+
+    with pytest.raises(RuntimeError):
+        with open_replacing(str(out)) as file:
+            file.write("half")
+            raise RuntimeError("encoding failed")
+    assert out.read_text() == "old"
+
+    with open_replacing(str(out)) as file:
+        file.write("new")
+    assert out.read_text() == "new"
+    assert [*tmp_path.iterdir()] == [out]
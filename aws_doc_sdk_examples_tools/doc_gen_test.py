@@ -6,11 +6,12 @@ Test for that parts of DocGen that aren't file I/O.
 """
 
 import pytest
+from dataclasses import asdict
 from pathlib import Path
 import json
 
 from .categories import Category, TitleInfo
-from .doc_gen import DocGen, DocGenEncoder
+from .doc_gen import DocGen, DocGenEncoder, serializer
 from .metadata import Example
 from .metadata_errors import (
     MetadataErrors,
@@ -121,6 +122,19 @@ def test_incremental():
     assert len(doc_gen.examples) == 6
 
 
+def test_keep_documents():
+    root = Path(__file__).parent / "test_resources" / "doc_gen_test"
+    metadata = root / ".doc_gen" / "metadata" / "aws_entity_metadata.yaml"
+
+    doc_gen = DocGen.from_root(root)
+    assert doc_gen._documents == {}
+
+    doc_gen = DocGen.from_root(root, keep_documents=True)
+    assert metadata in doc_gen._documents
+    doc_gen.validate()
+    assert doc_gen._documents == {}
+
+
 @pytest.fixture
 def sample_doc_gen() -> DocGen:
     metadata_errors = MetadataErrors()
@@ -283,6 +297,28 @@ def test_doc_gen_encoder(sample_doc_gen: DocGen):
     }
 
 
+def test_doc_gen_encoder_serializers(sample_doc_gen: DocGen):
+    example = sample_doc_gen.examples["s3_PutObject"]
+    assert serializer(Example) is serializer(Example)
+
+    # Fields are returned as they are, not copied.
+    serialized = DocGenEncoder().default(example)
+    assert serialized["services"] is example.services
+    assert json.dumps(example, cls=DocGenEncoder) == json.dumps(
+        asdict(example), cls=DocGenEncoder
+    )
+
+    serialized = DocGenEncoder().default(sample_doc_gen)
+    assert "_documents" not in serialized and "timings" not in serialized
+    assert serialized["examples"] is sample_doc_gen.examples
+
+    with pytest.raises(TypeError):
+        json.dumps(object(), cls=DocGenEncoder)
+    # Classes aren't their instances.
+    with pytest.raises(TypeError):
+        json.dumps(Example, cls=DocGenEncoder)
+
+
 def test_doc_gen_load_snippets():
     errors = MetadataErrors()
     doc_gen = DocGen(Path(), errors).for_root(
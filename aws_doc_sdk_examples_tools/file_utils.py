@@ -2,13 +2,31 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import os
+import re
 
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable, Generator, List
+from typing import (
+    AbstractSet,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 from shutil import rmtree
 
 from pathspec import GitIgnoreSpec
-from aws_doc_sdk_examples_tools.fs import Fs, PathFs
+from aws_doc_sdk_examples_tools.fs import CachingFs, Fs, PathFs
+
+# Directory names that are never walked, whatever the .gitignore files say. git
+# never lists its own database.
+ALWAYS_SKIP = frozenset({".git"})
+
+# Named groups in a pattern's regex, which can't repeat in a merged one.
+NAMED_GROUP = re.compile(r"\(\?P<\w+>")
 
 
 def match_path_to_specs(path: Path, specs: List[GitIgnoreSpec]) -> bool:
@@ -21,30 +39,216 @@ def match_path_to_specs(path: Path, specs: List[GitIgnoreSpec]) -> bool:
     return False
 
 
+def compile_spec(spec: GitIgnoreSpec) -> Tuple[Callable[[str], bool], bool]:
+    """
+    A function matching relative paths against one .gitignore, and whether it has
+    negated patterns. Without negations, the first pattern that matches decides, so
+    all of the patterns' regular expressions are merged into one. Any named groups
+    in them are made plain, since only whether they match matters.
+    """
+    patterns = [p for p in spec.patterns if p.include is not None]
+    if any(not p.include for p in patterns):
+        return spec.match_file, True
+    if not patterns:
+        return lambda _: False, False
+    try:
+        merged = re.compile(
+            "|".join(
+                f"(?:{NAMED_GROUP.sub('(?:', p.regex.pattern)})" for p in patterns
+            ),
+            patterns[0].regex.flags,
+        )
+    except re.error:
+        # Patterns this can't merge are matched one at a time.
+        matches = [p.regex.match for p in patterns]
+        return lambda path: any(match(path) for match in matches), False
+    return lambda path: merged.match(path) is not None, False
+
+
+@dataclass(frozen=True)
+class IgnoreRule:
+    match: Callable[[str], bool]
+    negated: bool
+    # The directory being walked, relative to the directory of the .gitignore.
+    prefix: str = ""
+
+
+class IgnoreMatcher:
+    """
+    The .gitignore rules in effect in one directory. Names in the directory are
+    matched by each .gitignore relative to the directory it is in, as git does.
+    Each .gitignore is compiled once, and shared by the matchers of the directories
+    below it.
+    """
+
+    def __init__(self, rules: Tuple[IgnoreRule, ...] = ()):
+        self.rules = rules
+
+    @classmethod
+    def from_specs(cls, specs: Iterable[GitIgnoreSpec]) -> "IgnoreMatcher":
+        return cls(tuple(IgnoreRule(*compile_spec(spec)) for spec in specs))
+
+    def add(self, lines: List[str]) -> "IgnoreMatcher":
+        """The rules with a .gitignore in this directory added."""
+        spec = GitIgnoreSpec.from_lines(lines)
+        return IgnoreMatcher((*self.rules, IgnoreRule(*compile_spec(spec))))
+
+    def child(self, name: str) -> "IgnoreMatcher":
+        """The rules in effect in the subdirectory name."""
+        return IgnoreMatcher(
+            tuple(
+                IgnoreRule(rule.match, rule.negated, f"{rule.prefix}{name}/")
+                for rule in self.rules
+            )
+        )
+
+    def ignores(self, name: str) -> bool:
+        """Return True if we should skip this entry of the directory."""
+        for rule in self.rules:
+            if rule.match(rule.prefix + name):
+                return True
+        return False
+
+    def ignores_dir(self, name: str) -> bool:
+        """
+        Return True if every path under the subdirectory name would be skipped, so
+        there is no need to walk it. A pattern that matches the directory with a
+        trailing slash, like `build/` or `*.tmp`, matches everything below it too,
+        unless a negated pattern in the same .gitignore could include some of it again.
+        """
+        for rule in self.rules:
+            if not rule.negated and rule.match(f"{rule.prefix}{name}/"):
+                return True
+        return False
+
+
 def walk_with_gitignore(
-    root: Path, specs: List[GitIgnoreSpec] = [], fs: Fs = PathFs()
+    root: Path,
+    specs: List[GitIgnoreSpec] = [],
+    fs: Fs = PathFs(),
+    always_skip: AbstractSet[str] = ALWAYS_SKIP,
 ) -> Generator[Path, None, None]:
     """
     Starting from a root directory, walk the file system yielding a path for each file.
     However, it also reads `.gitignore` files, so that it behaves like `git ls-files`.
     It does not actively use `git ls-files` because it wouldn't catch new files without
     fiddling with a number of flags.
+
+    Directories named in always_skip, or entirely ignored, are not walked at all.
+    specs apply relative to root.
+    """
+    matcher = IgnoreMatcher.from_specs(specs)
+    # Walking a local tree with os.scandir is faster than any cache.
+    if isinstance(fs, PathFs) or (
+        isinstance(fs, CachingFs) and isinstance(fs.fs, PathFs)
+    ):
+        yield from scandir_walk(root, matcher, always_skip)
+    else:
+        yield from fs_walk(root, matcher, fs, always_skip)
+
+
+def fs_walk(
+    root: Path,
+    matcher: IgnoreMatcher,
+    fs: Fs,
+    always_skip: AbstractSet[str] = ALWAYS_SKIP,
+    listing: Optional[List[Path]] = None,
+) -> Generator[Path, None, None]:
+    """
+    walk_with_gitignore for any Fs. The entries of a directory are statted in one
+    batch, and its subdirectories are listed in one batch before walking them.
     """
     gitignore = root / ".gitignore"
     gitignore_stat = fs.stat(gitignore)
     if gitignore_stat.exists:
-        lines = fs.readlines(gitignore)
-        specs = [*specs, GitIgnoreSpec.from_lines(lines)]
-
-    for path in fs.list(root):
-        if not match_path_to_specs(path, specs):
-            path_stat = fs.stat(path)
-            if path_stat.is_dir:
-                yield from walk_with_gitignore(path, specs, fs)
-            else:
+        matcher = matcher.add(fs.readlines(gitignore))
+
+    if listing is None:
+        listing = fs.list(root)
+    paths = [path for path in listing if not matcher.ignores(path.name)]
+    stats = fs.stat_many(paths)
+    dirs = [
+        path
+        for path, path_stat in zip(paths, stats)
+        if path_stat.is_dir
+        and path.name not in always_skip
+        and not matcher.ignores_dir(path.name)
+    ]
+    listings = dict(zip(dirs, fs.list_many(dirs)))
+
+    for path, path_stat in zip(paths, stats):
+        if path_stat.is_dir:
+            if path in listings:
+                yield from fs_walk(
+                    path, matcher.child(path.name), fs, always_skip, listings[path]
+                )
+        else:
+            # Don't yield .gitignore files themselves
+            if path.name != ".gitignore":
+                yield path
+
+
+def scandir_walk(
+    root: Path,
+    matcher: IgnoreMatcher = IgnoreMatcher(),
+    always_skip: AbstractSet[str] = ALWAYS_SKIP,
+) -> Generator[Path, None, None]:
+    """
+    walk_with_gitignore for the local file system. Files are yielded in the same
+    order, but os.scandir's entries already know whether they are directories, and
+    the walk keeps a stack of directories instead of recursing.
+    """
+    stack: List[Tuple[Iterator[os.DirEntry], Path, IgnoreMatcher]] = []
+    entries = scan(root, matcher)
+    if entries is None:
+        return
+    stack.append((iter(entries[0]), root, entries[1]))
+    while stack:
+        it, parent, dir_matcher = stack[-1]
+        for entry in it:
+            name = entry.name
+            if dir_matcher.ignores(name):
+                continue
+            if is_dir(entry):
+                if name in always_skip or dir_matcher.ignores_dir(name):
+                    continue
+                path = parent / name
+                entries = scan(path, dir_matcher.child(name))
+                if entries is not None:
+                    stack.append((iter(entries[0]), path, entries[1]))
+                    break
+            elif name != ".gitignore":
                 # Don't yield .gitignore files themselves
-                if path.name != ".gitignore":
-                    yield path
+                yield parent / name
+        else:
+            stack.pop()
+
+
+def scan(
+    path: Path, matcher: IgnoreMatcher
+) -> Optional[Tuple[List[os.DirEntry], IgnoreMatcher]]:
+    """The entries of a directory, and the rules that apply to them."""
+    if os.path.isfile(path):
+        # Like PathFs.list, a file has no entries.
+        return None
+    with os.scandir(path) as scanner:
+        entries = list(scanner)
+    for entry in entries:
+        if entry.name == ".gitignore" and entry.is_file():
+            with open(entry.path, "r", encoding="utf-8") as file:
+                matcher = matcher.add(file.readlines())
+            break
+    return entries, matcher
+
+
+def is_dir(entry: os.DirEntry) -> bool:
+    """Like PathFs.stat(path).is_dir: anything that exists and isn't a regular file."""
+    if entry.is_dir():
+        return True
+    if entry.is_file():
+        return False
+    # Broken links don't exist, but other special files do.
+    return os.path.exists(entry.path)
 
 
 def get_files(
@@ -5,10 +5,20 @@
 Tests for file_utils.py with filesystem abstraction.
 """
 
+import os
 from pathlib import Path
+from typing import Dict, List
 
-from aws_doc_sdk_examples_tools.fs import RecordFs
-from aws_doc_sdk_examples_tools.file_utils import walk_with_gitignore, get_files
+from pathspec import GitIgnoreSpec
+
+from aws_doc_sdk_examples_tools.fs import PathFs, RecordFs
+from aws_doc_sdk_examples_tools.file_utils import (
+    IgnoreMatcher,
+    compile_spec,
+    match_path_to_specs,
+    walk_with_gitignore,
+    get_files,
+)
 
 
 class TestWalkWithGitignore:
@@ -185,3 +195,164 @@ class TestGetFiles:
             Path("/root/keep.js"),
         ]
         assert sorted(files) == sorted(expected)
+
+
+def recursive_walk(root: Path, specs: List[GitIgnoreSpec] = []):
+    """The original walk_with_gitignore, as a reference."""
+    fs = PathFs()
+    gitignore = root / ".gitignore"
+    if fs.stat(gitignore).exists:
+        specs = [*specs, GitIgnoreSpec.from_lines(fs.readlines(gitignore))]
+    for path in fs.list(root):
+        if not match_path_to_specs(path, specs):
+            if fs.stat(path).is_dir:
+                yield from recursive_walk(path, specs)
+            elif path.name != ".gitignore":
+                yield path
+
+
+def write_tree(root: Path, files: Dict[str, str]):
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+class TestScandirWalk:
+    """Test walk_with_gitignore on the local file system."""
+
+    FILES = {
+        ".gitignore": "build/\n*.tmp\nnode_modules\n",
+        "keep.py": "",
+        "skip.tmp": "",
+        "build/out.py": "",
+        "node_modules/lib/index.js": "",
+        "src/.gitignore": "generated/\n*.gen\n!keep.gen\n",
+        "src/main.py": "",
+        "src/a.gen": "",
+        "src/keep.gen": "",
+        "src/generated/code.py": "",
+        "src/nested/build/deep.py": "",
+        "src/nested/ok.py": "",
+        "src/dir.tmp/inner.py": "",
+    }
+
+    def test_matches_recursive_walk(self, tmp_path: Path):
+        write_tree(tmp_path, self.FILES)
+
+        files = list(walk_with_gitignore(tmp_path, always_skip=frozenset()))
+
+        assert files == list(recursive_walk(tmp_path))
+        assert sorted(files) == [
+            tmp_path / "keep.py",
+            tmp_path / "src/keep.gen",
+            tmp_path / "src/main.py",
+            tmp_path / "src/nested/ok.py",
+        ]
+
+    def test_prunes_ignored_directories(self, tmp_path: Path, monkeypatch):
+        write_tree(tmp_path, self.FILES)
+        scanned: List[str] = []
+        scandir = os.scandir
+
+        def recording_scandir(path):
+            scanned.append(Path(path).relative_to(tmp_path).as_posix())
+            return scandir(path)
+
+        monkeypatch.setattr(os, "scandir", recording_scandir)
+        list(walk_with_gitignore(tmp_path))
+
+        # src/generated is walked, as src/.gitignore has a negated pattern.
+        assert sorted(scanned) == [".", "src", "src/generated", "src/nested"]
+
+    def test_always_skip(self, tmp_path: Path):
+        write_tree(tmp_path, {"a.py": "", ".git/hooks/x.py": "", "vendor/b.py": ""})
+
+        assert sorted(walk_with_gitignore(tmp_path)) == [
+            tmp_path / "a.py",
+            tmp_path / "vendor/b.py",
+        ]
+        assert list(walk_with_gitignore(tmp_path, always_skip={".git", "vendor"})) == [
+            tmp_path / "a.py"
+        ]
+
+
+class TestIgnoreMatcher:
+    """Test matching names relative to each .gitignore."""
+
+    def test_patterns_are_relative_to_their_gitignore(self):
+        fs = RecordFs(
+            {
+                Path("/root/.gitignore"): "/build\nsrc/gen\n",
+                Path("/root/build/out.py"): "",
+                Path("/root/src/gen/code.py"): "",
+                Path("/root/src/main.py"): "",
+                Path("/root/lib/build/keep.py"): "",
+                Path("/root/lib/.gitignore"): "/local.py\n",
+                Path("/root/lib/local.py"): "",
+                Path("/root/lib/nested/local.py"): "",
+            }
+        )
+
+        files = list(walk_with_gitignore(Path("/root"), fs=fs))
+
+        assert sorted(files) == [
+            Path("/root/lib/build/keep.py"),
+            Path("/root/lib/nested/local.py"),
+            Path("/root/src/main.py"),
+        ]
+
+    def test_ignores_dir(self):
+        matcher = IgnoreMatcher().add(["build/\n", "*.log\n"]).child("src")
+
+        assert matcher.ignores("app.log")
+        assert not matcher.ignores("build")
+        assert matcher.ignores_dir("build")
+        assert not matcher.ignores_dir("app")
+
+    def test_negations(self):
+        matcher = IgnoreMatcher().add(["*.log\n", "!keep.log\n"])
+
+        assert matcher.ignores("app.log")
+        assert not matcher.ignores("keep.log")
+        assert not matcher.ignores_dir("logs.log")
+
+    def test_compile_spec_matches_pathspec(self):
+        spec = GitIgnoreSpec.from_lines(
+            [
+                "*.log",
+                "/build",
+                "src/gen",
+                "__pycache__/",
+                "**/tmp/**",
+                "a?c",
+                "[xy].py",
+            ]
+        )
+        paths = [
+            "app.log",
+            "src/app.log",
+            "build",
+            "build/",
+            "src/build",
+            "src/gen",
+            "src/gen/code.py",
+            "lib/src/gen",
+            "__pycache__/",
+            "lib/__pycache__/x.pyc",
+            "__pycache__",
+            "tmp/a",
+            "lib/tmp/a/b",
+            "tmp",
+            "abc",
+            "abbc",
+            "x.py",
+            "z.py",
+            "main.py",
+        ]
+
+        match, negated = compile_spec(spec)
+
+        assert not negated
+        for path in paths:
+            assert match(path) == spec.match_file(path), path
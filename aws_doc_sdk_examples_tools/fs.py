@@ -1,10 +1,42 @@
+import asyncio
+import io
+import mmap as mmap_module
 from abc import ABC, abstractmethod
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from fnmatch import fnmatch
+from functools import lru_cache, partial
+import os
 from os import listdir
 from pathlib import Path
 from stat import S_ISREG
-from typing import Dict, Generator, List
+from threading import RLock
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+T = TypeVar("T")
+# File contents that can be searched with find or a bytes regex without decoding.
+Buffer = Union[bytes, mmap_module.mmap]
+# Files smaller than this are read rather than mapped, which takes fewer syscalls.
+MMAP_MIN_BYTES = 64 * 1024
+# Sorts after every other character, to find the end of a range of prefixed keys.
+MAX_CHAR = chr(0x10FFFF)
 
 
 @dataclass(frozen=True)
@@ -47,6 +79,105 @@ class Fs(ABC):
     def list(self, path: Path) -> List[Path]:
         pass
 
+    def read_bytes(self, path: Path) -> bytes:
+        """The contents of path, undecoded."""
+        return self.read(path).encode("utf-8")
+
+    @contextmanager
+    def mmap(self, path: Path) -> Iterator[Buffer]:
+        """
+        The contents of path as bytes, for searching before decoding any of it.
+        The buffer is only valid inside the with block.
+        """
+        yield self.read_bytes(path)
+
+    # Batch methods return results in the same order as paths. By default they
+    # spread the single path calls over a thread pool, so slow disks and network
+    # file systems serve several paths at once.
+
+    def read_many(self, paths: Iterable[Path]) -> List[str]:
+        return batch(self.read, paths)
+
+    def readlines_many(
+        self, paths: Iterable[Path], encoding: str = "utf-8"
+    ) -> List[List[str]]:
+        return batch(partial(self.readlines, encoding=encoding), paths)
+
+    def stat_many(self, paths: Iterable[Path]) -> List[Stat]:
+        return batch(self.stat, paths)
+
+    def list_many(self, paths: Iterable[Path]) -> List[List[Path]]:
+        return batch(self.list, paths)
+
+    def aio(self) -> "AsyncFs":
+        """This file system, for use from asyncio."""
+        return AsyncFs(self)
+
+
+@lru_cache(maxsize=None)
+def batch_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(thread_name_prefix="fs")
+
+
+def batch(call: Callable[[Path], T], paths: Iterable[Path]) -> List[T]:
+    """Call call with each path on the shared thread pool."""
+    paths = list(paths)
+    if len(paths) < 2:
+        return [call(path) for path in paths]
+    return list(batch_executor().map(call, paths))
+
+
+class AsyncFs:
+    """
+    Awaitable versions of the Fs methods. With threaded, calls run on the default
+    executor so they don't block the event loop; otherwise they are called directly,
+    which suits file systems in memory.
+    """
+
+    def __init__(self, fs: Fs, threaded: bool = True):
+        self.fs = fs
+        self.threaded = threaded
+
+    async def _call(self, call: Callable[..., T], *args: Any) -> T:
+        if not self.threaded:
+            return call(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, call, *args)
+
+    async def read(self, path: Path) -> str:
+        return await self._call(self.fs.read, path)
+
+    async def readlines(self, path: Path, encoding: str = "utf-8") -> List[str]:
+        return await self._call(self.fs.readlines, path, encoding)
+
+    async def write(self, path: Path, content: str):
+        await self._call(self.fs.write, path, content)
+
+    async def stat(self, path: Path) -> Stat:
+        return await self._call(self.fs.stat, path)
+
+    async def mkdir(self, path: Path):
+        await self._call(self.fs.mkdir, path)
+
+    async def list(self, path: Path) -> List[Path]:
+        return await self._call(self.fs.list, path)
+
+    async def glob(self, path: Path, glob: str) -> List[Path]:
+        return await self._call(lambda: list(self.fs.glob(path, glob)))
+
+    async def read_many(self, paths: Iterable[Path]) -> List[str]:
+        return await self._call(self.fs.read_many, list(paths))
+
+    async def readlines_many(
+        self, paths: Iterable[Path], encoding: str = "utf-8"
+    ) -> List[List[str]]:
+        return await self._call(self.fs.readlines_many, list(paths), encoding)
+
+    async def stat_many(self, paths: Iterable[Path]) -> List[Stat]:
+        return await self._call(self.fs.stat_many, list(paths))
+
+    async def list_many(self, paths: Iterable[Path]) -> List[List[Path]]:
+        return await self._call(self.fs.list_many, list(paths))
+
 
 class PathFs(Fs):
     def glob(self, path: Path, glob: str) -> Generator[Path, None, None]:
@@ -74,6 +205,21 @@ class PathFs(Fs):
     def mkdir(self, path: Path):
         path.mkdir(parents=True, exist_ok=True)
 
+    def read_bytes(self, path: Path) -> bytes:
+        return path.read_bytes()
+
+    @contextmanager
+    def mmap(self, path: Path) -> Iterator[Buffer]:
+        with path.open("rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < MMAP_MIN_BYTES:
+                yield file.read()
+                return
+            with mmap_module.mmap(
+                file.fileno(), 0, access=mmap_module.ACCESS_READ
+            ) as mapped:
+                yield mapped
+
     def list(self, path: Path) -> List[Path]:
         if self.stat(path).is_file:
             return []
@@ -81,41 +227,86 @@ class PathFs(Fs):
 
 
 class RecordFs(Fs):
+    """
+    A file system in memory, of file contents by path. The POSIX forms of the paths
+    are kept sorted, so that looking up a directory is a binary search for its
+    prefix rather than a scan of every file. The files are copied from fs, and only
+    change through write, mkdir and delete, which keep the index up to date.
+    """
+
     def __init__(self, fs: Dict[Path, str]):
-        self.fs = fs
+        self._fs = dict(fs)
+        self._paths: Dict[str, Path] = {key.as_posix(): key for key in self._fs}
+        self._sorted: List[str] = sorted(self._paths)
+        # The order paths were added in, which glob keeps.
+        self._order: Dict[str, int] = {key: i for i, key in enumerate(self._paths)}
+        self._added = len(self._order)
+
+    @property
+    def fs(self) -> Mapping[Path, str]:
+        """A read-only view of the file contents by path."""
+        return MappingProxyType(self._fs)
+
+    def _add(self, path: Path):
+        if path not in self._fs:
+            key = path.as_posix()
+            self._paths[key] = path
+            self._order[key] = self._added
+            self._added += 1
+            insort(self._sorted, key)
+
+    def delete(self, path: Path):
+        """Remove the file at path."""
+        del self._fs[path]
+        key = path.as_posix()
+        del self._paths[key]
+        del self._order[key]
+        del self._sorted[bisect_left(self._sorted, key)]
+
+    def _prefixed(self, prefix: str) -> Tuple[int, int]:
+        """The range of sorted keys starting with prefix."""
+        keys = self._sorted
+        return (
+            bisect_left(keys, prefix),
+            bisect_left(keys, prefix + MAX_CHAR),
+        )
+
+    def _has_prefix(self, prefix: str) -> bool:
+        start, end = self._prefixed(prefix)
+        return start < end
 
     def glob(self, path: Path, glob: str) -> Generator[Path, None, None]:
-        path_s = path.as_posix()
-        for key in self.fs.keys():
-            key_s = key.as_posix()
-            if key_s.startswith(path_s):
-                if fnmatch(key_s, glob):
-                    yield key
+        start, end = self._prefixed(path.as_posix())
+        matches = [key for key in self._sorted[start:end] if fnmatch(key, glob)]
+        # Yield in the order the files were added, like a dict.
+        for key in sorted(matches, key=self._order.__getitem__):
+            yield self._paths[key]
 
     def read(self, path: Path) -> str:
-        return self.fs[path]
+        return self._fs[path]
 
     def readlines(self, path: Path, encoding: str = "utf-8") -> List[str]:
-        content = self.fs[path]
+        content = self._fs[path]
         return content.splitlines(keepends=True)
 
     def write(self, path: Path, content: str):
         base = path.parent.as_posix()
-        assert any(
-            [key.as_posix().startswith(base) for key in self.fs]
+        assert self._has_prefix(
+            base
         ), "No parent folder, this will probably fail without a call to mkdir in a real file system!"
-        self.fs[path] = content
+        self._add(path)
+        self._fs[path] = content
 
     def stat(self, path: Path):
-        if path in self.fs:
+        if path in self._fs:
             return Stat(path, True, True)
-        for item in self.fs.keys():
-            if item.as_posix().startswith(path.as_posix()):
-                return Stat(path, True, False)
+        if self._has_prefix(path.as_posix()):
+            return Stat(path, True, False)
         return Stat(path, False, False)
 
     def mkdir(self, path: Path):
-        self.fs.setdefault(path, "")
+        self._add(path)
+        self._fs.setdefault(path, "")
 
     def list(self, path: Path) -> List[Path]:
         # If it's a file, return an empty list
@@ -124,18 +315,219 @@ class RecordFs(Fs):
 
         # Gather all entries that are immediate children of `path`
         prefix = path.as_posix().rstrip("/") + "/"
-        children = set()
-
-        for item in self.fs.keys():
-            item_s = item.as_posix()
-            if item_s.startswith(prefix):
-                # Determine the remainder path after the prefix
-                remainder = item_s[len(prefix) :]
-                # Split off the first component
-                first_part = remainder.split("/", 1)[0]
-                children.add(Path(prefix + first_part))
-
-        return sorted(children)
+        keys = self._sorted
+        index, end = self._prefixed(prefix)
+        children = []
+        while index < end:
+            # Split off the first component of the remainder after the prefix
+            remainder = keys[index][len(prefix) :]
+            first_part, slash, _ = remainder.partition("/")
+            children.append(Path(prefix + first_part))
+            if slash:
+                # Skip the rest of this child's subtree. "0" sorts right after "/".
+                index = bisect_left(keys, f"{prefix}{first_part}0", index, end)
+            else:
+                index += 1
+
+        return sorted(set(children))
+
+    # Everything is in memory, so batches don't need threads.
+
+    def read_many(self, paths: Iterable[Path]) -> List[str]:
+        return [self.read(path) for path in paths]
+
+    def readlines_many(
+        self, paths: Iterable[Path], encoding: str = "utf-8"
+    ) -> List[List[str]]:
+        return [self.readlines(path, encoding) for path in paths]
+
+    def stat_many(self, paths: Iterable[Path]) -> List[Stat]:
+        return [self.stat(path) for path in paths]
+
+    def list_many(self, paths: Iterable[Path]) -> List[List[Path]]:
+        return [self.list(path) for path in paths]
+
+    def aio(self) -> AsyncFs:
+        return AsyncFs(self, threaded=False)
+
+
+# Characters of file contents a CachingFs keeps by default.
+DEFAULT_CACHE_CHARS = 32 * 1024 * 1024
+# Characters of file contents kept with --cache-contents.
+FULL_CACHE_CHARS = 256 * 1024 * 1024
+# The encoding read uses, so readlines in it can share read's cached text.
+READ_ENCODING = "utf-8"
+
+
+class CachingFs(Fs):
+    """
+    Wraps another Fs, remembering the results of stat and list so each path is only
+    fetched once. The text of each file read is kept from its first read, up to
+    max_chars, after which the least recently used is dropped. read, readlines and
+    mmap all use the kept text, so a file read several ways is fetched once. Writes
+    through this Fs invalidate what they change. Call invalidate when files change
+    in other ways.
+    """
+
+    def __init__(self, fs: Fs, max_chars: int = DEFAULT_CACHE_CHARS):
+        self.fs = fs
+        self.max_chars = max_chars
+        self._lock = RLock()
+        self._stats: Dict[Path, Stat] = {}
+        self._lists: Dict[Path, List[Path]] = {}
+        # File text by path and encoding.
+        self._contents: "OrderedDict[Tuple[Path, str], str]" = OrderedDict()
+        self._content_chars = 0
+
+    def invalidate(self, path: Optional[Path] = None):
+        """Forget path, and the listings and stats of its parents. Without path, forget everything."""
+        with self._lock:
+            if path is None:
+                self._stats.clear()
+                self._lists.clear()
+                self._contents.clear()
+                self._content_chars = 0
+                return
+            self._lists.pop(path, None)
+            for item in [path, *path.parents]:
+                self._stats.pop(item, None)
+            self._lists.pop(path.parent, None)
+            for key in [key for key in self._contents if key[0] == path]:
+                self._content_chars -= len(self._contents.pop(key))
+
+    def _cached_content(self, key: Tuple[Path, str]) -> Optional[str]:
+        with self._lock:
+            content = self._contents.get(key)
+            if content is not None:
+                self._contents.move_to_end(key)
+            return content
+
+    def _cache_content(self, key: Tuple[Path, str], content: str):
+        if len(content) > self.max_chars:
+            return
+        with self._lock:
+            if key in self._contents:
+                return
+            self._contents[key] = content
+            self._content_chars += len(content)
+            while self._content_chars > self.max_chars:
+                _, dropped = self._contents.popitem(last=False)
+                self._content_chars -= len(dropped)
+
+    def glob(self, path: Path, glob: str) -> Generator[Path, None, None]:
+        return self.fs.glob(path, glob)
+
+    def read_bytes(self, path: Path) -> bytes:
+        return self.fs.read_bytes(path)
+
+    @contextmanager
+    def mmap(self, path: Path) -> Iterator[Buffer]:
+        # Files scanned are usually read as text later, so read the text once and
+        # scan its encoding. Its newlines are translated, as text reads do.
+        try:
+            content = self.read(path)
+        except UnicodeDecodeError:
+            with self.fs.mmap(path) as buffer:
+                yield buffer
+            return
+        yield content.encode(READ_ENCODING)
+
+    def read(self, path: Path) -> str:
+        content = self._cached_content((path, READ_ENCODING))
+        if content is None:
+            content = self.fs.read(path)
+            self._cache_content((path, READ_ENCODING), content)
+        return content
+
+    def readlines(self, path: Path, encoding: str = "utf-8") -> List[str]:
+        content = self._cached_content((path, encoding))
+        if content is not None:
+            return split_lines(content)
+        lines = self.fs.readlines(path, encoding)
+        self._cache_content((path, encoding), "".join(lines))
+        return lines
+
+    def write(self, path: Path, content: str):
+        self.fs.write(path, content)
+        self.invalidate(path)
+
+    def stat(self, path: Path) -> Stat:
+        stat = self._stats.get(path)
+        if stat is None:
+            stat = self.fs.stat(path)
+            with self._lock:
+                self._stats[path] = stat
+        return stat
+
+    def mkdir(self, path: Path):
+        self.fs.mkdir(path)
+        self.invalidate(path)
+
+    def list(self, path: Path) -> List[Path]:
+        listing = self._lists.get(path)
+        if listing is None:
+            listing = self.fs.list(path)
+            with self._lock:
+                self._lists[path] = listing
+        return [*listing]
+
+    # Batches only ask the wrapped Fs for what isn't cached, in one batch.
+
+    def read_many(self, paths: Iterable[Path]) -> List[str]:
+        paths = [*paths]
+        found = [self._cached_content((path, READ_ENCODING)) for path in paths]
+        missing = [path for path, content in zip(paths, found) if content is None]
+        fetched = dict(zip(missing, self.fs.read_many(missing) if missing else []))
+        for path, content in fetched.items():
+            self._cache_content((path, READ_ENCODING), content)
+        return [
+            fetched[path] if content is None else content
+            for path, content in zip(paths, found)
+        ]
+
+    def readlines_many(
+        self, paths: Iterable[Path], encoding: str = "utf-8"
+    ) -> List[List[str]]:
+        paths = [*paths]
+        found = [self._cached_content((path, encoding)) for path in paths]
+        missing = [path for path, content in zip(paths, found) if content is None]
+        fetched = dict(
+            zip(missing, self.fs.readlines_many(missing, encoding) if missing else [])
+        )
+        for path, lines in fetched.items():
+            self._cache_content((path, encoding), "".join(lines))
+        return [
+            fetched[path] if content is None else split_lines(content)
+            for path, content in zip(paths, found)
+        ]
+
+    def stat_many(self, paths: Iterable[Path]) -> List[Stat]:
+        paths = [*paths]
+        missing = [path for path in paths if path not in self._stats]
+        fetched = self.fs.stat_many(missing) if missing else []
+        with self._lock:
+            self._stats.update(zip(missing, fetched))
+            return [self._stats[path] for path in paths]
+
+    def list_many(self, paths: Iterable[Path]) -> List[List[Path]]:
+        paths = [*paths]
+        missing = [path for path in paths if path not in self._lists]
+        fetched = self.fs.list_many(missing) if missing else []
+        with self._lock:
+            self._lists.update(zip(missing, fetched))
+            return [[*self._lists[path]] for path in paths]
+
+
+def caching_fs(fs: Fs, cache_contents: bool = False) -> CachingFs:
+    """A CachingFs for one run over fs. cache_contents raises its budget for contents."""
+    if cache_contents:
+        return CachingFs(fs, FULL_CACHE_CHARS)
+    return CachingFs(fs)
+
+
+def split_lines(content: str) -> List[str]:
+    """The lines of content, ending in newlines, as a text file's readlines gives them."""
+    return io.StringIO(content).readlines()
 
 
 fs = PathFs()
@@ -5,12 +5,13 @@
 Tests for the Fs interface, particularly the readlines functionality.
 """
 
+import asyncio
 import pytest
 import tempfile
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
-from .fs import Fs, PathFs, RecordFs
+from .fs import MMAP_MIN_BYTES, CachingFs, Fs, PathFs, RecordFs, Stat
 
 
 def assert_readlines_result(fs: Fs, path: Path, expected: List[str]):
@@ -105,3 +106,197 @@ class TestRecordFs:
         for content, expected in test_cases:
             fs = RecordFs({Path("test.txt"): content})
             assert_readlines_result(fs, Path("test.txt"), expected)
+
+
+def make_fs(kind: str, tmp_path: Path) -> Fs:
+    files = {"a.txt": "a\n", "dir/b.txt": "b1\nb2\n", "dir/c.txt": ""}
+    if kind == "record":
+        return RecordFs({tmp_path / name: content for name, content in files.items()})
+    for name, content in files.items():
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text(content)
+    return PathFs()
+
+
+@pytest.mark.parametrize("kind", ["path", "record"])
+def test_batch_methods_match_single_calls(kind: str, tmp_path: Path):
+    fs = make_fs(kind, tmp_path)
+    paths = [tmp_path / "dir/c.txt", tmp_path / "a.txt", tmp_path / "dir/b.txt"]
+
+    assert fs.read_many(paths) == [fs.read(path) for path in paths]
+    assert fs.readlines_many(paths) == [fs.readlines(path) for path in paths]
+    assert fs.stat_many([*paths, tmp_path / "missing"]) == [
+        *(Stat(path, True, True) for path in paths),
+        Stat(tmp_path / "missing", False, False),
+    ]
+    assert [sorted(listing) for listing in fs.list_many([tmp_path / "dir"])] == [
+        [tmp_path / "dir/b.txt", tmp_path / "dir/c.txt"]
+    ]
+
+
+@pytest.mark.parametrize("kind", ["path", "record"])
+def test_async_fs(kind: str, tmp_path: Path):
+    fs = make_fs(kind, tmp_path)
+
+    async def read_all():
+        aio = fs.aio()
+        return await asyncio.gather(
+            aio.read(tmp_path / "a.txt"),
+            aio.readlines_many([tmp_path / "dir/b.txt"]),
+            aio.stat(tmp_path / "dir"),
+        )
+
+    text, lines, stat = asyncio.run(read_all())
+    assert text == "a\n"
+    assert lines == [["b1\n", "b2\n"]]
+    assert stat.is_dir
+
+
+def test_record_fs_index():
+    fs = RecordFs(
+        {
+            Path("/r/b/y_metadata.yaml"): "",
+            Path("/r/a.txt"): "",
+            Path("/r/a/x.py"): "",
+            Path("/r/a/deep/z.py"): "",
+            Path("/r/a0"): "",
+            Path("/r/a_metadata.yaml"): "",
+        }
+    )
+
+    assert fs.list(Path("/r")) == [
+        Path("/r/a"),
+        Path("/r/a.txt"),
+        Path("/r/a0"),
+        Path("/r/a_metadata.yaml"),
+        Path("/r/b"),
+    ]
+    assert fs.list(Path("/r/a")) == [Path("/r/a/deep"), Path("/r/a/x.py")]
+    assert fs.stat(Path("/r/a")).is_dir
+    assert fs.stat(Path("/r/a/x.py")).is_file
+    assert not fs.stat(Path("/r/c")).exists
+    # Files are globbed in the order they were added.
+    assert list(fs.glob(Path("/r"), "*_metadata.yaml")) == [
+        Path("/r/b/y_metadata.yaml"),
+        Path("/r/a_metadata.yaml"),
+    ]
+    assert list(fs.glob(Path("/r/a"), "*.py")) == [
+        Path("/r/a/x.py"),
+        Path("/r/a/deep/z.py"),
+    ]
+
+    fs.write(Path("/r/b/new.py"), "new")
+    fs.write(Path("/r/a/deep/new.py"), "new")
+    assert fs.list(Path("/r/b")) == [Path("/r/b/new.py"), Path("/r/b/y_metadata.yaml")]
+    assert list(fs.glob(Path("/r"), "*.py"))[-2:] == [
+        Path("/r/b/new.py"),
+        Path("/r/a/deep/new.py"),
+    ]
+
+
+def test_record_fs_delete():
+    fs = RecordFs({Path("a/x"): "1", Path("a/y"): "2"})
+
+    fs.delete(Path("a/x"))
+    fs.write(Path("a/z"), "3")
+
+    assert fs.list(Path("a")) == [Path("a/y"), Path("a/z")]
+    assert not fs.stat(Path("a/x")).exists
+    assert fs.stat(Path("a/z")).is_file
+    assert list(fs.glob(Path("a"), "*")) == [Path("a/y"), Path("a/z")]
+    assert dict(fs.fs) == {Path("a/y"): "2", Path("a/z"): "3"}
+    with pytest.raises(TypeError):
+        fs.fs[Path("a/w")] = "4"  # type: ignore[index]
+
+
+class CountingRecordFs(RecordFs):
+    def __init__(self, fs: Dict[Path, str]):
+        super().__init__(fs)
+        self.calls: List[str] = []
+
+    def read(self, path: Path) -> str:
+        self.calls.append(f"read {path}")
+        return super().read(path)
+
+    def readlines(self, path: Path, encoding: str = "utf-8") -> List[str]:
+        self.calls.append(f"readlines {path}")
+        return super().readlines(path, encoding)
+
+    def stat(self, path: Path):
+        self.calls.append(f"stat {path}")
+        return super().stat(path)
+
+
+def test_caching_fs():
+    inner = CountingRecordFs({Path("/r/a.txt"): "a", Path("/r/b.txt"): "bb"})
+    fs = CachingFs(inner, max_chars=2)
+
+    assert fs.read(Path("/r/a.txt")) == "a"
+    assert fs.read_many([Path("/r/a.txt"), Path("/r/b.txt")]) == ["a", "bb"]
+    assert fs.stat(Path("/r")).is_dir
+    assert fs.stat_many([Path("/r"), Path("/r/a.txt")])[1].is_file
+    assert inner.calls == [
+        "read /r/a.txt",
+        "read /r/b.txt",
+        "stat /r",
+        "stat /r/a.txt",
+    ]
+
+    # Reading b.txt went over the budget, so a.txt was dropped.
+    inner.calls.clear()
+    assert fs.read(Path("/r/b.txt")) == "bb"
+    assert fs.read(Path("/r/a.txt")) == "a"
+    assert inner.calls == ["read /r/a.txt"]
+
+    inner.calls.clear()
+    fs.write(Path("/r/a.txt"), "new")
+    assert fs.read(Path("/r/a.txt")) == "new"
+    assert fs.stat(Path("/r")).is_dir
+    assert inner.calls == ["read /r/a.txt", "stat /r"]
+
+    inner.calls.clear()
+    fs.invalidate()
+    fs.stat(Path("/r/b.txt"))
+    assert inner.calls == ["stat /r/b.txt"]
+
+
+def test_caching_fs_shares_read_and_readlines():
+    inner = CountingRecordFs(
+        {Path("/r/a.txt"): "one\ntwo\n", Path("/r/b.txt"): "three\n"}
+    )
+    fs = CachingFs(inner)
+
+    assert fs.read(Path("/r/a.txt")) == "one\ntwo\n"
+    assert fs.readlines(Path("/r/a.txt")) == ["one\n", "two\n"]
+    assert fs.readlines_many([Path("/r/a.txt"), Path("/r/b.txt")]) == [
+        ["one\n", "two\n"],
+        ["three\n"],
+    ]
+    assert fs.read(Path("/r/b.txt")) == "three\n"
+    assert inner.calls == ["read /r/a.txt", "readlines /r/b.txt"]
+
+    # Other encodings are kept apart.
+    inner.calls.clear()
+    assert fs.readlines(Path("/r/a.txt"), "latin-1") == ["one\n", "two\n"]
+    assert inner.calls == ["readlines /r/a.txt"]
+
+
+@pytest.mark.parametrize("size", [20, MMAP_MIN_BYTES + 10])
+def test_path_fs_mmap(size: int, tmp_path: Path):
+    path = tmp_path / "data.txt"
+    content = ("x" * (size - 10) + "snippet-\n").encode("utf-8")
+    path.write_bytes(content)
+    path_fs = PathFs()
+
+    assert path_fs.read_bytes(path) == content
+    with path_fs.mmap(path) as buffer:
+        assert buffer.find(b"snippet-") == size - 10
+        assert buffer[:1] == b"x"
+
+
+def test_record_fs_bytes():
+    record_fs = RecordFs({Path("a.txt"): "caf\u00e9"})
+
+    assert record_fs.read_bytes(Path("a.txt")) == "caf\u00e9".encode("utf-8")
+    with CachingFs(record_fs).mmap(Path("a.txt")) as buffer:
+        assert buffer.find("\u00e9".encode("utf-8")) == 3
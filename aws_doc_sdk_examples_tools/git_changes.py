@@ -0,0 +1,93 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Find the files changed in a git work tree since a base ref, and the files related
+to them, so validation can be limited to what a pull request touches.
+"""
+
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+
+
+class GitError(Exception):
+    pass
+
+
+def git(
+    root: Path, *args: str, input: Optional[bytes] = None, ok: Iterable[int] = (0,)
+) -> bytes:
+    """Run a git command in root, returning its stdout."""
+    result = subprocess.run(
+        ["git", "-C", str(root), *args],
+        input=input,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if result.returncode not in ok:
+        raise GitError(
+            f"git {' '.join(args)} failed: {result.stderr.decode('utf-8', 'replace')}"
+        )
+    return result.stdout
+
+
+def split_paths(root: Path, output: bytes) -> Set[Path]:
+    return {root / name for name in output.decode("utf-8").split("\0") if name}
+
+
+@dataclass
+class ChangedFiles:
+    root: Path
+    ref: str
+    # Files added or modified since ref, including untracked files.
+    changed: Set[Path] = field(default_factory=set)
+    # Files that existed at ref and have since been deleted.
+    deleted: Set[Path] = field(default_factory=set)
+
+    @classmethod
+    def since(cls, root: Path, ref: str) -> "ChangedFiles":
+        """Compare the work tree under root against ref, a local git ref."""
+        diff = ["diff", "--name-only", "-z", "--relative", "--no-renames", ref]
+        changed = split_paths(root, git(root, *diff, "--diff-filter=d"))
+        changed |= split_paths(
+            root, git(root, "ls-files", "-z", "--others", "--exclude-standard")
+        )
+        deleted = split_paths(root, git(root, *diff, "--diff-filter=D"))
+        return cls(root=root, ref=ref, changed=changed, deleted=deleted)
+
+    def show(self, path: Path) -> Optional[str]:
+        """The contents of path at ref, or None if it did not exist there."""
+        try:
+            content = git(self.root, "show", f"{self.ref}:./{self.relative(path)}")
+        except GitError:
+            return None
+        return content.decode("utf-8", "replace")
+
+    def grep(
+        self, patterns: Iterable[str], pathspec: Optional[Path] = None
+    ) -> Set[Path]:
+        """Files in the work tree containing any of the fixed string patterns."""
+        return grep_files(self.root, patterns, pathspec)
+
+    def relative(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
+
+
+def grep_files(
+    root: Path, patterns: Iterable[str], pathspec: Optional[Path] = None
+) -> Set[Path]:
+    """
+    Use git grep to list the files under root, tracked or untracked but not ignored,
+    that contain any of the fixed string patterns.
+    """
+    lines: List[str] = sorted(set(patterns))
+    if not lines:
+        return set()
+    args = ["grep", "-l", "-z", "-F", "--untracked", "-f", "-"]
+    if pathspec is not None:
+        args += ["--", pathspec.relative_to(root).as_posix()]
+    # git grep exits with 1 when nothing matches.
+    output = git(root, *args, input="\n".join(lines).encode("utf-8"), ok=(0, 1))
+    return split_paths(root, output)
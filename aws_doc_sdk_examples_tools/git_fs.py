@@ -0,0 +1,157 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+A read-only file system over a git revision, read from the object database, so
+any commit can be validated or built without checking it out.
+"""
+
+import errno
+import subprocess
+from pathlib import Path
+from threading import Lock, Thread
+from typing import IO, Dict, Iterable, List, Optional
+
+from .archive_fs import ArchiveFs, open_text
+from .fs import Fs, PathFs
+from .git_changes import GitError, git
+
+# git ls-tree modes of entries that aren't regular files or directories.
+SYMLINK_MODE = "120000"
+
+
+class GitTreeFs(ArchiveFs):
+    """
+    The files of rev under repo, served at the paths they would have if rev were
+    checked out there. The tree is indexed once, with git ls-tree, and blobs are read
+    through one long-lived git cat-file --batch process. Batches of reads are sent
+    to it all at once. Paths outside repo are served by fallback.
+    """
+
+    def __init__(
+        self,
+        repo: Path,
+        rev: str = "HEAD",
+        mount: Optional[Path] = None,
+        fallback: Fs = PathFs(),
+    ):
+        super().__init__(repo, mount, fallback)
+        self.rev = rev
+        self._lock = Lock()
+        self._process: Optional[subprocess.Popen] = None
+        # Lists the tree below repo, with paths relative to it.
+        listing = git(repo, "ls-tree", "-r", "-z", rev)
+        for entry in listing.decode("utf-8").split("\0"):
+            if not entry:
+                continue
+            info, _, name = entry.partition("\t")
+            mode, kind, sha = info.split(" ")
+            if kind == "tree" or kind == "commit":
+                # Submodules are directories without their contents.
+                self._add_dir(name)
+            elif mode != SYMLINK_MODE:
+                self._add_file(name, sha)
+
+    @property
+    def root(self) -> Path:
+        return self.mount
+
+    def close(self):
+        with self._lock:
+            if self._process is not None:
+                assert self._process.stdin is not None
+                self._process.stdin.close()
+                self._process.wait()
+                self._process = None
+
+    def _cat_file(self) -> subprocess.Popen:
+        if self._process is None:
+            self._process = subprocess.Popen(
+                ["git", "-C", str(self.archive), "cat-file", "--batch"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+        return self._process
+
+    def _read_member(self, member: str) -> bytes:
+        return self._read_blobs([member])[0]
+
+    def _read_blobs(self, shas: List[str]) -> List[bytes]:
+        """The contents of each blob, asking for all of them before reading any."""
+        if not shas:
+            return []
+        request = "".join(f"{sha}\n" for sha in shas).encode("ascii")
+        with self._lock:
+            process = self._cat_file()
+            assert process.stdin is not None and process.stdout is not None
+            # Write from another thread, or git and this one could both block on
+            # full pipes.
+            writer = Thread(target=send, args=(process.stdin, request))
+            writer.start()
+            try:
+                # Read every response, even after a missing blob, to keep the
+                # process in step for the next batch.
+                blobs = [read_blob(process.stdout) for _ in shas]
+            finally:
+                writer.join()
+        for sha, blob in zip(shas, blobs):
+            if blob is None:
+                raise GitError(f"git cat-file: {sha} missing")
+        return [blob for blob in blobs if blob is not None]
+
+    def _read_many_bytes(self, paths: List[Path]) -> Dict[Path, bytes]:
+        """The contents of the paths inside the tree, read in one batch."""
+        inside = {}
+        for path in paths:
+            key = self._key(path)
+            if key is None:
+                continue
+            if key not in self._files:
+                raise FileNotFoundError(
+                    errno.ENOENT, f"No such file in {self.rev}", str(path)
+                )
+            inside[path] = self._files[key]
+        return dict(zip(inside, self._read_blobs([*inside.values()])))
+
+    def read_many(self, paths: Iterable[Path]) -> List[str]:
+        paths = [*paths]
+        contents = self._read_many_bytes(paths)
+        result = []
+        for path in paths:
+            if path in contents:
+                with open_text(contents[path], "utf-8") as file:
+                    result.append(file.read())
+            else:
+                result.append(self.fallback.read(path))
+        return result
+
+    def readlines_many(
+        self, paths: Iterable[Path], encoding: str = "utf-8"
+    ) -> List[List[str]]:
+        paths = [*paths]
+        contents = self._read_many_bytes(paths)
+        result = []
+        for path in paths:
+            if path in contents:
+                with open_text(contents[path], encoding) as file:
+                    result.append(file.readlines())
+            else:
+                result.append(self.fallback.readlines(path, encoding))
+        return result
+
+
+def send(pipe: IO[bytes], request: bytes):
+    pipe.write(request)
+    pipe.flush()
+
+
+def read_blob(pipe: IO[bytes]) -> Optional[bytes]:
+    """Read one response of git cat-file --batch, or None if the object is missing."""
+    header = pipe.readline().decode("utf-8").split()
+    if len(header) == 2 and header[1] == "missing":
+        return None
+    if len(header) != 3:
+        raise GitError("git cat-file stopped responding")
+    content = pipe.read(int(header[2]))
+    pipe.read(1)
+    return content
@@ -0,0 +1,112 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from .doc_gen import DocGen
+from .git_changes import GitError
+from .git_fs import GitTreeFs
+
+
+def git(root: Path, *args: str):
+    subprocess.run(
+        [
+            "git",
+            "-C",
+            str(root),
+            "-c",
+            "user.name=test",
+            "-c",
+            "user.email=test@example.com",
+            *args,
+        ],
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    (tmp_path / "python" / "nested").mkdir(parents=True)
+    (tmp_path / "README.md").write_bytes(b"first\r\n")
+    (tmp_path / "python" / "example.py").write_text("print('first')\n")
+    (tmp_path / "python" / "nested" / "data.json").write_text("{}\n")
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-qm", "first")
+    (tmp_path / "python" / "example.py").write_text("print('second')\n")
+    (tmp_path / "python" / "added.py").write_text("print('added')\n")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-qm", "second")
+    (tmp_path / "python" / "example.py").write_text("print('work tree')\n")
+    return tmp_path
+
+
+def test_git_tree_fs_reads_revision(repo: Path):
+    first = GitTreeFs(repo, "HEAD~1")
+    head = GitTreeFs(repo)
+
+    assert first.read(repo / "python/example.py") == "print('first')\n"
+    assert head.read(repo / "python/example.py") == "print('second')\n"
+    assert first.readlines(repo / "README.md") == ["first\n"]
+    assert first.read_bytes(repo / "README.md") == b"first\r\n"
+    assert head.read_many([repo / "python/added.py", repo / "python/example.py"]) == [
+        "print('added')\n",
+        "print('second')\n",
+    ]
+
+    assert not first.stat(repo / "python/added.py").exists
+    assert head.stat(repo / "python/added.py").is_file
+    assert head.stat(repo / "python/nested").is_dir
+    assert first.list(repo / "python") == [
+        repo / "python/example.py",
+        repo / "python/nested",
+    ]
+    assert sorted(head.glob(repo, "**/*.py")) == [
+        repo / "python/added.py",
+        repo / "python/example.py",
+    ]
+    with pytest.raises(FileNotFoundError):
+        first.read(repo / "python/added.py")
+    first.close()
+    head.close()
+
+
+def test_git_tree_fs_subdirectory(repo: Path):
+    fs = GitTreeFs(repo / "python", "HEAD")
+    assert fs.list(repo / "python") == [
+        repo / "python/added.py",
+        repo / "python/example.py",
+        repo / "python/nested",
+    ]
+    assert fs.read(repo / "python/nested/data.json") == "{}\n"
+    fs.close()
+
+
+def test_git_tree_fs_bad_revision(repo: Path):
+    with pytest.raises(GitError):
+        GitTreeFs(repo, "no-such-rev")
+
+
+def test_doc_gen_from_revision(tmp_path: Path):
+    source = Path(__file__).parent / "test_resources" / "doc_gen_test"
+    repo = tmp_path / "repo"
+    shutil.copytree(source, repo)
+    git(repo, "init", "-q")
+    git(repo, "add", "-f", ".")
+    git(repo, "commit", "-qm", "metadata")
+    shutil.rmtree(repo / ".doc_gen")
+
+    fs = GitTreeFs(repo, "HEAD")
+    from_revision = DocGen.from_root(repo, fs=fs)
+    from_revision.collect_snippets(repo)
+    fs.close()
+    from_dir = DocGen.from_root(source)
+    from_dir.collect_snippets(source)
+
+    assert from_revision.examples.keys() == from_dir.examples.keys()
+    assert from_revision.snippets.keys() == from_dir.snippets.keys()
@@ -0,0 +1,55 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Write JSON to a file as it is encoded, instead of building the whole document as
+one string first.
+"""
+
+import json
+from typing import IO, Any
+
+# Containers this many levels deep are encoded whole. For a DocGen, that streams
+# its fields and their entries, such as each example and each snippet.
+STREAM_DEPTH = 2
+
+
+def dump(
+    obj: Any, out: IO[str], encoder: json.JSONEncoder, depth: int = STREAM_DEPTH
+) -> int:
+    """
+    Write obj to out exactly as encoder.encode(obj) would encode it, returning the
+    number of characters written. Dicts, lists and whatever encoder.default turns
+    objects into are written an item at a time, down to depth levels. Below that,
+    each value is encoded in one piece, so memory use follows the largest of them
+    rather than the whole document. The encoder must use the default separators,
+    no indent and no sorted keys.
+    """
+    if depth <= 0 or isinstance(obj, (str, int, float, bool)) or obj is None:
+        chunk = encoder.encode(obj)
+        out.write(chunk)
+        return len(chunk)
+    if isinstance(obj, dict):
+        if not all(isinstance(key, str) for key in obj):
+            # Other keys are converted to strings, which encode gets right.
+            return dump(obj, out, encoder, 0)
+        written = 0
+        separator = "{"
+        for key, value in obj.items():
+            chunk = f"{separator}{encoder.encode(key)}: "
+            out.write(chunk)
+            written += len(chunk) + dump(value, out, encoder, depth - 1)
+            separator = ", "
+        out.write("}" if obj else "{}")
+        return written + (1 if obj else 2)
+    if isinstance(obj, (list, tuple)):
+        written = 0
+        separator = "["
+        for value in obj:
+            out.write(separator)
+            written += len(separator) + dump(value, out, encoder, depth - 1)
+            separator = ", "
+        out.write("]" if obj else "[]")
+        return written + (1 if obj else 2)
+    # Objects JSON doesn't know are converted, then written at the same depth.
+    return dump(encoder.default(obj), out, encoder, depth)
@@ -0,0 +1,61 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from .doc_gen import DocGen, DocGenEncoder
+from .json_writer import dump
+
+
+class Chunks(io.StringIO):
+    """Records the longest chunk written."""
+
+    longest = 0
+
+    def write(self, chunk: str) -> int:
+        self.longest = max(self.longest, len(chunk))
+        return super().write(chunk)
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        {},
+        [],
+        "text",
+        None,
+        {"a": [], "b": {}, "c": [1, 2.5, None, True], "d": {"e": ("f", "ü")}},
+        {1: "int keys", None: "null"},
+        [{"nested": {"deeper": {"deepest": [1, {2, 3}]}}}],
+        {"path": Path("/a/b"), "set": {"x"}},
+    ],
+)
+def test_dump_matches_dumps(obj):
+    for depth in range(4):
+        out = io.StringIO()
+        written = dump(obj, out, DocGenEncoder(), depth)
+        assert out.getvalue() == json.dumps(obj, cls=DocGenEncoder)
+        assert written == len(out.getvalue())
+
+
+def test_dump_doc_gen():
+    doc_gen = DocGen.from_root(
+        Path(__file__).parent / "test_resources" / "doc_gen_test"
+    )
+    doc_gen.collect_snippets()
+    expected = json.dumps(doc_gen, cls=DocGenEncoder)
+
+    out = Chunks()
+    assert dump(doc_gen, out, DocGenEncoder()) == len(expected)
+    assert out.getvalue() == expected
+    # Each entry of a field, such as an example, is written in one piece.
+    largest = 0
+    for value in DocGenEncoder().default(doc_gen).values():
+        entries = value.values() if isinstance(value, dict) else [value]
+        for entry in entries:
+            largest = max(largest, len(json.dumps(entry, cls=DocGenEncoder)))
+    assert out.longest == largest < len(expected)
@@ -24,10 +24,10 @@ def batched(iterable: Iterable, n: int) -> Generator[Tuple, Any, None]:
 
 
 class PromptRepository:
-    to_write: Dict[str, str] = {}
-
     def __init__(self, fs: Fs = PathFs()):
         self.fs = fs
+        self.to_write: Dict[str, str] = {}
+        self.partition_name = ""
 
     def rollback(self):
         # TODO: This is not what rollback is for. We should be rolling back any
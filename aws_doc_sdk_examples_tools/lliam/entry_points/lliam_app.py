@@ -8,6 +8,7 @@ import typer
 from aws_doc_sdk_examples_tools.lliam.config import AILLY_DIR, BATCH_PREFIX
 from aws_doc_sdk_examples_tools.lliam.domain import commands, errors
 from aws_doc_sdk_examples_tools.lliam.service_layer import messagebus, unit_of_work
+from aws_doc_sdk_examples_tools.profiling import profiled
 
 logging.basicConfig(
     level=logging.INFO,
@@ -19,6 +20,23 @@ logger = logging.getLogger(__name__)
 app = typer.Typer(name="Lliam")
 
 
+@app.callback()
+def main(
+    ctx: typer.Context,
+    profile_out: Annotated[
+        Optional[str],
+        typer.Option(
+            help="Profile the command with cProfile, writing pstats to this path and collapsed stacks for flame graphs to it with .collapsed added."
+        ),
+    ] = None,
+    profile_phase: Annotated[
+        Optional[str],
+        typer.Option(help="With --profile-out, only profile this phase."),
+    ] = None,
+) -> None:
+    ctx.with_resource(profiled(profile_out, profile_phase))
+
+
 @app.command()
 def create_prompts(iam_tributary_root: str, system_prompts: List[str] = []):
     doc_gen_root = iam_tributary_root
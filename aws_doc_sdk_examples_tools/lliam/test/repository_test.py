@@ -29,3 +29,13 @@ def test_batch_naming_occurs_properly():
 
     assert batch_1_count == expected_batch_1_prompts
     assert batch_2_count == expected_batch_2_prompts
+
+
+def test_repositories_do_not_share_prompts():
+    first = PromptRepository(fs=RecordFs({}))
+    second = PromptRepository(fs=RecordFs({}))
+
+    first.add(Prompt("prompt.md", "Content"))
+
+    assert first.to_write == {"prompt.md": "Content"}
+    assert second.to_write == {}
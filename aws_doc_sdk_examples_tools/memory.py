@@ -0,0 +1,174 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Memory used by each phase of a run, from tracemalloc snapshots taken as phases
+start and end, and the size of the collections a DocGen keeps.
+"""
+
+import gc
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from types import BuiltinFunctionType, FunctionType, ModuleType
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+from .phases import phase_hook
+
+if TYPE_CHECKING:
+    from .doc_gen import DocGen
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+# Objects shared by everything, which no collection retains.
+SHARED_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType)
+
+# Allocations by tracemalloc itself and the import system aren't ours.
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def peak_rss() -> Optional[int]:
+    """The peak resident set size of the process in bytes, where the platform has it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class PhaseMemory:
+    name: str
+    # Bytes traced when the phase ended.
+    traced: int
+    # Bytes allocated during the phase and still held when it ended.
+    change: int
+    peak_rss: Optional[int]
+    # The allocation sites that grew the most: (file:line, bytes, blocks).
+    top: List[Tuple[str, int, int]] = field(default_factory=list)
+
+
+@dataclass
+class Retained:
+    bytes: int
+    objects: int
+
+
+class MemoryReport:
+    """
+    While tracing, snapshots allocations around each phase. Phases that nest, or run
+    more than once, each get their own entry.
+    """
+
+    def __init__(self, top: int = 10):
+        self.top = top
+        self.phases: List[PhaseMemory] = []
+        self.retained: Dict[str, Retained] = {}
+
+    @contextmanager
+    def tracing(self) -> Iterator[None]:
+        """Trace allocations, and record each phase, in the with block."""
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            with phase_hook(self.hook):
+                yield
+        finally:
+            if started:
+                tracemalloc.stop()
+
+    @contextmanager
+    def hook(self, name: str) -> Iterator[None]:
+        before = snapshot()
+        try:
+            yield
+        finally:
+            differences = snapshot().compare_to(before, "lineno")
+            growth = [stat for stat in differences if stat.size_diff > 0]
+            growth.sort(key=lambda stat: stat.size_diff, reverse=True)
+            self.phases.append(
+                PhaseMemory(
+                    name=name,
+                    traced=tracemalloc.get_traced_memory()[0],
+                    change=sum(stat.size_diff for stat in differences),
+                    peak_rss=peak_rss(),
+                    top=[
+                        (
+                            f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                            stat.size_diff,
+                            stat.count_diff,
+                        )
+                        for stat in growth[: self.top]
+                    ],
+                )
+            )
+
+    def retain(self, name: str, obj: Any):
+        """Record the size of what obj holds, such as a DocGen's examples, as name."""
+        self.retained[name] = Retained(*reachable_size(obj))
+
+    def retain_doc_gen(self, doc_gen: "DocGen"):
+        self.retain("examples", doc_gen.examples)
+        self.retain("snippets", doc_gen.snippets)
+        self.retain("snippet files", doc_gen.snippet_files)
+        self.retain("errors", doc_gen.errors)
+
+    def format(self) -> str:
+        lines = ["phase                 traced      change    peak rss"]
+        for phase in self.phases:
+            lines.append(
+                f"{phase.name:<20} {mib(phase.traced):>8} {mib(phase.change, True):>10}"
+                f" {mib(phase.peak_rss):>10}"
+            )
+            for site, size, count in phase.top:
+                lines.append(f"    {mib(size, True):>10} {count:>8} blocks  {site}")
+        if self.retained:
+            lines.append("")
+            lines.append("retained              size     objects")
+            for name, retained in self.retained.items():
+                lines.append(
+                    f"{name:<20} {mib(retained.bytes):>8} {retained.objects:>11}"
+                )
+        return "\n".join(lines)
+
+
+def snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+
+def reachable_size(root: Any) -> Tuple[int, int]:
+    """
+    The bytes and number of objects reachable from root, each counted once. Classes,
+    modules and functions are shared, so aren't followed. Objects that other
+    collections share, like interned strings, are counted in each of them.
+    """
+    seen = set()
+    stack = [root]
+    size = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+        if isinstance(obj, dict):
+            # The garbage collector doesn't visit dict keys that are all strings.
+            stack.extend(obj.keys())
+    return size, len(seen)
+
+
+def mib(size: Optional[int], signed: bool = False) -> str:
+    if size is None:
+        return "-"
+    return f"{size / (1024 * 1024):{'+' if signed else ''}.1f}M"
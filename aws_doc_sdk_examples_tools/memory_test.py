@@ -0,0 +1,75 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import tracemalloc
+from pathlib import Path
+
+from . import phases
+from .doc_gen import DocGen
+from .memory import MemoryReport, mib, reachable_size
+from .phases import phase
+
+
+def test_memory_report_phases():
+    report = MemoryReport(top=3)
+    with report.tracing():
+        assert tracemalloc.is_tracing()
+        with phase("outer"):
+            with phase("allocate"):
+                kept = [bytearray(1024) for _ in range(1000)]
+            with phase("free"):
+                del kept[:]
+    assert not tracemalloc.is_tracing()
+    assert report.hook not in phases._hooks
+
+    by_name = {memory.name: memory for memory in report.phases}
+    # Inner phases end first.
+    assert [memory.name for memory in report.phases] == ["allocate", "free", "outer"]
+    assert by_name["allocate"].change >= 1000 * 1024
+    assert by_name["free"].change <= -1000 * 1024
+    assert len(by_name["allocate"].top) <= 3
+    site, size, blocks = by_name["allocate"].top[0]
+    assert site.startswith(__file__)
+    assert size >= 1000 * 1024 and blocks >= 1000
+
+    lines = report.format().splitlines()
+    assert lines[0].split() == ["phase", "traced", "change", "peak", "rss"]
+    assert lines[1].startswith("allocate")
+
+
+def test_memory_report_leaves_tracing_it_did_not_start():
+    tracemalloc.start()
+    try:
+        with MemoryReport().tracing():
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_reachable_size():
+    shared = "x" * 100
+    size, objects = reachable_size([shared, shared, {"key": shared}])
+    # The list, the string once, the dict and its key.
+    assert objects == 4
+    assert size > 100
+    # Classes aren't followed.
+    assert reachable_size([DocGen])[1] == 1
+
+
+def test_memory_report_retain_doc_gen():
+    doc_gen = DocGen.from_root(
+        Path(__file__).parent / "test_resources" / "doc_gen_test"
+    )
+    report = MemoryReport()
+    report.retain_doc_gen(doc_gen)
+    assert [*report.retained] == ["examples", "snippets", "snippet files", "errors"]
+    assert report.retained["examples"].objects > len(doc_gen.examples)
+    assert "examples" in report.format()
+
+
+def test_mib():
+    assert mib(None) == "-"
+    assert mib(3 * 1024 * 1024) == "3.0M"
+    assert mib(-1024 * 1024, True) == "-1.0M"
+    assert mib(1024 * 1024, True) == "+1.0M"
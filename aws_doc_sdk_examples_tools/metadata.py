@@ -12,6 +12,7 @@ from pathlib import Path
 
 from . import metadata_errors
 from .categories import Category
+from .fs import Fs, PathFs
 from .metadata_errors import (
     MetadataErrors,
     MetadataParseError,
@@ -72,7 +73,7 @@ class Version:
     # Link to the original tributary that contributed this version.
     source: Optional[Url] = field(default=None)
 
-    def validate(self, errors: MetadataErrors, root: Path):
+    def validate(self, errors: MetadataErrors, root: Path, fs: Fs = PathFs()):
         github = self.github
         if github is not None:
             _, ext = splitext(github)
@@ -84,7 +85,7 @@ class Version:
                 )
             elif github.startswith("http"):
                 pass  # Tributaries specify full GitHub path. Consider passing in GitHub root from tributaries and doing a full check at some point.
-            elif not (root / github).exists():
+            elif not fs.stat(root / github).exists:
                 errors.append(
                     metadata_errors.MissingGithubLink(
                         link=github, sdk_version=self.sdk_version, root=root
@@ -126,10 +127,10 @@ class Language:
             # within the language. If a tributary or writer feels they need to
             # modify an excerpt, they should go modify the excerpt directly.
 
-    def validate(self, errors: MetadataErrors, root: Path):
+    def validate(self, errors: MetadataErrors, root: Path, fs: Fs = PathFs()):
         errs = MetadataErrors()
         for version in self.versions:
-            version.validate(errs, root)
+            version.validate(errs, root, fs)
         for error in errs:
             if isinstance(error, MetadataParseError):
                 error.language = self.name
@@ -224,7 +225,11 @@ class Example:
                 errors.extend(merge_errs)
 
     def validate(
-        self, errors: MetadataErrors, known_services: Container[str], root: Path
+        self,
+        errors: MetadataErrors,
+        known_services: Container[str],
+        root: Path,
+        fs: Fs = PathFs(),
     ):
         errs = MetadataErrors()
         for service in self.services.keys():
@@ -235,7 +240,7 @@ class Example:
                     )
                 )
         for language in self.languages.values():
-            language.validate(errs, root)
+            language.validate(errs, root, fs)
         for error in errs:
             error.file = self.file
             error.id = self.id
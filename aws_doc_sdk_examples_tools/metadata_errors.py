@@ -3,14 +3,19 @@
 
 from __future__ import annotations
 
+import json
 import re
+import sys
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import (
+    Any,
+    ClassVar,
     Optional,
     Iterator,
     Iterable,
     List,
+    TextIO,
     TypeVar,
     Generic,
     Dict,
@@ -26,21 +31,100 @@ class InvalidItemException(Exception, Generic[ErrorT]):
         super().__init__(self, f"Cannot append {item!r} to ExampleErrors")
 
 
+class ErrorSink:
+    """
+    Write errors as they are produced, instead of keeping them all in memory.
+    Errors are written as text, or as one JSON object per line with ndjson. After
+    max_errors have been written, further errors are only counted.
+    """
+
+    def __init__(
+        self,
+        out: TextIO = sys.stdout,
+        ndjson: bool = False,
+        max_errors: Optional[int] = None,
+    ):
+        self.out = out
+        self.ndjson = ndjson
+        self.max_errors = max_errors
+        self.count = 0
+
+    @classmethod
+    def open(cls, path: str, max_errors: Optional[int] = None) -> "ErrorSink":
+        """A sink writing text to stdout for "-", or NDJSON to the file at path."""
+        if path == "-":
+            return cls(max_errors=max_errors)
+        return cls(open(path, "w", encoding="utf-8"), True, max_errors)
+
+    @property
+    def written(self) -> int:
+        if self.max_errors is None:
+            return self.count
+        return min(self.count, self.max_errors)
+
+    def write(self, error: Any):
+        self.count += 1
+        if self.max_errors is not None and self.count > self.max_errors:
+            return
+        if self.ndjson:
+            file = getattr(error, "file", None)
+            record = {
+                "error": type(error).__name__,
+                "file": None if file is None else str(file),
+                "id": getattr(error, "id", None),
+                "message": str(error),
+            }
+            self.out.write(json.dumps(record) + "\n")
+        else:
+            self.out.write(f"\t{error}\n")
+
+    def close(self):
+        if self.count > self.written:
+            print(f"{self.count - self.written} more errors were not written.")
+        if self.out is not sys.stdout:
+            self.out.close()
+
+
 class ErrorsList(Generic[ErrorT]):
     """MyPy isn't catching List[Foo].append(List[Foo])"""
 
+    # The type of item this list accepts, from its generic base.
+    _item_type: ClassVar[Any] = object
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Look up the generic type once per subclass. This is reliant on the internal
+        # implementation of __orig_bases__, but it will definitely fail tests if a
+        # python minor version breaks it.
+        for base in cls.__dict__.get("__orig_bases__", ()):
+            args = getattr(base, "__args__", ())
+            if args and not isinstance(args[0], TypeVar):
+                cls._item_type = args[0]
+
     def __init__(self, no_duplicates: bool = False):
         self.no_duplicates = no_duplicates
         self._errors: List[ErrorT] = []
+        self._sink: Optional[ErrorSink] = None
+        self._streamed = 0
+
+    def stream(self, sink: ErrorSink):
+        """
+        Send errors to sink as they are added, instead of keeping them. Errors already
+        in this list are sent first.
+        """
+        for error in self._errors:
+            sink.write(error)
+        self._streamed += len(self._errors)
+        self._errors = []
+        self._sink = sink
 
     def append(self, item: ErrorT):
-        # Look up the generic type. This is reliant on the internal implementation
-        # of __orig_bases__, but it will definitely fail tests if a python minor
-        # version breaks it.
-        generic = self.__orig_bases__[0]  # type: ignore
-        T = generic.__args__[0]
-        if not isinstance(item, T):
+        if not isinstance(item, self._item_type):
             raise InvalidItemException(item)
+        if self._sink is not None:
+            self._sink.write(item)
+            self._streamed += 1
+            return
 
         """
         It is dangerous to go alone: 🗡️
@@ -51,11 +135,19 @@ class ErrorsList(Generic[ErrorT]):
         self._errors.append(item)
 
     def extend(self, errors: Iterable[ErrorT]):
+        if isinstance(errors, ErrorsList):
+            # Errors the other list streamed were already sent, but still count.
+            self._streamed += errors.streamed
+        if self._sink is not None:
+            for error in errors:
+                self._sink.write(error)
+                self._streamed += 1
+            return
         self._errors.extend(errors)
 
     def maybe_extend(self, maybe_errors: K | ErrorsList[ErrorT]) -> K | None:
         if isinstance(maybe_errors, ErrorsList):
-            self.extend(maybe_errors._errors)
+            self.extend(maybe_errors)
             return None
         return maybe_errors
 
@@ -66,8 +158,19 @@ class ErrorsList(Generic[ErrorT]):
         self._errors[key] = value
 
     def __len__(self) -> int:
+        # Only the errors kept, like iteration. See total for streamed ones too.
         return len(self._errors)
 
+    @property
+    def streamed(self) -> int:
+        """The number of errors sent to a sink, which are not kept."""
+        return self._streamed
+
+    @property
+    def total(self) -> int:
+        """The number of errors added, whether kept or streamed."""
+        return len(self._errors) + self._streamed
+
     def __iter__(self) -> Iterator[ErrorT]:
         return self._errors.__iter__()
 
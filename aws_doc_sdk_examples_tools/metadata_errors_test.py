@@ -0,0 +1,85 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Tests for metadata_errors.py
+"""
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from .entities import EntityErrors, MissingEntityError
+from .metadata_errors import (
+    ErrorSink,
+    InvalidItemException,
+    MetadataError,
+    MetadataErrors,
+    MissingCategoryBody,
+)
+
+
+def test_append_checks_item_type():
+    errors = MetadataErrors()
+    errors.append(MissingCategoryBody(file=Path("a.yaml"), id="a"))
+    with pytest.raises(InvalidItemException):
+        errors.append("not an error")  # type: ignore
+    entity_errors = EntityErrors()
+    entity_errors.append(MissingEntityError(entity="&entity;"))
+    with pytest.raises(InvalidItemException):
+        entity_errors.append(MetadataError())  # type: ignore
+    assert len(errors) == 1
+    assert len(entity_errors) == 1
+
+
+def test_stream_writes_text():
+    out = io.StringIO()
+    errors = MetadataErrors()
+    errors.append(MetadataError(file=Path("a.yaml"), id="a"))
+    errors.stream(ErrorSink(out))
+    errors.append(MetadataError(file=Path("b.yaml"), id="b"))
+    errors.extend([MetadataError(file=Path("c.yaml"), id="c")])
+    assert len(errors) == 0
+    assert list(errors) == []
+    assert errors.streamed == 3
+    assert errors.total == 3
+    assert out.getvalue().splitlines() == [
+        f"\t{MetadataError(file=Path(name + '.yaml'), id=name)}"
+        for name in ["a", "b", "c"]
+    ]
+
+
+def test_merging_counts_streamed_errors():
+    streaming = MetadataErrors()
+    streaming.stream(ErrorSink(io.StringIO()))
+    streaming.append(MetadataError(file=Path("a.yaml"), id="a"))
+    kept = MetadataErrors()
+    kept.append(MetadataError(file=Path("b.yaml"), id="b"))
+
+    merged = MetadataErrors()
+    assert merged.maybe_extend(streaming) is None
+    merged.extend(kept)
+    assert len(merged) == 1
+    assert merged.streamed == 1
+    assert merged.total == 2
+
+
+def test_stream_writes_ndjson_up_to_cap():
+    out = io.StringIO()
+    sink = ErrorSink(out, ndjson=True, max_errors=2)
+    errors = MetadataErrors()
+    errors.stream(sink)
+    for name in ["a", "b", "c"]:
+        errors.append(MissingCategoryBody(file=Path(f"{name}.yaml"), id=name))
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [record["id"] for record in records] == ["a", "b"]
+    assert records[0]["error"] == "MissingCategoryBody"
+    assert records[0]["file"] == "a.yaml"
+    assert records[0]["message"] == str(
+        MissingCategoryBody(file=Path("a.yaml"), id="a")
+    )
+    assert sink.count == 3
+    assert sink.written == 2
+    assert errors.total == 3
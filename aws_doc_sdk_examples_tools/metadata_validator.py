@@ -9,24 +9,26 @@ against YAML files stored in the metadata folder and runs as a GitHub action.
 
 import argparse
 import datetime
-import os
 import re
 import xml.etree.ElementTree as xml_tree
 import yaml
 import yaml.parser
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Set
+from typing import Any, Dict, Iterable, List, Optional
 from xml.etree.ElementTree import ParseError
 
 import yamale  # type: ignore
 from yamale import YamaleError  # type: ignore
 from yamale.validators import DefaultValidators, Validator, String  # type: ignore
 
+from .fs import Fs, PathFs
 from .metadata_errors import (
     MetadataErrors,
     MetadataParseError,
 )
+from .schema_compiler import compile_schema, current_context
 
 
 class ElementTreeParseError(ParseError):
@@ -35,27 +37,49 @@ class ElementTreeParseError(ParseError):
         self.raw = raw
 
 
-class SdkVersion(Validator):
+@dataclass
+class ValidationContext:
+    """
+    The configuration that validators check values against, for one call to
+    validate_metadata. Validators read the context passed to validate_all on their
+    thread, so validations with different contexts can run at once.
+    """
+
+    sdks: Dict[str, Any] = field(default_factory=dict)
+    services: Dict[str, Any] = field(default_factory=dict)
+    block_names: List[str] = field(default_factory=list)
+
+
+NO_CONTEXT = ValidationContext()
+
+
+class ContextValidator(Validator):
+    """A validator that needs a ValidationContext."""
+
+    @property
+    def context(self) -> ValidationContext:
+        return current_context() or NO_CONTEXT
+
+
+class SdkVersion(ContextValidator):
     """Validate that sdk version appears in sdks.yaml."""
 
     tag = "sdk_version"
-    sdks: Dict[str, Any] = {}
 
     def _is_valid(self, value: str):
-        return value in self.sdks
+        return value in self.context.sdks
 
 
-class ServiceName(Validator):
+class ServiceName(ContextValidator):
     """Validate that service names appear in services.yaml."""
 
     tag = "service_name"
-    services: Set[str] = set()
 
     def get_name(self):
         return "service name found in services.yaml"
 
     def _is_valid(self, value: str):
-        return value in self.services
+        return value in self.context.services
 
 
 class ServiceVersion(Validator):
@@ -82,7 +106,6 @@ class ExampleId(Validator):
     """
 
     tag = "example_id"
-    services: Set[str] = set()
 
     def get_name(self):
         return "valid example ID"
@@ -91,17 +114,24 @@ class ExampleId(Validator):
         return re.fullmatch("^[\\da-z-]+(_[\\da-zA-Z-]+)+$", value)
 
 
-class BlockContent(Validator):
+class BlockContent(ContextValidator):
     """Validate that block content refers to an existing file."""
 
     tag = "block_content"
-    block_names: List[str] = []
 
     def get_name(self):
         return "file found in the cross-content folder"
 
     def _is_valid(self, value: str):
-        return value in self.block_names
+        return value in self.context.block_names
+
+
+AWS_USAGE = re.compile("(?<![&0-9a-zA-Z])AWS(?![;0-9a-zA-Z])")
+# Text that is always well-formed XML once & is escaped: no markup, and only
+# characters that XML allows.
+XML_SAFE_TEXT = re.compile(
+    "[^<\\]\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]*"
+)
 
 
 class StringExtension(String):
@@ -168,6 +198,9 @@ class StringExtension(String):
         Count all bare AWS occurrences overall.
         If these counts differ, there's an invalid usage.
         """
+        if XML_SAFE_TEXT.fullmatch(value):
+            # Without tags or characters XML rejects, there can't be any blocks.
+            return AWS_USAGE.search(value) is None
         xval = value.replace("&", "&amp;")
         xml_str = f"<fake><para>{xval}</para></fake>"
         try:
@@ -181,10 +214,8 @@ class StringExtension(String):
         )
         aws_in_blocks = 0
         for element in blocks:
-            aws_in_blocks += len(
-                re.findall("(?<![&0-9a-zA-Z])AWS(?![;0-9a-zA-Z])", str(element.text))
-            )
-        aws_everywhere = len(re.findall("(?<![&0-9a-zA-Z])AWS(?![;0-9a-zA-Z])", value))
+            aws_in_blocks += len(AWS_USAGE.findall(str(element.text)))
+        aws_everywhere = len(AWS_USAGE.findall(value))
         return aws_everywhere == aws_in_blocks
 
 
@@ -202,14 +233,25 @@ def validate_files(
     validators: Dict[str, Validator],
     strict: bool,
     errors: MetadataErrors,
+    documents: Optional[Dict[Path, Any]] = None,
+    context: Optional[ValidationContext] = None,
 ):
-    """Iterate a list of files and validate each one against a schema."""
+    """
+    Iterate a list of files and validate each one against a schema, with context
+    for the validators that need one. Files with an entry in documents are
+    validated from the already loaded YAML instead of being read again.
+    """
 
-    schema = yamale.make_schema(schema_name, validators=validators)
+    schema = compile_schema(schema_name, validators)
+    documents = documents or {}
     for meta_name in meta_names:
         try:
-            data = yamale.make_data(meta_name)
-            yamale.validate(schema, data, strict=strict)
+            if meta_name in documents:
+                # Matches yamale.make_data for a single document, or an empty file.
+                data = [(documents[meta_name] or {}, meta_name)]
+            else:
+                data = yamale.make_data(meta_name)
+            schema.validate_all(data, strict=strict, context=context)
             print(f"{meta_name.resolve()} validation success! 👍")
         except yaml.parser.ParserError as e:
             pass  # YAML parse errors are found and reported by the DocGen validator so we won't report them here.
@@ -218,29 +260,46 @@ def validate_files(
     return errors
 
 
-def validate_metadata(
-    doc_gen_root: Path, strict: bool, errors: MetadataErrors
-) -> MetadataErrors:
-    config = Path(__file__).parent / "config"
-    with open(config / "sdks.yaml") as sdks_file:
-        sdks_yaml: Dict[str, Any] = yaml.safe_load(sdks_file)
-
-    with open(config / "services.yaml") as services_file:
-        services_yaml = yaml.safe_load(services_file)
-
-    SdkVersion.sdks = sdks_yaml
-    ServiceName.services = services_yaml
-    ExampleId.services = services_yaml
-    cross_content = doc_gen_root / ".doc_gen" / "cross-content"
-    has_cross_content = cross_content.exists()
-    BlockContent.block_names = os.listdir(cross_content) if has_cross_content else []
-
+def yamale_validators() -> Dict[str, Validator]:
+    """
+    The validators for our schemas. They are the same classes on every call, so
+    schemas compiled with them are cached.
+    """
     validators = DefaultValidators.copy()
     validators[ServiceName.tag] = ServiceName
     validators[ServiceVersion.tag] = ServiceVersion
     validators[ExampleId.tag] = ExampleId
     validators[BlockContent.tag] = BlockContent
     validators[String.tag] = StringExtension
+    return validators
+
+
+def validate_metadata(
+    doc_gen_root: Path,
+    strict: bool,
+    errors: MetadataErrors,
+    metadata_files: Optional[Iterable[Path]] = None,
+    documents: Optional[Dict[Path, Any]] = None,
+    fs: Fs = PathFs(),
+) -> MetadataErrors:
+    """
+    Validate config and example metadata against their schemas. Example metadata is
+    found in the doc_gen_root metadata folder, unless metadata_files is given.
+    documents maps paths to their already parsed YAML, such as DocGen keeps, so
+    those files are not parsed again. The metadata folder is searched through fs.
+    """
+    documents = documents or {}
+    config = Path(__file__).parent / "config"
+    cross_content = doc_gen_root / ".doc_gen" / "cross-content"
+    has_cross_content = fs.stat(cross_content).is_dir
+    context = ValidationContext(
+        sdks=load_document(config / "sdks.yaml", documents),
+        services=load_document(config / "services.yaml", documents),
+        block_names=(
+            [path.name for path in fs.list(cross_content)] if has_cross_content else []
+        ),
+    )
+    validators = yamale_validators()
 
     config_root = Path(__file__).parent / "config"
     if strict:
@@ -248,28 +307,44 @@ def validate_metadata(
     else:
         example_schema = "example_schema.yaml"
 
+    if metadata_files is None:
+        metadata_files = fs.glob(
+            doc_gen_root / ".doc_gen" / "metadata", "*_metadata.yaml"
+        )
+
     to_validate = [
-        # (schema, metadata_glob)
-        (config_root / "sdks_schema.yaml", config_root, "sdks.yaml"),
-        (config_root / "services_schema.yaml", config_root, "services.yaml"),
-        (
-            config_root / example_schema,
-            doc_gen_root / ".doc_gen" / "metadata",
-            "*_metadata.yaml",
-        ),
+        # (schema, metadata_files)
+        (config_root / "sdks_schema.yaml", config_root.glob("sdks.yaml")),
+        (config_root / "services_schema.yaml", config_root.glob("services.yaml")),
+        (config_root / example_schema, metadata_files),
     ]
-    for schema, meta_root, metadata in to_validate:
+    for schema, metadata in to_validate:
         validate_files(
             schema,
-            meta_root.glob(metadata),
+            metadata,
             validators,
             strict,
             errors,
+            documents,
+            context,
         )
 
     return errors
 
 
+@lru_cache(maxsize=None)
+def load_config(path: Path) -> Any:
+    """Parse a bundled config file once per process."""
+    with open(path) as file:
+        return yaml.safe_load(file)
+
+
+def load_document(path: Path, documents: Dict[Path, Any]) -> Any:
+    if path in documents:
+        return documents[path]
+    return load_config(path)
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -29,3 +29,20 @@ def test_aws_entity_usage(strict):
     assert "Synopsis programlisting has AWS" not in e_str
     assert "Synopsis list code has <code>AWS" not in e_str
     assert "Description programlisting has AWS" not in e_str
+
+
+def test_validate_metadata_uses_loaded_documents():
+    # This file does not exist, so it must be validated from the loaded document.
+    path = Path("/does/not/exist/sts_metadata.yaml")
+    errors = MetadataErrors()
+    validate_metadata(
+        Path("/does/not/exist"),
+        False,
+        errors,
+        metadata_files=[path],
+        documents={path: {"sts_AssumeRole": {"title": "Has AWS"}}},
+    )
+
+    assert len(errors) == 1
+    assert errors[0].file == path
+    assert "non-entity usage" in str(errors)
@@ -0,0 +1,50 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+The named phases of a run, such as metadata or snippets, which I/O counts, timings,
+profiles and memory reports are broken down by.
+"""
+
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Callable, ContextManager, Iterator, Tuple
+
+# Called with the name of each phase entered, for a context manager to enter around
+# it, such as one that profiles a chosen phase.
+PhaseHook = Callable[[str], ContextManager[None]]
+
+# The phase running in this thread, set with phase().
+current_phase: ContextVar[str] = ContextVar("current_phase", default="other")
+
+# Replaced rather than changed, so phase() can read it without taking the lock.
+_hooks: Tuple[PhaseHook, ...] = ()
+_hooks_lock = Lock()
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Run the with block, in this thread, as the phase name."""
+    token = current_phase.set(name)
+    try:
+        with ExitStack() as stack:
+            for hook in _hooks:
+                stack.enter_context(hook(name))
+            yield
+    finally:
+        current_phase.reset(token)
+
+
+@contextmanager
+def phase_hook(hook: PhaseHook) -> Iterator[None]:
+    """Enter hook around each phase, in any thread, that starts in the with block."""
+    global _hooks
+    with _hooks_lock:
+        _hooks = (*_hooks, hook)
+    try:
+        yield
+    finally:
+        with _hooks_lock:
+            index = _hooks.index(hook)
+            _hooks = _hooks[:index] + _hooks[index + 1 :]
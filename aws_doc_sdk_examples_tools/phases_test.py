@@ -0,0 +1,51 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+from contextlib import contextmanager
+from threading import Thread
+from typing import Iterator, List
+
+from . import phases
+from .phases import current_phase, phase, phase_hook
+
+
+def test_phase_hooks():
+    entered: List[str] = []
+
+    @contextmanager
+    def hook(name: str) -> Iterator[None]:
+        entered.append(f"{name} {current_phase.get()}")
+        yield
+
+    with phase("before"):
+        pass
+    with phase_hook(hook):
+        with phase("outer"):
+            with phase("inner"):
+                pass
+    with phase("after"):
+        pass
+
+    assert entered == ["outer outer", "inner inner"]
+    assert current_phase.get() == "other"
+    assert phases._hooks == ()
+
+
+def test_phase_hook_registration_from_threads():
+    @contextmanager
+    def hook(name: str) -> Iterator[None]:
+        yield
+
+    def register():
+        for _ in range(200):
+            with phase_hook(hook):
+                with phase("work"):
+                    pass
+
+    threads = [Thread(target=register) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert phases._hooks == ()
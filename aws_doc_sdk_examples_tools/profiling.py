@@ -0,0 +1,144 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Profile a run, or one phase of it, with cProfile. The profile is written as pstats
+and as collapsed stacks, one "frame;frame;frame microseconds" line per stack, which
+flame graph tools such as flamegraph.pl and speedscope render.
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .phases import phase_hook
+
+# Stacks are cut off below this depth, which only recursion reaches.
+MAX_STACK_DEPTH = 200
+
+Function = Tuple[str, int, str]
+
+
+class PhaseProfiler:
+    """Enables a profiler while the phase named name runs, in the thread running it."""
+
+    def __init__(self, profiler: cProfile.Profile, name: str):
+        self.profiler = profiler
+        self.name = name
+        # How deeply the phase is nested in each thread.
+        self._local = threading.local()
+        self.ran = False
+
+    @property
+    def depth(self) -> int:
+        """How deeply the phase is nested in this thread."""
+        return getattr(self._local, "depth", 0)
+
+    @contextmanager
+    def __call__(self, name: str) -> Iterator[None]:
+        if name != self.name:
+            yield
+            return
+        self._local.depth = self.depth + 1
+        if self.depth == 1:
+            self.profiler.enable()
+            self.ran = True
+        try:
+            yield
+        finally:
+            self._local.depth = self.depth - 1
+            if self.depth == 0:
+                self.profiler.disable()
+
+
+@contextmanager
+def profiled(out: Optional[str], phase: Optional[str] = None) -> Iterator[None]:
+    """
+    Profile the with block, or only the phase named phase inside it, writing pstats
+    to out and collapsed stacks to out.collapsed. Without out, do nothing. Only the
+    thread that runs the block, or enters the phase, is profiled.
+    """
+    if out is None:
+        yield
+        return
+    profiler = cProfile.Profile()
+    if phase is None:
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+    else:
+        hook = PhaseProfiler(profiler, phase)
+        with phase_hook(hook):
+            yield
+        if not hook.ran:
+            print(
+                f"Phase {phase} never ran, so no profile was written.", file=sys.stderr
+            )
+            return
+    write_profile(profiler, out)
+
+
+def write_profile(profiler: cProfile.Profile, out: str):
+    profiler.dump_stats(out)
+    stats = pstats.Stats(profiler)
+    with open(f"{out}.collapsed", "w", encoding="utf-8") as file:
+        for stack, micros in collapsed_stacks(stats):
+            file.write(f"{stack} {micros}\n")
+
+
+def collapsed_stacks(stats: pstats.Stats) -> List[Tuple[str, int]]:
+    """
+    Stacks and the microseconds spent in their innermost function, rebuilt from the
+    call graph. cProfile only keeps the time of each caller and callee pair, so a
+    function's time is shared between the stacks above it in proportion to how much
+    of it each of its callers accounted for.
+    """
+    # Each function's stats are (calls, primitive calls, own time, cumulative time,
+    # {caller: (calls, primitive calls, own time, cumulative time)}).
+    entries = stats.stats  # type: ignore[attr-defined]
+    callees: Dict[Function, List[Function]] = {}
+    for function, (*_, callers) in entries.items():
+        for caller in callers:
+            callees.setdefault(caller, []).append(function)
+    totals: Dict[str, float] = {}
+
+    def walk(function: Function, stack: List[Function], share: float):
+        stack.append(function)
+        own = entries[function][2]
+        path = ";".join(frame_name(frame) for frame in stack)
+        totals[path] = totals.get(path, 0.0) + own * share
+        if len(stack) < MAX_STACK_DEPTH:
+            for callee in callees.get(function, []):
+                if callee in stack:
+                    continue
+                callee_cumulative = entries[callee][3]
+                from_here = entries[callee][4][function][3]
+                # Stacks under a microsecond wouldn't be written anyway.
+                if callee_cumulative > 0 and share * from_here >= 1e-6:
+                    # The part of the callee's time that came from this stack.
+                    walk(callee, stack, share * from_here / callee_cumulative)
+        stack.pop()
+
+    roots = [function for function, entry in entries.items() if not entry[4]]
+    for root in sorted(roots):
+        walk(root, [], 1.0)
+    return [
+        (path, round(seconds * 1e6))
+        for path, seconds in totals.items()
+        if round(seconds * 1e6) > 0
+    ]
+
+
+def frame_name(function: Function) -> str:
+    filename, line, name = function
+    if filename == "~":
+        # Built in functions have no file.
+        return name.replace(";", ",")
+    short = os.sep.join(filename.split(os.sep)[-2:])
+    return f"{name} ({short}:{line})".replace(";", ",")
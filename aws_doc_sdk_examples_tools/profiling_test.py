@@ -0,0 +1,87 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import cProfile
+import pstats
+import threading
+from pathlib import Path
+
+from .phases import phase
+from .profiling import PhaseProfiler, profiled
+
+
+def inside():
+    return sum(range(1000))
+
+
+def outside():
+    return sum(range(1000))
+
+
+def profiled_functions(out: Path):
+    return {name for _, _, name in pstats.Stats(str(out)).stats}  # type: ignore[attr-defined]
+
+
+def test_profiled_writes_pstats_and_collapsed_stacks(tmp_path: Path):
+    out = tmp_path / "run.prof"
+    with profiled(str(out)):
+        outside()
+        with phase("work"):
+            inside()
+
+    assert {"inside", "outside"} <= profiled_functions(out)
+    stacks = (tmp_path / "run.prof.collapsed").read_text().splitlines()
+    assert stacks
+    for line in stacks:
+        frames, micros = line.rsplit(" ", 1)
+        assert int(micros) > 0
+        assert frames
+
+
+def test_profiled_phase_only(tmp_path: Path):
+    out = tmp_path / "phase.prof"
+    with profiled(str(out), "work"):
+        outside()
+        with phase("work"):
+            with phase("nested"):
+                inside()
+        outside()
+
+    functions = profiled_functions(out)
+    assert "inside" in functions
+    assert "outside" not in functions
+
+
+def test_profiled_phase_never_ran(tmp_path: Path, capsys):
+    out = tmp_path / "missing.prof"
+    with profiled(str(out), "work"):
+        outside()
+
+    assert not out.exists()
+    assert "never ran" in capsys.readouterr().err
+
+
+def test_profiled_without_out(tmp_path: Path):
+    with profiled(None, "work"):
+        with phase("work"):
+            inside()
+    assert [*tmp_path.iterdir()] == []
+
+
+def test_phase_profiler_depth_is_per_thread():
+    hook = PhaseProfiler(cProfile.Profile(), "work")
+    depths = []
+
+    def other_thread():
+        depths.append(hook.depth)
+
+    with hook("work"):
+        with hook("work"):
+            thread = threading.Thread(target=other_thread)
+            thread.start()
+            thread.join()
+            depths.append(hook.depth)
+    depths.append(hook.depth)
+
+    assert depths == [0, 2, 0]
+    assert hook.ran
@@ -19,20 +19,25 @@ The script scans code files and does the following:
       not required to include these tags, but if you do they must be in pairs.
 """
 
+import heapq
 import os
 import re
 import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Set
+from typing import Iterable, List, Optional, Set, Tuple
 
 from .file_utils import get_files
+from .fs import Fs, PathFs
 from .metadata_errors import (
     MetadataErrors,
     MetadataError,
     MetadataParseError,
     DuplicateItemException,
 )
+from .phases import phase
 from .spdx import verify_spdx
 from aws_doc_sdk_examples_tools import validator_config
 
@@ -52,36 +57,161 @@ class ValidationConfig:
         )
 
 
+# Run files in a single process below this many files; a process pool costs more than it saves.
+MIN_FILES_PER_JOB = 64
+# Split each job's share of files into several chunks, so that slow chunks
+# don't hold up the pool and progress can be reported as chunks finish.
+CHUNKS_PER_JOB = 4
+# Seconds between throughput summaries while scanning.
+PROGRESS_INTERVAL = 5.0
+
+
+@phase("file checks")
 def check_files(
     root: Path,
     validation: ValidationConfig,
     errors: MetadataErrors,
+    jobs: int = 1,
+    paths: Optional[Iterable[Path]] = None,
+    max_errors: Optional[int] = None,
+    fs: Fs = PathFs(),
 ):
     """
     Walk a folder system, scanning all files with specified extensions.
-    Errors are logged and counted and the count of errors is returned.
+    Errors are sorted by file path and appended to errors.
 
     :param root: The root folder to start the walk.
-    :return: The number of errors found in the scanned files.
+    :param jobs: The number of worker processes to check files with.
+    :param paths: Check only these files, instead of walking root.
+    :param max_errors: Stop checking files once this many errors have been found.
+    :param fs: The file system to walk root in, and to read files through when
+        they are checked in this process. Worker processes read files directly.
     """
-    file_count = 0
-    for file_path in get_files(root, validator_config.skip):
-        file_count += 1
-        logger.info("\nChecking File: %s", file_path)
 
+    def exhausted() -> bool:
+        return max_errors is not None and len(file_errors) >= max_errors
+
+    if paths is None:
+        files = list(get_files(root, validator_config.skip, fs=fs))
+    else:
+        files = [path for path in paths if not validator_config.skip(path)]
+    progress = Throughput(len(files))
+    file_errors = MetadataErrors()
+    if jobs <= 1 or len(files) < MIN_FILES_PER_JOB:
+        for file_path in files:
+            if exhausted():
+                break
+            progress.update(1, check_file(file_path, validation, file_errors, fs))
+    else:
+        chunks = balanced_chunks(files, jobs * CHUNKS_PER_JOB)
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {
+                executor.submit(check_chunk, chunk, validation): len(chunk)
+                for chunk in chunks
+            }
+            for future in as_completed(futures):
+                chunk_errors, chunk_bytes = future.result()
+                file_errors.extend(chunk_errors)
+                progress.update(futures[future], chunk_bytes)
+                if exhausted():
+                    for pending in futures:
+                        pending.cancel()
+                    break
+
+    errors.extend(sorted(file_errors, key=lambda error: str(error.file)))
+    progress.summary()
+    print(f"{progress.files} files scanned in {root}.\n")
+
+
+def check_file(
+    file_path: Path,
+    validation: ValidationConfig,
+    errors: MetadataErrors,
+    fs: Fs = PathFs(),
+) -> int:
+    """Run the per-file checks on one file, returning the length of its contents."""
+    try:
+        file_contents = fs.read(file_path)
+        # As if decoded as utf-8-sig.
+        if file_contents.startswith("\ufeff"):
+            file_contents = file_contents[1:]
+    except Exception as e:
+        file_contents = ""
+        print(f"Could not verify {file_path}: {e}")
+        errors.append(MetadataError(file=file_path))
+
+    verify_no_deny_list_words(file_contents, file_path, errors)
+    verify_no_secret_keys(file_contents, file_path, validation, errors)
+    verify_spdx(file_contents, file_path, errors)
+    return len(file_contents)
+
+
+def check_chunk(
+    files: List[Path], validation: ValidationConfig
+) -> Tuple[MetadataErrors, int]:
+    """Worker entry point for check_files."""
+    errors = MetadataErrors()
+    total = 0
+    for file_path in files:
+        total += check_file(file_path, validation, errors)
+    return errors, total
+
+
+def balanced_chunks(files: List[Path], count: int) -> List[List[Path]]:
+    """
+    Split files into at most count chunks of roughly equal total size, by
+    placing the largest remaining file into the currently smallest chunk.
+    """
+    sized = []
+    for file_path in files:
         try:
-            with open(file_path, encoding="utf-8-sig") as f:
-                file_contents = f.read()
-        except Exception as e:
-            file_contents = ""
-            print(f"Could not verify {file_path}: {e}")
-            errors.append(MetadataError(file=file_path))
-
-        verify_no_deny_list_words(file_contents, file_path, errors)
-        verify_no_secret_keys(file_contents, file_path, validation, errors)
-        verify_spdx(file_contents, file_path, errors)
-
-    print(f"{file_count} files scanned in {root}.\n")
+            size = os.path.getsize(file_path)
+        except OSError:
+            size = 0
+        sized.append((size, file_path))
+    sized.sort(key=lambda item: item[0], reverse=True)
+
+    count = max(1, min(count, len(files)))
+    chunks: List[List[Path]] = [[] for _ in range(count)]
+    heap = [(0, idx) for idx in range(count)]
+    for size, file_path in sized:
+        total, idx = heapq.heappop(heap)
+        chunks[idx].append(file_path)
+        heapq.heappush(heap, (total + size, idx))
+    return [chunk for chunk in chunks if chunk]
+
+
+class Throughput:
+    """Log periodic summaries of files and bytes checked, instead of one line per file."""
+
+    def __init__(self, total_files: int, interval: float = PROGRESS_INTERVAL):
+        self.total_files = total_files
+        self.interval = interval
+        self.files = 0
+        self.bytes = 0
+        self.start = time.monotonic()
+        self.last = self.start
+
+    def update(self, files: int, nbytes: int):
+        self.files += files
+        self.bytes += nbytes
+        now = time.monotonic()
+        if now - self.last >= self.interval:
+            self.last = now
+            self.log(now)
+
+    def summary(self):
+        self.log(time.monotonic())
+
+    def log(self, now: float):
+        elapsed = max(now - self.start, 1e-9)
+        logger.info(
+            "Checked %d/%d files, %.1f files/s, %.1f MB/s",
+            self.files,
+            self.total_files,
+            self.files / elapsed,
+            self.bytes / elapsed / ONE_MB_AS_BYTES,
+        )
 
 
 def word_parts(contents: str):
@@ -205,5 +335,5 @@ def verify_no_secret_keys(
     )
     keys -= validator_config.ALLOW_LIST
     keys -= validation.allow_list
-    for word in keys:
+    for word in sorted(keys):
         errors.append(PossibleSecretKey(file=file_location, word=word))
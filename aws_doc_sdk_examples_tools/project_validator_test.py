@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import List
 
 from aws_doc_sdk_examples_tools import project_validator
+from .fs import RecordFs
 from .metadata_errors import MetadataErrors
 
 
@@ -87,5 +88,66 @@ def test_verify_no_secret_keys(file_contents: str, expected_error_count: int):
     assert error_count == expected_error_count
 
 
+def test_balanced_chunks(tmp_path: Path):
+    files = []
+    for idx, size in enumerate([50, 10, 40, 20, 30, 30]):
+        path = tmp_path / f"file{idx}.py"
+        path.write_text("x" * size)
+        files.append(path)
+    chunks = project_validator.balanced_chunks(files, 3)
+    assert sorted(sum(chunks, [])) == sorted(files)
+    assert [sum(path.stat().st_size for path in chunk) for chunk in chunks] == [
+        60,
+        60,
+        60,
+    ]
+
+
+def test_check_files_parallel_matches_serial(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(project_validator, "MIN_FILES_PER_JOB", 1)
+    for idx in range(12):
+        key = f"key = 'AKAAIOSFODNN{idx % 10}EXAMPLE'" if idx % 3 else "pass"
+        contents = f"import os\n{key}\n"
+        (tmp_path / f"file{idx}.py").write_text(contents)
+    validation = project_validator.ValidationConfig()
+
+    serial = MetadataErrors()
+    project_validator.check_files(tmp_path, validation, serial, jobs=1)
+    parallel = MetadataErrors()
+    project_validator.check_files(tmp_path, validation, parallel, jobs=2)
+
+    assert len(serial) == 12 + 8
+    assert [*serial] == [*parallel]
+    assert [str(e.file) for e in parallel] == sorted(str(e.file) for e in parallel)
+
+
+def test_check_files_stops_at_max_errors(tmp_path: Path):
+    for idx in range(6):
+        contents = f"import os\nkey = 'AKAAIOSFODNN{idx}EXAMPLE'\n"
+        (tmp_path / f"file{idx}.py").write_text(contents)
+    validation = project_validator.ValidationConfig()
+
+    errors = MetadataErrors()
+    project_validator.check_files(tmp_path, validation, errors, max_errors=2)
+
+    # Each file has a possible secret key and is missing its SPDX header.
+    assert len(errors) == 2
+
+
+def test_check_files_reads_through_fs():
+    fs = RecordFs(
+        {
+            Path("/root/bom.py"): "\ufeff# SPDX-License-Identifier: Apache-2.0\n",
+            Path("/root/key.py"): "key = 'AKAAIOSFODNN7EXAMPLE'\n",
+        }
+    )
+    validation = project_validator.ValidationConfig()
+
+    errors = MetadataErrors()
+    project_validator.check_files(Path("/root"), validation, errors, fs=fs)
+
+    assert {str(error.file) for error in errors} == {"/root/key.py"}
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
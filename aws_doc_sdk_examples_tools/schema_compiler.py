@@ -0,0 +1,445 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Compile Yamale schemas into plain Python validation functions.
+
+yamale's Schema walks its tree of Validator objects generically for every document,
+building DataPath objects and checking every constraint of every node as it goes.
+compile_schema walks that tree once, and returns closures specialized to each node
+that produce the same error messages as Yamale. Nodes it does not know how to
+specialize fall back to Yamale's own validation for that node.
+"""
+
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+import yamale  # type: ignore
+from yamale import YamaleError  # type: ignore
+from yamale.schema import Schema  # type: ignore
+from yamale.schema.datapath import DataPath  # type: ignore
+from yamale.schema.validationresults import ValidationResult  # type: ignore
+from yamale.util import get_keys as yamale_get_keys  # type: ignore
+from yamale.util import is_list as yamale_is_list  # type: ignore
+from yamale.util import is_map as yamale_is_map  # type: ignore
+from yamale.validators import (  # type: ignore
+    Any as AnyValidator,
+    Boolean,
+    Enum,
+    Include,
+    Integer,
+    List as ListValidator,
+    Map,
+    Regex,
+    String,
+    Subset,
+    Validator,
+)
+
+# Validate data at a path, returning Yamale-formatted error messages.
+NodeCheck = Callable[[Any, Tuple, bool], List[str]]
+# Validate a single value, returning Yamale error messages without the path.
+ValueCheck = Callable[[Any], List[str]]
+
+
+# yamale.util's checks, with a shortcut for the plain dicts and lists that YAML loads
+# to, which avoids the much slower isinstance checks against ABCs.
+def is_map(obj: Any) -> bool:
+    return type(obj) is dict or yamale_is_map(obj)
+
+
+def is_list(obj: Any) -> bool:
+    return type(obj) is list or yamale_is_list(obj)
+
+
+def get_keys(obj: Any) -> Iterable:
+    kind = type(obj)
+    if kind is dict:
+        return obj.keys()
+    if kind is list:
+        return range(len(obj))
+    return yamale_get_keys(obj)
+
+
+def format_path(path: Tuple) -> str:
+    """Same as str(DataPath(*path))."""
+    return ".".join(map(str, path))
+
+
+_validation = threading.local()
+
+
+@contextmanager
+def validation_context(context: Any) -> Iterator[None]:
+    """Make context the one validators read, for validations on this thread."""
+    previous = current_context()
+    _validation.context = context
+    try:
+        yield
+    finally:
+        _validation.context = previous
+
+
+def current_context() -> Any:
+    """The context of the validation running on this thread, if any."""
+    return getattr(_validation, "context", None)
+
+
+class CompiledSchema:
+    def __init__(self, schema: Schema):
+        self.name = schema.name
+        self._includes: Dict[str, NodeCheck] = {}
+        self._check = self._compile(schema, schema._schema)
+        # Compiled up front rather than on first use, so validating never changes
+        # this schema. Includes can refer to themselves, so they're looked up by name.
+        for name, include_schema in schema.includes.items():
+            self._includes[name] = self._compile(include_schema, include_schema._schema)
+
+    def validate(self, data: Any, data_name: Any, strict: bool) -> ValidationResult:
+        """Same as yamale.schema.Schema.validate."""
+        return ValidationResult(data_name, self.name, self._check(data, (), strict))
+
+    def validate_all(
+        self,
+        data: Iterable[Tuple[Any, Any]],
+        strict: bool = True,
+        context: Any = None,
+    ) -> List[ValidationResult]:
+        """
+        Same as yamale.validate, raising YamaleError if any document is invalid.
+        Validators that need a context, like service_name, read context.
+        """
+        with validation_context(context):
+            results = [self.validate(d, path, strict) for d, path in data]
+        if not all(result.isValid() for result in results):
+            raise YamaleError(results)
+        return results
+
+    def _compile(self, schema: Schema, node: Any) -> NodeCheck:
+        if is_map(node) or is_list(node):
+            return self._compile_static(schema, node)
+        return self._compile_validator(schema, node)
+
+    def _compile_static(self, schema: Schema, node: Any) -> NodeCheck:
+        """A literal map or list in the schema, like the body of an include."""
+        node_is_map = is_map(node)
+        node_keys = set(get_keys(node))
+        items = [
+            (key, self._compile_item(schema, sub))
+            for key, sub in (node.items() if node_is_map else enumerate(node))
+        ]
+
+        def check_static(data: Any, path: Tuple, strict: bool) -> List[str]:
+            if node_is_map:
+                if not is_map(data):
+                    return ["%s : '%s' is not a map" % (format_path(path), data)]
+            elif not is_list(data):
+                return ["%s : '%s' is not a list" % (format_path(path), data)]
+
+            errors: List[str] = []
+            if strict:
+                for key in set(get_keys(data)) - node_keys:
+                    errors.append("%s: Unexpected element" % format_path(path + (key,)))
+            for key, item in items:
+                errors += item(data, path, strict, key)
+            return errors
+
+        return check_static
+
+    def _compile_item(
+        self, schema: Schema, node: Any
+    ) -> Callable[[Any, Tuple, bool, Any], List[str]]:
+        check = self._compile(schema, node)
+        optional = isinstance(node, Validator) and node.is_optional
+
+        def check_item(data: Any, path: Tuple, strict: bool, key: Any) -> List[str]:
+            try:
+                value = data[key]
+            except (KeyError, IndexError):
+                if optional:
+                    return []
+                return ["%s: Required field missing" % format_path(path + (key,))]
+            return check(value, path + (key,), strict)
+
+        return check_item
+
+    def _compile_validator(self, schema: Schema, validator: Validator) -> NodeCheck:
+        if isinstance(validator, Subset):
+            # Not used by our schemas; defer to Yamale.
+            def check_yamale(data: Any, path: Tuple, strict: bool) -> List[str]:
+                return schema._validate(validator, data, DataPath(*path), strict)
+
+            return check_yamale
+
+        skip_none = validator.is_optional and validator.can_be_none
+        check_value = compile_value(validator)
+        check_children = self._compile_children(schema, validator)
+
+        def check_node(data: Any, path: Tuple, strict: bool) -> List[str]:
+            if data is None and skip_none:
+                return []
+            errors = check_value(data)
+            if errors:
+                prefix = "%s: " % format_path(path)
+                return [prefix + error for error in errors]
+            if check_children is not None:
+                return check_children(data, path, strict)
+            return errors
+
+        return check_node
+
+    def _compile_children(
+        self, schema: Schema, validator: Validator
+    ) -> Optional[NodeCheck]:
+        if isinstance(validator, Include):
+            return self._compile_include(validator)
+
+        if isinstance(validator, (Map, ListValidator)):
+            if not validator.validators:
+                return None
+            children = [self._compile(schema, v) for v in validator.validators]
+
+            def check_collection(data: Any, path: Tuple, strict: bool) -> List[str]:
+                errors: List[str] = []
+                for key in get_keys(data):
+                    value = data[key]
+                    key_path = path + (key,)
+                    sub_errors = []
+                    for child in children:
+                        err = child(value, key_path, strict)
+                        if err:
+                            sub_errors.append(err)
+                        else:
+                            break
+                    if len(sub_errors) == len(children):
+                        for err in sub_errors:
+                            errors += err
+                return errors
+
+            return check_collection
+
+        if isinstance(validator, AnyValidator):
+            if not validator.validators:
+                return None
+            options = [self._compile(schema, v) for v in validator.validators]
+
+            def check_any(data: Any, path: Tuple, strict: bool) -> List[str]:
+                sub_errors = []
+                for option in options:
+                    err = option(data, path, strict)
+                    if not err:
+                        return []
+                    sub_errors.append(err)
+                errors: List[str] = []
+                for err in sub_errors:
+                    errors += err
+                return errors
+
+            return check_any
+
+        return None
+
+    def _compile_include(self, validator: Include) -> NodeCheck:
+        name = validator.include_name
+        include_strict = validator.strict
+        includes = self._includes
+
+        def check_include(data: Any, path: Tuple, strict: bool) -> List[str]:
+            check = includes.get(name)
+            if check is None:
+                return ["Include '%s' has not been defined." % name]
+            return check(
+                data, path, strict if include_strict is None else include_strict
+            )
+
+        return check_include
+
+
+def compile_value(validator: Validator) -> ValueCheck:
+    """Specialize Validator.validate for one validator."""
+    # Imported here, as metadata_validator uses this module.
+    from .metadata_validator import StringExtension
+
+    if isinstance(validator, StringExtension):
+        return compile_string_extension(validator)
+
+    constraints = [c for c in validator._constraints_inst if c.is_active]
+    fail = validator.fail
+    is_valid: Callable[[Any], Any]
+    kind: Type[Validator] = type(validator)
+    if kind is String:
+        is_valid = lambda value: isinstance(value, str)  # noqa: E731
+    elif kind is Integer:
+        is_valid = lambda value: isinstance(
+            value, int
+        ) and not isinstance(  # noqa: E731
+            value, bool
+        )
+    elif kind is Boolean:
+        is_valid = lambda value: isinstance(value, bool)  # noqa: E731
+    elif kind is Enum:
+        enums = validator.enums
+        is_valid = lambda value: value in enums  # noqa: E731
+    elif kind is Regex:
+        regexes = [r.match for r in validator.regexes]
+        is_valid = lambda value: isinstance(value, str) and any(  # noqa: E731
+            match(value) for match in regexes
+        )
+    elif kind is Map:
+        return compile_map_value(validator, constraints)
+    elif kind in (Include, AnyValidator):
+        return lambda value: []
+    else:
+        # Custom validators like service_name or block_content.
+        is_valid = validator._is_valid
+
+    if not constraints:
+
+        def check_value(value: Any) -> List[str]:
+            if not is_valid(value):
+                return [fail(value)]
+            return []
+
+        return check_value
+
+    def check_constrained_value(value: Any) -> List[str]:
+        if not is_valid(value):
+            return [fail(value)]
+        errors: List[str] = []
+        for constraint in constraints:
+            error = constraint.is_valid(value)
+            if error:
+                if isinstance(error, list):
+                    errors.extend(error)
+                else:
+                    errors.append(error)
+        return errors
+
+    return check_constrained_value
+
+
+def compile_map_value(validator: Map, constraints: List[Any]) -> ValueCheck:
+    """Map validation, with the key=... constraint compiled as well."""
+    from yamale.validators.constraints import Key  # type: ignore
+
+    others = [c for c in constraints if not isinstance(c, Key)]
+    keys = [compile_value(c.key) for c in constraints if isinstance(c, Key)]
+    fail = validator.fail
+
+    def check_map(value: Any) -> List[str]:
+        if not is_map(value):
+            return [fail(value)]
+        errors: List[str] = []
+        for constraint in others:
+            error = constraint.is_valid(value)
+            if error:
+                if isinstance(error, list):
+                    errors.extend(error)
+                else:
+                    errors.append(error)
+        for check_key in keys:
+            for k in value.keys():
+                errors.extend("Key error - %s" % e for e in check_key(k))
+        return errors
+
+    return check_map
+
+
+def compile_string_extension(validator: Any) -> ValueCheck:
+    """Specialize StringExtension._is_valid to the options set for this node."""
+    from .metadata_validator import StringExtension
+
+    checks: List[Tuple[Callable[[Any], Any], str]] = []
+    if validator.check_aws:
+        checks.append(
+            (
+                StringExtension._validate_aws_entity_usage,
+                'valid string: it contains a non-entity usage of "AWS"',
+            )
+        )
+    if validator.upper_start:
+        checks.append(
+            (
+                lambda value: str.isupper(value[0]),
+                "valid string: it must start with an uppercase letter",
+            )
+        )
+    if validator.lower_start:
+        checks.append(
+            (
+                lambda value: str.islower(value[0]),
+                "valid string: it must start with a lowercase letter",
+            )
+        )
+    if validator.end_punc:
+        checks.append(
+            (
+                lambda value: value.rstrip()[-1] in "!.?",
+                "valid sentence or phrase: it must end with punctuation",
+            )
+        )
+    if validator.no_end_punc:
+        checks.append(
+            (
+                lambda value: value.rstrip()[-1] not in "!.?",
+                "valid string: it must not end with punctuation",
+            )
+        )
+    if validator.end_punc_or_colon:
+        checks.append(
+            (
+                lambda value: value.rstrip()[-1] in "!.?:",
+                "valid sentence or phrase: it must end with punctuation or a colon",
+            )
+        )
+    if validator.end_punc_or_semicolon:
+        checks.append(
+            (
+                lambda value: value.rstrip()[-1] in "!.?;",
+                "valid sentence or phrase: it must end with punctuation or a semicolon",
+            )
+        )
+    constraints = [c for c in validator._constraints_inst if c.is_active]
+
+    def check_string(value: Any) -> List[str]:
+        if value != "":
+            for check, err in checks:
+                if not check(value):
+                    return ["'%s' is not a %s." % (value, err)]
+            if not isinstance(value, str):
+                # StringExtension reports the last error any value had here, which
+                # depends on what else was validated. This doesn't keep that state.
+                return ["'%s' is not a valid string." % (value,)]
+        errors: List[str] = []
+        for constraint in constraints:
+            error = constraint.is_valid(value)
+            if error:
+                if isinstance(error, list):
+                    errors.extend(error)
+                else:
+                    errors.append(error)
+        return errors
+
+    return check_string
+
+
+@lru_cache(maxsize=16)
+def _compiled_schema(
+    schema_path: Path, validators: Tuple[Tuple[str, Any], ...]
+) -> CompiledSchema:
+    return CompiledSchema(yamale.make_schema(schema_path, validators=dict(validators)))
+
+
+def compile_schema(
+    schema_path: Path, validators: Dict[str, Validator]
+) -> CompiledSchema:
+    """
+    Load and compile a Yamale schema file, once per set of validators. Validators
+    get their context from validate_all rather than being bound to one, so the same
+    compiled schema serves every validation. Unlike Yamale's, a compiled schema
+    keeps no state between documents, so threads can share it.
+    """
+    return _compiled_schema(schema_path, tuple(sorted(validators.items())))
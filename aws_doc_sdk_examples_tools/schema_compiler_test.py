@@ -0,0 +1,93 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Tests that compiled schemas report the same errors as Yamale.
+"""
+
+from pathlib import Path
+from typing import List
+
+import pytest
+import yamale  # type: ignore
+
+from .metadata_validator import ServiceName, ValidationContext, yamale_validators
+from .schema_compiler import compile_schema, current_context, validation_context
+
+CONFIG = Path(__file__).parent / "config"
+RESOURCES = Path(__file__).parent / "test_resources"
+
+
+def results(validate) -> List[str]:
+    try:
+        return [str(result) for result in validate()]
+    except yamale.YamaleError as e:
+        return [e.message]
+
+
+@pytest.mark.parametrize("strict", [True, False])
+@pytest.mark.parametrize(
+    "schema_name,metadata",
+    [
+        ("example_schema.yaml", "valid_metadata.yaml"),
+        ("example_schema.yaml", "errors_metadata.yaml"),
+        ("example_strict_schema.yaml", "valid_metadata.yaml"),
+        ("example_strict_schema.yaml", "errors_metadata.yaml"),
+        (
+            "example_strict_schema.yaml",
+            "doc_gen_test/.doc_gen/metadata/aws_entity_metadata.yaml",
+        ),
+        ("sdks_schema.yaml", "sdks.yaml"),
+        ("services_schema.yaml", "services.yaml"),
+        # Valid documents against the wrong schema make plenty of errors.
+        ("services_schema.yaml", "sdks.yaml"),
+    ],
+)
+def test_compiled_schema_matches_yamale(schema_name: str, metadata: str, strict: bool):
+    context = ValidationContext(services={"sqs": {}, "sns": {}})
+    validators = yamale_validators()
+    data = yamale.make_data(RESOURCES / metadata)
+
+    schema = yamale.make_schema(CONFIG / schema_name, validators=validators)
+    with validation_context(context):
+        expected = results(lambda: yamale.validate(schema, data, strict=strict))
+
+    compiled = compile_schema(CONFIG / schema_name, validators)
+    assert (
+        results(lambda: compiled.validate_all(data, strict=strict, context=context))
+        == expected
+    )
+
+
+def test_compile_schema_is_cached():
+    validators = yamale_validators()
+    assert compile_schema(CONFIG / "example_schema.yaml", validators) is (
+        compile_schema(CONFIG / "example_schema.yaml", yamale_validators())
+    )
+
+
+def test_validate_all_context():
+    service = ServiceName()
+    assert service.context.services == {}
+    context = ValidationContext(services={"sqs": {}})
+    with validation_context(context):
+        assert service.context is context
+        assert service.is_valid("sqs")
+        assert not service.is_valid("sns")
+    assert current_context() is None
+
+
+def test_string_errors_do_not_depend_on_earlier_documents(tmp_path: Path):
+    schema_path = tmp_path / "schema.yaml"
+    schema_path.write_text("title: str(check_aws=False, upper_start=True)\n")
+    compiled = compile_schema(schema_path, yamale_validators())
+
+    lower = compiled.validate({"title": "lower"}, "lower.yaml", True)
+    # A list whose first item starts with an uppercase letter passes every check
+    # but being a string.
+    listed = compiled.validate({"title": ["U"]}, "listed.yaml", True)
+
+    assert lower.errors == [
+        "title: 'lower' is not a valid string: it must start with an uppercase letter."
+    ]
+    assert listed.errors == ["title: '['U']' is not a valid string."]
@@ -8,7 +8,7 @@ import re
 
 from .validator_config import skip
 from .file_utils import get_files, clear
-from .fs import Fs, PathFs
+from .fs import Buffer, Fs, PathFs
 from .metadata import Example
 from .metadata_errors import MetadataErrors, MetadataError
 from .project_validator import (
@@ -20,6 +20,8 @@ from . import validator_config
 
 SNIPPET_START = "snippet-start:["
 SNIPPET_END = "snippet-end:["
+# Both tags contain this, so files without it have no snippets.
+SNIPPET_MARKER = b"snippet-"
 
 
 @dataclass
@@ -152,6 +154,10 @@ def find_snippets(
     errors = MetadataErrors()
     snippets: Dict[str, Snippet] = {}
     try:
+        with fs.mmap(file) as contents:
+            if contents.find(SNIPPET_MARKER) == -1 and is_utf8(contents):
+                # Most files have no snippets, and don't need splitting into lines.
+                return snippets, errors
         lines = fs.readlines(file)
         snippets, errs = parse_snippets(lines, file, prefix)
         errors.extend(errs)
@@ -164,12 +170,29 @@ def find_snippets(
     return snippets, errors
 
 
+def is_utf8(contents: Buffer) -> bool:
+    if isinstance(contents, bytes) and contents.isascii():
+        return True
+    try:
+        str(contents, "utf-8")
+    except UnicodeDecodeError:
+        # Read it again as text to report the error the same way.
+        return False
+    return True
+
+
 def collect_snippets(
-    root: Path, prefix: str = "", fs: Fs = PathFs()
+    root: Path,
+    prefix: str = "",
+    fs: Fs = PathFs(),
+    files: Optional[Iterable[Path]] = None,
 ) -> Tuple[Dict[str, Snippet], MetadataErrors]:
+    """Find snippets in every file under root, or only in files when given."""
     snippets: Dict[str, Snippet] = {}
     errors = MetadataErrors()
-    for file in get_files(root, skip, fs=fs):
+    if files is None:
+        files = get_files(root, skip, fs=fs)
+    for file in files:
         snips, errs = find_snippets(file, prefix, fs=fs)
         snippets.update(snips)
         errors.extend(errs)
@@ -184,42 +207,48 @@ def collect_snippet_files(
     root: Path,
     fs: Fs = PathFs(),
 ):
-    for example in examples:
-        for lang in example.languages:
-            language = example.languages[lang]
-            for version in language.versions:
-                for excerpt in version.excerpts:
-                    for snippet_file in excerpt.snippet_files:
-                        snippet_path = root / snippet_file
-                        snippet_stat = fs.stat(snippet_path)
-                        if not snippet_stat.exists:
-                            # Ensure all snippet_files exist
-                            errors.append(
-                                MissingSnippetFile(
-                                    file=example.file,
-                                    snippet_file=snippet_file,
-                                    id=f"{lang}:{version.sdk_version}",
-                                )
-                            )
-                            continue
-                        if re.search(win_unsafe_re, str(snippet_file)):
-                            errors.append(
-                                WindowsUnsafeSnippetFile(
-                                    file=example.file,
-                                    snippet_file=snippet_file,
-                                    id=f"{lang}:{version.sdk_version}",
-                                )
-                            )
-                            continue
-                        name = prefix + str(snippet_file).replace("/", ".")
-                        code = fs.readlines(snippet_path)
-                        snippets[name] = Snippet(
-                            id=name,
-                            file=snippet_file,
-                            line_start=0,
-                            line_end=len(code),
-                            code="".join(strip_snippet_tags(strip_spdx_header(code))),
-                        )
+    # Stat and read the files in batches, then report and store them in order.
+    found = [
+        (example, lang, version, snippet_file)
+        for example in examples
+        for lang in example.languages
+        for version in example.languages[lang].versions
+        for excerpt in version.excerpts
+        for snippet_file in excerpt.snippet_files
+    ]
+    stats = fs.stat_many(root / snippet_file for *_, snippet_file in found)
+    to_read: List[str] = []
+    for (example, lang, version, snippet_file), snippet_stat in zip(found, stats):
+        if not snippet_stat.exists:
+            # Ensure all snippet_files exist
+            errors.append(
+                MissingSnippetFile(
+                    file=example.file,
+                    snippet_file=snippet_file,
+                    id=f"{lang}:{version.sdk_version}",
+                )
+            )
+            continue
+        if re.search(win_unsafe_re, str(snippet_file)):
+            errors.append(
+                WindowsUnsafeSnippetFile(
+                    file=example.file,
+                    snippet_file=snippet_file,
+                    id=f"{lang}:{version.sdk_version}",
+                )
+            )
+            continue
+        to_read.append(snippet_file)
+    codes = fs.readlines_many(root / snippet_file for snippet_file in to_read)
+    for snippet_file, code in zip(to_read, codes):
+        name = prefix + str(snippet_file).replace("/", ".")
+        snippets[name] = Snippet(
+            id=name,
+            file=snippet_file,
+            line_start=0,
+            line_end=len(code),
+            code="".join(strip_snippet_tags(strip_spdx_header(code))),
+        )
 
 
 def strip_snippet_tags(lines: List[str]) -> List[str]:
@@ -5,7 +5,7 @@ import pytest
 from pathlib import Path
 
 from aws_doc_sdk_examples_tools import snippets
-from aws_doc_sdk_examples_tools.fs import RecordFs
+from aws_doc_sdk_examples_tools.fs import PathFs, RecordFs
 from aws_doc_sdk_examples_tools.metadata import Example, Language, Version, Excerpt
 from aws_doc_sdk_examples_tools.metadata_errors import MetadataErrors
 
@@ -147,6 +147,18 @@ def hello():
         assert len(snippet_dict) == 0
         assert len(errors) == 1  # Should have a FileReadError
 
+    def test_find_snippets_without_tags(self, tmp_path: Path):
+        """Files without tags are skipped, but still checked for invalid UTF-8."""
+        plain = tmp_path / "plain.py"
+        plain.write_text("print('caf\u00e9')\n", encoding="utf-8")
+        latin = tmp_path / "latin.py"
+        latin.write_bytes("print('caf\u00e9')\n".encode("latin-1"))
+
+        assert snippets.find_snippets(plain, "", fs=PathFs()) == ({}, MetadataErrors())
+        snippet_dict, errors = snippets.find_snippets(latin, "", fs=PathFs())
+        assert snippet_dict == {}
+        assert [type(error) for error in errors] == [snippets.MetadataUnicodeError]
+
 
 class TestCollectSnippetsFs:
     """Test collect_snippets with filesystem abstraction."""
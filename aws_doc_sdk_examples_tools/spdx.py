@@ -2,12 +2,17 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from shutil import copyfileobj, copymode
+from sys import exit
+from typing import BinaryIO, Iterable, List, Optional
+import os
 import re
-from sys import argv
 
+from .file_utils import get_files
 from .metadata_errors import MetadataError, MetadataErrors
 from aws_doc_sdk_examples_tools import validator_config
 
@@ -36,6 +41,13 @@ RE_COPYRIGHT = validator_config.SPDX_LEADER + validator_config.SPDX_COPYRIGHT
 RE_LICENSE = validator_config.SPDX_LEADER + validator_config.SPDX_LICENSE
 
 
+# Bytes to read from the start of a file when looking for its SPDX header.
+HEADER_BYTES = 512
+# The header is at most a skipped first line, the copyright, and the license.
+HEADER_LINES = 3
+BOM = "\ufeff".encode("utf-8")
+
+
 def skip_first_line(lines: List[str]) -> bool:
     return (
         lines[0].startswith("#!")
@@ -44,11 +56,46 @@ def skip_first_line(lines: List[str]) -> bool:
     )
 
 
+def header_lines(file_contents: str, count: int = HEADER_LINES) -> List[str]:
+    """The first count lines of file_contents, without splitting the rest of it."""
+    end = 0
+    for _ in range(count):
+        end = file_contents.find("\n", end) + 1
+        if end == 0:
+            end = len(file_contents)
+            break
+    return file_contents[:end].splitlines()
+
+
+def read_header(path: Path, size: int = HEADER_BYTES) -> bytes:
+    with open(path, "rb") as file:
+        return read_header_from(file, size)
+
+
+def read_header_from(file: BinaryIO, size: int = HEADER_BYTES) -> bytes:
+    """
+    Read the start of a file, enough to hold HEADER_LINES complete lines unless the
+    file is shorter. Usually this is a single read of size bytes.
+    """
+    header = file.read(size)
+    while header.count(b"\n") < HEADER_LINES:
+        more = file.read(size)
+        if not more:
+            break
+        header += more
+    return header
+
+
+def decode_header(header: bytes) -> str:
+    # A multi-byte character may be cut off at the end of the header.
+    return header.decode("utf-8-sig", errors="ignore")
+
+
 def verify_spdx(file_contents: str, file_location: Path, errors: MetadataErrors):
     """Verify the file starts with an SPDX comment, possibly following a shebang line"""
     if file_location.suffix in validator_config.IGNORE_SPDX_SUFFIXES:
         return
-    lines = file_contents.splitlines()
+    lines = header_lines(file_contents)
     if len(lines) == 0:
         return
     if skip_first_line(lines):
@@ -81,30 +128,135 @@ def verify_spdx(file_contents: str, file_location: Path, errors: MetadataErrors)
             )
 
 
-def insert_spdx(path: Path):
-    with open(path, encoding="utf8") as f:
-        contents = f.readlines()
+def verify_spdx_file(file_location: Path, errors: MetadataErrors):
+    """Verify the SPDX header of a file on disk, reading only the start of it."""
+    if file_location.suffix in validator_config.IGNORE_SPDX_SUFFIXES:
+        return
+    verify_spdx(decode_header(read_header(file_location)), file_location, errors)
+
+
+def spdx_lines(path: Path) -> List[str]:
     prefix = "//"
     if path.suffix in [".py", ".sh", ".rb"]:
         prefix = "#"
     if path.suffix in [".abap"]:
         prefix = '"'
-    offset = 1 if skip_first_line(contents) else 0
-    contents.insert(
-        offset,
+    return [
         prefix
         + " Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.\n",
-    )
-    contents.insert(offset + 1, prefix + " SPDX-License-Identifier: Apache-2.0\n")
-    with open(path, "wt", encoding="utf-8-sig") as f:
-        f.writelines(contents)
+        prefix + " SPDX-License-Identifier: Apache-2.0\n",
+    ]
+
+
+def insert_spdx(path: Path):
+    """
+    Insert an SPDX header at the start of a file, after any line that must stay first.
+    Only the start of the file is decoded; the rest is copied through unchanged.
+    """
+    spdx = "".join(spdx_lines(path)).encode("utf-8")
+    tmp = path.with_name(f".{path.name}.spdx")
+    with open(path, "rb") as source, open(tmp, "wb") as target:
+        header = read_header_from(source)
+        if header.startswith(BOM):
+            header = header[len(BOM) :]
+        offset = 0
+        lines = decode_header(header).splitlines()
+        if lines and skip_first_line(lines):
+            offset = header.find(b"\n") + 1 or len(header)
+        # Like writing with utf-8-sig, the updated file always starts with a BOM.
+        target.write(BOM + header[:offset] + spdx + header[offset:])
+        copyfileobj(source, target)
+    copymode(path, tmp)
+    os.replace(tmp, path)
+
+
+def check_spdx(paths: Iterable[Path], jobs: int = 1) -> MetadataErrors:
+    """Verify the SPDX headers of many files, reading them in jobs threads."""
+
+    def check(path: Path) -> MetadataErrors:
+        errors = MetadataErrors()
+        try:
+            verify_spdx_file(path, errors)
+        except OSError as e:
+            print(f"Could not verify {path}: {e}")
+            errors.append(MissingSPDX(file=path))
+        return errors
+
+    errors = MetadataErrors()
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        for file_errors in executor.map(check, paths):
+            errors.extend(file_errors)
+    return errors
+
+
+def fix_spdx(paths: Iterable[Path], jobs: int = 1) -> List[Path]:
+    """Insert headers into the files that are missing one, returning the fixed files."""
+
+    def fix(path: Path) -> Optional[Path]:
+        errors = MetadataErrors()
+        verify_spdx_file(path, errors)
+        if any(isinstance(error, MissingSPDX) for error in errors):
+            insert_spdx(path)
+            return path
+        return None
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        return [path for path in executor.map(fix, paths) if path is not None]
+
+
+def expand_paths(paths: Iterable[Path]) -> List[Path]:
+    """Files named directly, and the files found when walking named directories."""
+    files: List[Path] = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(get_files(path, validator_config.skip))
+        else:
+            files.append(path)
+    return files
 
 
 def main():
-    for p in argv[1:]:
-        p = Path(p)
+    parser = ArgumentParser(
+        description="Insert or verify SPDX headers. By default, inserts a header into each path."
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        type=Path,
+        help="Files, or directories to walk for files.",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--check",
+        action="store_true",
+        help="Report files with missing or invalid SPDX headers, and exit non-zero if any are found.",
+    )
+    mode.add_argument(
+        "--fix",
+        action="store_true",
+        help="Insert headers into files that are missing one.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="The number of files to process at once.",
+    )
+    args = parser.parse_args()
+
+    if args.check:
+        errors = check_spdx(expand_paths(args.paths), args.jobs)
+        if len(errors) > 0:
+            print(errors)
+        return len(errors)
+    if args.fix:
+        for path in fix_spdx(expand_paths(args.paths), args.jobs):
+            print(f"Inserted SPDX header in {path}")
+        return 0
+    for p in args.paths:
         insert_spdx(p)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    exit(main())
@@ -7,7 +7,15 @@ from pathlib import Path
 from typing import List
 
 from .metadata_errors import MetadataError, MetadataErrors
-from .spdx import verify_spdx, MissingSPDX
+from .spdx import (
+    check_spdx,
+    fix_spdx,
+    header_lines,
+    insert_spdx,
+    verify_spdx,
+    MissingSPDX,
+    HEADER_BYTES,
+)
 
 
 @pytest.mark.parametrize(
@@ -54,3 +62,49 @@ def test_verify_spdx(ext: str, contents: str, expected_errors: List[MetadataErro
     errors = MetadataErrors()
     verify_spdx(contents, Path(f"/tmp/file.{ext}"), errors)
     assert expected_errors == [*errors]
+
+
+def test_header_lines():
+    assert header_lines("a\nb\r\nc\nd\ne") == ["a", "b", "c"]
+    assert header_lines("a\nb") == ["a", "b"]
+    assert header_lines("") == []
+
+
+SPDX_PY = (
+    "# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.\n"
+    "# SPDX-License-Identifier: Apache-2.0\n"
+)
+
+
+@pytest.mark.parametrize(
+    "contents,expected",
+    [
+        ("def foo():\n\tpass\n", SPDX_PY + "def foo():\n\tpass\n"),
+        (
+            "#!/usr/bin/python\r\ndef foo():\r\n\tpass\r\n",
+            "#!/usr/bin/python\r\n" + SPDX_PY + "def foo():\r\n\tpass\r\n",
+        ),
+        ("", SPDX_PY),
+    ],
+)
+def test_insert_spdx(tmp_path: Path, contents: str, expected: str):
+    path = tmp_path / "file.py"
+    # Make sure the body is longer than the header that gets read.
+    body = "# filler\n" * HEADER_BYTES
+    path.write_bytes((contents + body).encode("utf-8"))
+    insert_spdx(path)
+    assert path.read_bytes() == ("\ufeff" + expected + body).encode("utf-8")
+    errors = MetadataErrors()
+    verify_spdx(path.read_text(encoding="utf-8-sig"), path, errors)
+    assert [*errors] == []
+
+
+def test_fix_and_check_spdx(tmp_path: Path):
+    valid = tmp_path / "valid.py"
+    valid.write_text(SPDX_PY + "\ndef foo():\n\tpass\n")
+    missing = tmp_path / "missing.py"
+    missing.write_text("def foo():\n\tpass\n")
+
+    assert [*check_spdx([valid, missing], jobs=2)] == [MissingSPDX(file=missing)]
+    assert fix_spdx([valid, missing], jobs=2) == [missing]
+    assert [*check_spdx([valid, missing], jobs=2)] == []
@@ -1,8 +1,10 @@
+from argparse import ArgumentParser
 from typing import List
 from pathlib import Path
 from pprint import pformat
 
 from .doc_gen import DocGen
+from .profiling import profiled
 
 
 def main(roots: List[str]):
@@ -22,7 +24,23 @@ def main(roots: List[str]):
         print(f"GenAI	{genai}")
 
 
-if __name__ == "__main__":
-    from sys import argv
+def cli():
+    parser = ArgumentParser(description="Print statistics of doc_gen roots.")
+    parser.add_argument("roots", nargs="*", help="Paths with a .doc_gen folder.")
+    parser.add_argument(
+        "--profile-out",
+        metavar="PATH",
+        help="Profile the run with cProfile, writing pstats to PATH and collapsed stacks for flame graphs to PATH.collapsed.",
+    )
+    parser.add_argument(
+        "--profile-phase",
+        metavar="PHASE",
+        help="With --profile-out, only profile this phase, such as snippets.",
+    )
+    args = parser.parse_args()
+    with profiled(args.profile_out, args.profile_phase):
+        main(args.roots)
+
 
-    main(argv[1:])
+if __name__ == "__main__":
+    cli()
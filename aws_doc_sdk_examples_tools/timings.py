@@ -0,0 +1,112 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Wall time, CPU time and item counts for the named phases of a run.
+"""
+
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from threading import Lock
+from time import perf_counter, process_time
+from typing import Dict, Iterator, List, Mapping
+
+from .phases import phase
+
+
+@dataclass
+class Span:
+    name: str
+    calls: int = 0
+    # Seconds.
+    wall: float = 0.0
+    # Seconds of CPU time for the whole process, including other threads.
+    cpu: float = 0.0
+    # Whatever the phase works through, such as files, examples or characters.
+    items: int = 0
+
+    def add(self, other: "Span"):
+        self.calls += other.calls
+        self.wall += other.wall
+        self.cpu += other.cpu
+        self.items += other.items
+
+
+# The spans open in this thread, by name.
+active_spans: ContextVar[Mapping[str, Span]] = ContextVar("active_spans", default={})
+
+
+class Timings:
+    """
+    Spans by name, in the order they were first recorded. A span started inside
+    another of the same name, such as by recursion, is part of the outer one. Spans
+    of different names may nest, and the outer one's time includes the inner one's.
+    """
+
+    def __init__(self) -> None:
+        self.spans: Dict[str, Span] = {}
+        self._lock = Lock()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[Span]:
+        """
+        Time the with block as name. Add to the yielded span's items to count them.
+        File system I/O in the block is counted against the phase of the same name.
+        """
+        active = active_spans.get()
+        if name in active:
+            yield active[name]
+            return
+        current = Span(name, calls=1)
+        token = active_spans.set({**active, name: current})
+        wall, cpu = perf_counter(), process_time()
+        try:
+            with phase(name):
+                yield current
+        finally:
+            current.wall = perf_counter() - wall
+            current.cpu = process_time() - cpu
+            active_spans.reset(token)
+            self.add(current)
+
+    def add(self, span: Span):
+        with self._lock:
+            if span.name in self.spans:
+                self.spans[span.name].add(span)
+            else:
+                self.spans[span.name] = Span(**asdict(span))
+
+    def merge(self, other: "Timings"):
+        for span in other.list():
+            self.add(span)
+
+    def list(self) -> List[Span]:
+        with self._lock:
+            return [Span(**asdict(span)) for span in self.spans.values()]
+
+    def format(self, format: str = "table") -> str:
+        """The spans as JSON lines, or as a table with a row for each."""
+        spans = self.list()
+        if format == "jsonl":
+            return "\n".join(json.dumps(asdict(span)) for span in spans)
+        rows = [["phase", "calls", "wall", "cpu", "items"]]
+        for span in spans:
+            rows.append(
+                [
+                    span.name,
+                    str(span.calls),
+                    f"{span.wall:.3f}",
+                    f"{span.cpu:.3f}",
+                    str(span.items),
+                ]
+            )
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        return "\n".join(
+            "  ".join(
+                cell.ljust(width) if i == 0 else cell.rjust(width)
+                for i, (cell, width) in enumerate(zip(row, widths))
+            ).rstrip()
+            for row in rows
+        )
@@ -0,0 +1,73 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+from pathlib import Path
+
+from .doc_gen import DocGen
+from .phases import current_phase
+from .timings import Span, Timings
+
+
+def test_timings_spans():
+    timings = Timings()
+    with timings.span("outer") as outer:
+        assert current_phase.get() == "outer"
+        outer.items += 1
+        with timings.span("inner"):
+            assert current_phase.get() == "inner"
+            # The same name again is part of the span already open.
+            with timings.span("outer") as again:
+                again.items += 1
+    with timings.span("inner") as inner:
+        inner.items += 5
+
+    spans = {span.name: span for span in timings.list()}
+    assert [*spans] == ["inner", "outer"]
+    assert spans["outer"].calls == 1
+    assert spans["outer"].items == 2
+    assert spans["inner"].calls == 2
+    assert spans["inner"].items == 5
+    assert spans["outer"].wall >= spans["inner"].wall >= 0
+
+
+def test_timings_merge_and_format():
+    first, second = Timings(), Timings()
+    first.add(Span("load", calls=1, wall=1.0, cpu=0.5, items=3))
+    second.add(Span("load", calls=2, wall=2.0, cpu=1.0, items=4))
+    second.add(Span("save", calls=1))
+    first.merge(second)
+
+    lines = [json.loads(line) for line in first.format("jsonl").splitlines()]
+    assert lines == [
+        {"name": "load", "calls": 3, "wall": 3.0, "cpu": 1.5, "items": 7},
+        {"name": "save", "calls": 1, "wall": 0.0, "cpu": 0.0, "items": 0},
+    ]
+    table = first.format().splitlines()
+    assert table[0].split() == ["phase", "calls", "wall", "cpu", "items"]
+    assert table[1].split() == ["load", "3", "3.000", "1.500", "7"]
+
+
+def test_doc_gen_timings():
+    root = Path(__file__).parent / "test_resources" / "doc_gen_test"
+    doc_gen = DocGen.from_root(root)
+    doc_gen.collect_snippets(root)
+    doc_gen.validate()
+    doc_gen.fill_missing_fields()
+    doc_gen.expand_entity_fields(doc_gen)
+
+    spans = {span.name: span for span in doc_gen.timings.list()}
+    assert [*spans] == [
+        "config",
+        "metadata",
+        "snippets",
+        "metadata validation",
+        "fill missing fields",
+        "expand entities",
+    ]
+    assert spans["metadata"].items == 1
+    assert spans["expand entities"].calls == 1
+
+    merged = DocGen.empty()
+    merged.merge(doc_gen)
+    assert [span.name for span in merged.timings.list()] == [*spans]
@@ -2,12 +2,28 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import argparse
+import os
 from ast import literal_eval
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from pathlib import Path
 from sys import exit
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
+from .archive_fs import open_archive
+from .counting_fs import CountingFs
 from .doc_gen import DocGen
+from .fs import Fs, PathFs, caching_fs
+from .git_changes import ChangedFiles
+from .git_fs import GitTreeFs
+from .metadata_errors import ErrorSink, MetadataErrors
+from .memory import MemoryReport
+from .profiling import profiled
 from .project_validator import check_files, verify_sample_files, ValidationConfig
+from .snippets import find_snippets, parse_snippets
+from .timings import Timings
+from .validator_config import skip
 
 
 def main():
@@ -15,7 +31,7 @@ def main():
     parser.add_argument(
         "--root",
         default=f"{Path(__file__).parent.parent.parent}",
-        help="The root path from which to search for files to check. The default is the root of the git repo (two up from this file).",
+        help="The root path from which to search for files to check, or a zip or tar archive of one. The default is the root of the git repo (two up from this file).",
     )
     parser.add_argument(
         "--doc_gen_only",
@@ -36,48 +52,403 @@ def main():
         "--config",
         help="The path to the local config folder to use for validation in addition to the root config.",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="The number of processes to use when scanning files. The default is one per CPU.",
+    )
+    parser.add_argument(
+        "--since",
+        help="Only validate files changed since this local git ref, and the metadata and snippets related to them.",
+    )
+    parser.add_argument(
+        "--stream-errors",
+        nargs="?",
+        const="-",
+        metavar="PATH",
+        help="Write errors as they are found instead of all at the end. Without PATH, errors are written to stdout as text; with PATH, to that file as one JSON object per line.",
+    )
+    parser.add_argument(
+        "--error-cap",
+        type=int,
+        help="When streaming errors, write at most this many. Later errors are still counted.",
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Stop validating once an error has been found, the same as --max-errors 1.",
+    )
+    parser.add_argument(
+        "--max-errors",
+        type=int,
+        help="Stop validating once this many errors have been found.",
+    )
+    parser.add_argument(
+        "--rev",
+        help="Validate the files of this git revision under --root, read from the object database instead of the work tree.",
+    )
+    parser.add_argument(
+        "--no-fs-cache",
+        action="store_true",
+        help="Stat, list and read files every time they are needed, instead of caching them for the run.",
+    )
+    parser.add_argument(
+        "--cache-contents",
+        action="store_true",
+        help="Keep up to 256 MiB of file contents for the run, instead of 32 MiB.",
+    )
+    parser.add_argument(
+        "--io-report",
+        nargs="?",
+        const="table",
+        choices=["table", "json"],
+        help="After validating, print the file system calls, paths, bytes and latencies of each phase, as a table or as JSON.",
+    )
+    parser.add_argument(
+        "--timings",
+        nargs="?",
+        const="table",
+        choices=["table", "jsonl"],
+        help="After validating, print the wall time, CPU time and items of each phase, as a table or as JSON lines.",
+    )
+    parser.add_argument(
+        "--memory-report",
+        action="store_true",
+        help="After validating, print the memory each phase allocated and kept, its top allocation sites, and the size of what the DocGen holds.",
+    )
+    parser.add_argument(
+        "--profile-out",
+        metavar="PATH",
+        help="Profile the run with cProfile, writing pstats to PATH and collapsed stacks for flame graphs to PATH.collapsed.",
+    )
+    parser.add_argument(
+        "--profile-phase",
+        metavar="PHASE",
+        help="With --profile-out, only profile this phase, such as snippets.",
+    )
     args = parser.parse_args()
+    if args.max_errors is not None and args.max_errors < 1:
+        parser.error("--max-errors must be at least 1")
+    max_errors = 1 if args.fail_fast else args.max_errors
     root_path = Path(args.root).resolve()
     config_path = Path(args.config).resolve() if args.config else None
-    return validate(root_path, config_path, args.strict_titles, args.doc_gen_only)
+    base: Fs = PathFs()
+    tree = GitTreeFs(root_path, args.rev) if args.rev else open_archive(root_path)
+    if tree is not None:
+        # Sample file and per-file checks, and git, read the work tree itself.
+        if not args.doc_gen_only or args.since:
+            tree.close()
+            parser.error(
+                "an archive --root or --rev only supports --doc_gen_only True without --since"
+            )
+        root_path = tree.root
+        base = tree
+    # Count what reaches the underlying Fs, not what the cache answers.
+    counting = CountingFs(base) if args.io_report else None
+    if counting is not None:
+        base = counting
+    fs = base if args.no_fs_cache else caching_fs(base, args.cache_contents)
+    sink = (
+        ErrorSink.open(args.stream_errors, args.error_cap)
+        if args.stream_errors
+        else None
+    )
+    memory = MemoryReport() if args.memory_report else None
+    # Closing the tree ends the git process reading it, if there is one.
+    with tree if tree is not None else nullcontext(), profiled(
+        args.profile_out, args.profile_phase
+    ):
+        error_count = validate(
+            root_path,
+            config_path,
+            args.strict_titles,
+            args.doc_gen_only,
+            args.jobs,
+            args.since,
+            sink,
+            max_errors,
+            fs,
+            args.timings,
+            memory,
+        )
+    if counting is not None:
+        print(counting.format_report(args.io_report))
+    return error_count
+
+
+@dataclass
+class RootValidation:
+    """The outcome of validating one root."""
+
+    root: Path
+    doc_gen: DocGen
+    # Phases not run because the error budget was used up.
+    skipped: List[str] = field(default_factory=list)
+
+    @property
+    def errors(self) -> MetadataErrors:
+        return self.doc_gen.errors
 
 
 def validate(
-    root_path: Path, config_path: Path, strict: bool, doc_gen_only: bool
+    root_path: Path,
+    config_path: Optional[Path],
+    strict: bool,
+    doc_gen_only: bool,
+    jobs: int = 1,
+    since: Optional[str] = None,
+    sink: Optional[ErrorSink] = None,
+    max_errors: Optional[int] = None,
+    fs: Optional[Fs] = None,
+    timings: Optional[str] = None,
+    memory: Optional[MemoryReport] = None,
 ) -> int:
+    """
+    Validate the examples under root_path, returning the number of errors found.
+    Phases run cheapest first. Once max_errors have been found, the remaining phases
+    are skipped and reported. With timings, the time each phase took is printed in
+    that format. With memory, the memory each phase used is printed too.
+    """
+    with memory.tracing() if memory is not None else nullcontext():
+        result = validate_root(
+            root_path,
+            config_path,
+            strict,
+            doc_gen_only,
+            jobs,
+            since,
+            sink,
+            max_errors,
+            fs,
+        )
+
+    error_count = result.errors.total
+    if sink is not None:
+        sink.close()
+    if error_count > 0:
+        if sink is None:
+            print(f"{result.errors}")
+        print(f"{error_count} errors found, please fix them.")
+        if result.skipped:
+            print(f"Stopped early, skipped: {', '.join(result.skipped)}.")
+    else:
+        print("All checks passed, you are cleared to check in.")
+    if timings is not None:
+        print(result.doc_gen.timings.format(timings))
+    if memory is not None:
+        memory.retain_doc_gen(result.doc_gen)
+        print(memory.format())
+
+    return error_count
+
+
+def validate_many(
+    roots: Iterable[Path],
+    jobs: int = 1,
+    config_path: Optional[Path] = None,
+    strict: bool = False,
+    doc_gen_only: bool = True,
+    max_errors: Optional[int] = None,
+) -> Dict[Path, RootValidation]:
+    """
+    Validate several roots, such as tributaries, on up to jobs threads at once.
+    Each root is validated independently, and files in each are checked serially.
+    """
+    roots = list(roots)
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        futures = [
+            executor.submit(
+                validate_root,
+                root,
+                config_path,
+                strict,
+                doc_gen_only,
+                max_errors=max_errors,
+            )
+            for root in roots
+        ]
+        return {root: future.result() for root, future in zip(roots, futures)}
+
+
+def validate_root(
+    root_path: Path,
+    config_path: Optional[Path],
+    strict: bool,
+    doc_gen_only: bool,
+    jobs: int = 1,
+    since: Optional[str] = None,
+    sink: Optional[ErrorSink] = None,
+    max_errors: Optional[int] = None,
+    fs: Optional[Fs] = None,
+) -> RootValidation:
+    """
+    Run the validation phases for root_path, without reporting them. Files are read
+    through fs, by default a CachingFs.
+    """
+    if fs is None:
+        fs = caching_fs(PathFs())
     if config_path is not None:
-        doc_gen = DocGen.default()
+        doc_gen = DocGen.default(fs=fs, keep_documents=True)
         doc_gen_local = DocGen.from_root(
             root=root_path,
             validation=ValidationConfig(strict_titles=strict),
             config=config_path,
             incremental=True,
+            fs=fs,
+            keep_documents=True,
         )
         doc_gen.merge(doc_gen_local)
         doc_gen.root = root_path
         doc_gen.errors = doc_gen_local.errors
-        metadata = doc_gen.root / ".doc_gen/metadata"
-        doc_gen.find_and_process_metadata(metadata)
     else:
         doc_gen = DocGen.from_root(
             root=root_path,
             validation=ValidationConfig(strict_titles=strict),
+            incremental=True,
+            fs=fs,
+            keep_documents=True,
         )
+    if sink is not None:
+        doc_gen.errors.stream(sink)
 
-    doc_gen.collect_snippets(snippets_root=root_path)
-    doc_gen.validate()
-    if not doc_gen_only:
-        check_files(doc_gen.root, doc_gen.validation, doc_gen.errors)
+    def budget() -> Optional[int]:
+        if max_errors is None:
+            return None
+        return max_errors - doc_gen.errors.total
+
+    def exhausted() -> bool:
+        remaining = budget()
+        return remaining is not None and remaining <= 0
+
+    def metadata():
+        doc_gen.find_and_process_metadata(doc_gen.root / ".doc_gen/metadata")
+
+    def sample_files():
         verify_sample_files(doc_gen.root, doc_gen.validation, doc_gen.errors)
 
-    error_count = len(doc_gen.errors)
-    if error_count > 0:
-        print(f"{doc_gen.errors}")
-        print(f"{error_count} errors found, please fix them.")
+    def snippets():
+        doc_gen.collect_snippets(snippets_root=root_path)
+
+    def files():
+        check_files(
+            doc_gen.root,
+            doc_gen.validation,
+            doc_gen.errors,
+            jobs,
+            max_errors=budget(),
+            fs=doc_gen.fs,
+        )
+
+    def changed():
+        assert since is not None
+        changes = ChangedFiles.since(root_path, since)
+        validate_changed(doc_gen, changes, doc_gen_only, jobs, budget)
+
+    phases: List[Tuple[str, Callable[[], None]]] = []
+    if since is None:
+        phases.append(("metadata", metadata))
+    if not doc_gen_only:
+        phases.append(("sample files", sample_files))
+    if since is None:
+        phases.append(("snippets", snippets))
+        phases.append(("metadata validation", doc_gen.validate))
+        if not doc_gen_only:
+            phases.append(("file checks", files))
     else:
-        print("All checks passed, you are cleared to check in.")
+        phases.append(("changed files", changed))
+    skipped = run_phases(phases, exhausted, doc_gen.timings)
+    return RootValidation(root_path, doc_gen, skipped)
 
-    return error_count
+
+def run_phases(
+    phases: List[Tuple[str, Callable[[], None]]],
+    exhausted: Callable[[], bool],
+    timings: Optional[Timings] = None,
+) -> List[str]:
+    """
+    Run each phase in order until exhausted, returning the names of phases skipped.
+    Each phase is timed as a span in timings.
+    """
+    timings = timings or Timings()
+    for index, (name, run) in enumerate(phases):
+        if exhausted():
+            return [name for name, _ in phases[index:]]
+        with timings.span(name):
+            run()
+    return []
+
+
+def validate_changed(
+    doc_gen: DocGen,
+    changes: ChangedFiles,
+    doc_gen_only: bool,
+    jobs: int,
+    budget: Callable[[], Optional[int]] = lambda: None,
+):
+    """
+    Validate only what changed since a git ref. Metadata is loaded from changed
+    metadata files, plus any metadata that shares an example ID with them or that
+    refers to a snippet tag or snippet file removed by the change. Snippets are
+    parsed from changed files and from files that mention a snippet tag used by the
+    loaded metadata, so missing snippets are still found.
+    """
+    metadata_root = doc_gen.root / ".doc_gen" / "metadata"
+
+    def is_metadata(path: Path) -> bool:
+        return path.parent == metadata_root and path.name.endswith("_metadata.yaml")
+
+    changed_sources = {path for path in changes.changed if not skip(path)}
+
+    # Snippet tags and files that no longer exist, which unchanged metadata may use.
+    removed: Set[str] = set()
+    for path in changes.deleted:
+        removed.add(changes.relative(path))
+    for path in changed_sources | changes.deleted:
+        if skip(path):
+            continue
+        before = changes.show(path)
+        if before is None:
+            continue
+        snippets, _ = parse_snippets(before.splitlines(keepends=True), path, "")
+        removed.update(snippets)
+        if path in changes.changed:
+            snippets, _ = find_snippets(path, "", doc_gen.fs)
+            removed.difference_update(snippets)
+
+    metadata = {path for path in changes.changed if is_metadata(path)}
+    metadata |= {
+        path for path in changes.grep(removed, metadata_root) if is_metadata(path)
+    }
+    for path in sorted(metadata):
+        doc_gen.process_metadata(path)
+    # Load other files defining the same examples, to find duplicates.
+    related = changes.grep([f"{id}:" for id in doc_gen.examples], metadata_root)
+    for path in sorted(related - metadata):
+        if is_metadata(path):
+            doc_gen.process_metadata(path)
+            metadata.add(path)
+
+    tags = {
+        tag
+        for example in doc_gen.examples.values()
+        for language in example.languages.values()
+        for version in language.versions
+        for excerpt in version.excerpts
+        for tag in excerpt.snippet_tags
+    }
+    sources = changed_sources | {path for path in changes.grep(tags) if not skip(path)}
+    doc_gen.collect_snippets(snippets_root=doc_gen.root, files=sorted(sources))
+    doc_gen.validate(metadata_files=sorted(metadata))
+    if not doc_gen_only:
+        check_files(
+            doc_gen.root,
+            doc_gen.validation,
+            doc_gen.errors,
+            jobs,
+            paths=sorted(changes.changed),
+            max_errors=budget(),
+        )
 
 
 if __name__ == "__main__":
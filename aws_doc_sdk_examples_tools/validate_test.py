@@ -5,12 +5,138 @@
 Test for validate.
 """
 
+import subprocess
+import sys
+from collections import Counter
+from contextlib import contextmanager
 from pathlib import Path
+from textwrap import dedent
+from typing import Iterator, List
 
-from .validate import validate
+import pytest
+
+from .counting_fs import CountingFs
+from .fs import Buffer, PathFs, caching_fs
+from .validate import main, validate, validate_many, validate_root
 
 
 def test_validate():
     root_path = Path(__file__).parent / "test_resources" / "doc_gen_tributary_test"
     error_count = validate(root_path, root_path / ".doc_gen/config", False, False)
     assert error_count == 0
+
+
+def git(root: Path, *args: str):
+    subprocess.run(["git", "-C", str(root), *args], check=True, capture_output=True)
+
+
+def test_validate_since(tmp_path: Path):
+    metadata = tmp_path / ".doc_gen" / "metadata"
+    metadata.mkdir(parents=True)
+    (metadata / "sts_metadata.yaml").write_text(
+        dedent(
+            """\
+            sts_AssumeRole:
+              languages:
+                Python:
+                  versions:
+                    - sdk_version: 3
+                      excerpts:
+                        - description: test
+                          snippet_tags:
+                            - python.sts.AssumeRole
+              services:
+                sts: {AssumeRole}
+            """
+        )
+    )
+    source = tmp_path / "python" / "sts.py"
+    source.parent.mkdir()
+    source.write_text(
+        "# snippet-start:[python.sts.AssumeRole]\n"
+        "print('assume role')\n"
+        "# snippet-end:[python.sts.AssumeRole]\n"
+    )
+    (tmp_path / "python" / "unchanged.py").write_text("print('unchanged')\n")
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", ".")
+    git(
+        tmp_path,
+        "-c",
+        "user.name=test",
+        "-c",
+        "user.email=test@example.com",
+        "commit",
+        "-qm",
+        "base",
+    )
+
+    assert validate(tmp_path, None, False, True, since="HEAD") == 0
+
+    # Removing a tag from an unchanged file still reports the metadata using it.
+    source.write_text("print('assume role')\n")
+    assert validate(tmp_path, None, False, True, since="HEAD") == 1
+    assert validate(tmp_path, None, False, True) == 1
+
+
+def test_validate_max_errors_skips_phases(tmp_path: Path, capsys):
+    metadata = tmp_path / ".doc_gen" / "metadata"
+    metadata.mkdir(parents=True)
+    (metadata / "sts_metadata.yaml").write_text("sts_AssumeRole: [\n")
+
+    assert validate(tmp_path, None, False, True, max_errors=1) == 1
+    assert "skipped: snippets, metadata validation." in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("max_errors", ["0", "-1"])
+def test_main_rejects_max_errors_below_one(monkeypatch, capsys, max_errors: str):
+    monkeypatch.setattr(sys, "argv", ["validate", "--max-errors", max_errors])
+    with pytest.raises(SystemExit) as exit:
+        main()
+    assert exit.value.code == 2
+    assert "--max-errors must be at least 1" in capsys.readouterr().err
+
+
+class ReadPathFs(PathFs):
+    """Counts the reads of each path, which CountingFs only counts by method."""
+
+    def __init__(self) -> None:
+        self.reads: Counter = Counter()
+
+    def read(self, path: Path) -> str:
+        self.reads[path] += 1
+        return super().read(path)
+
+    def readlines(self, path: Path, encoding: str = "utf-8") -> List[str]:
+        self.reads[path] += 1
+        return super().readlines(path, encoding)
+
+    @contextmanager
+    def mmap(self, path: Path) -> Iterator[Buffer]:
+        self.reads[path] += 1
+        with super().mmap(path) as buffer:
+            yield buffer
+
+
+def test_validate_root_reads_each_path_once():
+    root = Path(__file__).parent / "test_resources" / "doc_gen_test"
+    path_fs = ReadPathFs()
+    counting = CountingFs(path_fs)
+
+    validate_root(root, None, False, False, fs=caching_fs(counting))
+
+    assert path_fs.reads
+    assert max(path_fs.reads.values()) == 1
+    assert counting.report()["metadata"]["read_many"]["paths"] == 1
+
+
+def test_validate_many():
+    resources = Path(__file__).parent / "test_resources"
+    roots = [resources / "doc_gen_test", resources / "doc_gen_tributary_test"]
+
+    results = validate_many(roots, jobs=2)
+
+    assert [*results] == roots
+    for root in roots:
+        serial = validate_root(root, None, False, True)
+        assert [str(e) for e in results[root].errors] == [str(e) for e in serial.errors]
@@ -2,9 +2,12 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from pathlib import Path
-from typing import Set
+from typing import List, Set
 from urllib.request import urlopen
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Only files with these extensions are scanned.
 EXT_LOOKUP = {
@@ -89,19 +92,64 @@ GOOD_WORDS = {
     "throat",
 }
 
-words: Set[str] = set()
-try:
-    DATA = urlopen(
-        "https://raw.githubusercontent.com/zacanger/profane-words/5ad6c62fa5228293bc610602eae475d50036dac2/words.json"
-    )
-    words = set(json.load(DATA)).difference(GOOD_WORDS)
-except:  # noqa: E722
-    pass
-
-WORDS = words
+# The deny list is words.json from zacanger/profane-words at a pinned commit. Run
+# `python -m aws_doc_sdk_examples_tools.validator_config --refresh` to vendor it at
+# PROFANE_WORDS_PATH, so validation doesn't need the network. Until it is vendored,
+# it is downloaded the first time it is used.
+PROFANE_WORDS_URL = "https://raw.githubusercontent.com/zacanger/profane-words/5ad6c62fa5228293bc610602eae475d50036dac2/words.json"
+PROFANE_WORDS_PATH = Path(__file__).parent / "config" / "profane_words.json"
+
+# Words that should never be in code examples, in addition to the profane words list.
+DENY_HOSTS = {"alpha-docs-aws.amazon.com", "integ-docs-aws.amazon.com"}
+
+
+def load_words(
+    path: Path = PROFANE_WORDS_PATH, url: str = PROFANE_WORDS_URL
+) -> Set[str]:
+    """The vendored profane words at path, or if there are none, those at url."""
+    if not path.exists():
+        try:
+            return set(download_words(url)).difference(GOOD_WORDS)
+        except (OSError, ValueError) as err:
+            logger.warning("Could not download the profane words list: %s", err)
+            return set()
+    with open(path, encoding="utf-8") as file:
+        words = json.load(file)
+    if not words:
+        # An empty list would quietly turn the deny list check off.
+        raise ValueError(f"No words in {path}, so the deny list would be empty.")
+    return set(words).difference(GOOD_WORDS)
+
+
+def download_words(url: str = PROFANE_WORDS_URL) -> List[str]:
+    with urlopen(url, timeout=30) as data:
+        return sorted(set(json.load(data)))
+
+
+def refresh_words(url: str = PROFANE_WORDS_URL, path: Path = PROFANE_WORDS_PATH) -> int:
+    """Download the profane words list to the vendored data file, returning the word count."""
+    words = download_words(url)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(words, file, indent=2)
+        file.write("\n")
+    # Drop any lazily loaded lists so the next access picks up the new file.
+    globals().pop("WORDS", None)
+    globals().pop("DENY_LIST", None)
+    return len(words)
+
+
+def __getattr__(name: str):
+    # WORDS and DENY_LIST are loaded on first use, then cached as module globals
+    # so later lookups don't come back through here.
+    if name == "WORDS":
+        globals()["WORDS"] = load_words()
+        return globals()["WORDS"]
+    if name == "DENY_LIST":
+        # List of words that should never be in code examples.
+        globals()["DENY_LIST"] = DENY_HOSTS.union(__getattr__("WORDS"))
+        return globals()["DENY_LIST"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# List of words that should never be in code examples.
-DENY_LIST = {"alpha-docs-aws.amazon.com", "integ-docs-aws.amazon.com"}.union(WORDS)
 
 # Allowlist of 20- or 40-character strings to allow.
 ALLOW_LIST = {
@@ -125,3 +173,29 @@ ALLOW_LIST = {
 
 # Media file types.
 MEDIA_FILE_TYPES = {"mp3", "wav", "jpg", "jpeg", "png"}
+
+
+def main():
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description="Manage the vendored deny list.")
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help=f"Download the profane words list to {PROFANE_WORDS_PATH.name}.",
+    )
+    parser.add_argument(
+        "--url",
+        default=PROFANE_WORDS_URL,
+        help="The URL of the words list to download when refreshing.",
+    )
+    args = parser.parse_args()
+    if args.refresh:
+        count = refresh_words(args.url)
+        print(f"Wrote {count} words to {PROFANE_WORDS_PATH}")
+    else:
+        print(f"{len(__getattr__('DENY_LIST'))} words in the deny list.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Tests for the lazily loaded deny list in validator_config.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from aws_doc_sdk_examples_tools import validator_config
+from aws_doc_sdk_examples_tools.metadata_errors import MetadataErrors
+from aws_doc_sdk_examples_tools.project_validator import (
+    DenyListWord,
+    verify_no_deny_list_words,
+)
+
+
+def test_load_words(tmp_path: Path):
+    words = tmp_path / "words.json"
+    words.write_text(json.dumps(["dummy", "forbidden"]))
+    # GOOD_WORDS are never denied.
+    assert validator_config.load_words(words) == {"forbidden"}
+
+
+def test_load_words_empty(tmp_path: Path):
+    words = tmp_path / "words.json"
+    words.write_text("[]")
+    with pytest.raises(ValueError, match="No words"):
+        validator_config.load_words(words)
+
+
+def test_load_words_downloads_until_vendored(tmp_path: Path):
+    upstream = tmp_path / "upstream.json"
+    upstream.write_text(json.dumps(["zebra", "forbidden", "zebra"]))
+    vendored = tmp_path / "words.json"
+
+    assert validator_config.load_words(vendored, upstream.as_uri()) == {
+        "forbidden",
+        "zebra",
+    }
+    assert validator_config.load_words(vendored, (tmp_path / "gone").as_uri()) == set()
+
+    assert validator_config.refresh_words(upstream.as_uri(), vendored) == 2
+    assert json.loads(vendored.read_text()) == ["forbidden", "zebra"]
+    assert validator_config.load_words(vendored, "") == {"forbidden", "zebra"}
+
+
+vendored = pytest.mark.skipif(
+    not validator_config.PROFANE_WORDS_PATH.exists(),
+    reason="The profane words list isn't vendored; run validator_config --refresh.",
+)
+
+
+@vendored
+def test_vendored_words_are_upstream():
+    words = json.loads(validator_config.PROFANE_WORDS_PATH.read_text())
+    # As --refresh writes them. The pinned upstream list has thousands of words, so
+    # a short list is a stand-in rather than the real thing.
+    assert words == sorted(set(words))
+    assert len(words) > 2000
+
+
+def test_deny_list_includes_hosts():
+    assert validator_config.DENY_HOSTS <= validator_config.DENY_LIST
+    assert validator_config.GOOD_WORDS.isdisjoint(validator_config.DENY_LIST)
+
+
+@vendored
+def test_deny_list_includes_vendored_words():
+    assert "bullshit" in validator_config.DENY_LIST
+    errors = MetadataErrors()
+    verify_no_deny_list_words("# This is bullshit.\n", Path("a.py"), errors)
+    assert [(type(error), error.word) for error in errors] == [
+        (DenyListWord, "bullshit.")
+    ]
@@ -7,7 +7,7 @@ setup(
     name="aws_doc_sdk_examples_tools",
     version="2026.10.0",
     packages=["aws_doc_sdk_examples_tools"],
-    package_data={"aws_doc_sdk_examples_tools": ["config/*.yaml"]},
+    package_data={"aws_doc_sdk_examples_tools": ["config/*.yaml", "config/*.json"]},
     entry_points={
         "console_scripts": ["doc-gen=aws_doc_sdk_examples_tools.doc_gen_cli:main"],
     },